@@ -1,31 +1,54 @@
-from fastapi import APIRouter, HTTPException, BackgroundTasks, Depends
-from typing import Dict
+from fastapi import APIRouter, HTTPException, BackgroundTasks, Depends, Query, UploadFile, File, Form, Request
+from fastapi.responses import Response, FileResponse
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
 import uuid
 import asyncio
-import json
+import aiofiles.os
 from pathlib import Path
 from datetime import datetime
 
-from app.models.schemas import ScrapeRequest, ScrapeResponse, ScrapeStatus, SitemapData, PageData, RetryRequest, \
-    FailedURL
+from app.models.schemas import ScrapeRequest, ScrapeResponse, ScrapeStatus, SitemapData, RetryRequest, \
+    FailedURL, MultiSiteScrapeRequest, URLListScrapeRequest
 from app.services.scraper import WebScraper
+from app.services.browser_pool import BrowserPool
+from app.services.browser_supervisor import BrowserSupervisor
+from app.services.job_registry import JobRegistry
+from app.services.loop_monitor import LoopLagMonitor
+from app.services.page_store import PageStore
+from app.services.search_index import SearchIndex
+from app.services.task_queue import open_task_queue
+from app.services.url_trie import URLTrie
+from app.utils.url_scope import URLScope
+from app.utils.serialization import read_json_file, dumps
+from app.utils.validators import URLValidator
 from config import settings
 
 router = APIRouter()
 
 # In-memory job storage (use Redis/DB in production)
-jobs: Dict[str, Dict] = {}
+# Job summaries stay resident; page payloads are LRU-cached and reloaded from disk on demand
+jobs = JobRegistry(
+    max_page_bytes=settings.PAGE_CACHE_MAX_BYTES,
+    max_response_bytes=settings.RESPONSE_CACHE_MAX_BYTES
+)
 
+# Multi-site batches: batch ID -> child job IDs
+batches: Dict[str, Dict] = {}
 
-def load_existing_jobs():
-    """Load existing jobs from scraped_data directory on startup"""
-    output_dir = Path(settings.OUTPUT_DIR)
+# Shared queue for worker nodes (python worker.py); None = scrape in this process
+task_queue = open_task_queue(settings.TASK_QUEUE, lease_seconds=settings.TASK_LEASE_SECONDS) \
+    if settings.TASK_QUEUE else None
 
-    if not output_dir.exists():
-        return
+# Event-loop lag sampling and slow-callback stacks (started with the app, see main.py)
+loop_monitor = LoopLagMonitor.from_settings(settings) if settings.LOOP_MONITOR else None
 
-    print("🔄 Loading existing jobs from disk...")
 
+def read_saved_jobs(output_dir: Path) -> List[Tuple[Path, Dict, Dict]]:
+    """(job_dir, summary, sitemap) for every complete job directory under output_dir (blocking)"""
+    if not output_dir.exists():
+        return []
+
+    saved = []
     for job_dir in output_dir.iterdir():
         if not job_dir.is_dir():
             continue
@@ -38,39 +61,29 @@ def load_existing_jobs():
             continue
 
         try:
-            # Load summary
-            with open(summary_file, 'r', encoding='utf-8') as f:
-                summary = json.load(f)
+            saved.append((job_dir, read_json_file(summary_file), read_json_file(sitemap_file)))
+        except Exception as e:
+            print(f"⚠️  Failed to load job from {job_dir}: {e}")
 
-            # Load sitemap
-            with open(sitemap_file, 'r', encoding='utf-8') as f:
-                sitemap_data = json.load(f)
+    return saved
 
-            # Load pages
-            with open(pages_file, 'r', encoding='utf-8') as f:
-                pages_data = json.load(f)
 
+async def load_existing_jobs():
+    """Load existing jobs from scraped_data directory (startup and /reload)"""
+    print("🔄 Loading existing jobs from disk...")
+
+    # Directory scan and JSON parsing run in a thread; only the registry update happens on the loop
+    for job_dir, summary, sitemap_data in await asyncio.to_thread(read_saved_jobs, Path(settings.OUTPUT_DIR)):
+        try:
             # Create job ID from directory name
             job_id = str(uuid.uuid4())
 
-            # Parse pages
-            pages = []
-            for page_dict in pages_data:
-                pages.append(PageData(
-                    url=page_dict['url'],
-                    title=page_dict.get('title'),
-                    metadata=page_dict.get('metadata', {}),
-                    structured_content=page_dict.get('structured_content', []),
-                    all_images=page_dict.get('all_images', []),
-                    scraped_at=datetime.fromisoformat(page_dict['scraped_at']) if page_dict.get(
-                        'scraped_at') else datetime.utcnow()
-                ))
+            # Pages are not parsed here; they load from pages.json on first access
 
             # Create sitemap
             sitemap = SitemapData(
                 total_urls=sitemap_data['total_urls'],
-                urls=sitemap_data['urls'],
-                hierarchy=sitemap_data.get('hierarchy', {})
+                urls=sitemap_data['urls']
             )
 
             # Parse failed URLs
@@ -90,7 +103,6 @@ def load_existing_jobs():
                 'message': 'Loaded from disk',
                 'output_directory': str(job_dir),
                 'sitemap': sitemap,
-                'pages': pages,
                 'total_pages_scraped': summary['pages_scraped'],
                 'failed_urls': failed_urls,
                 'errors': summary.get('errors', []),
@@ -106,8 +118,61 @@ def load_existing_jobs():
     print(f"📦 Loaded {len(jobs)} existing jobs")
 
 
-# Load jobs on module import
-load_existing_jobs()
+def read_sitemap_tree(output_directory: str) -> Tuple[Dict, URLTrie]:
+    """sitemap.json and its URL tree (built from the old parent -> children map for older jobs)"""
+    sitemap_file = Path(output_directory) / "sitemap.json"
+    sitemap_data = read_json_file(sitemap_file)
+    if 'tree' in sitemap_data:
+        tree = URLTrie.from_dict(sitemap_data['tree'])
+    else:
+        tree = URLTrie.from_hierarchy(sitemap_data['urls'], sitemap_data.get('hierarchy', {}),
+                                      sitemap_data.get('base_url', ''))
+        store = PageStore(Path(output_directory))
+        if store.pages_file.exists() or store.has_segments():
+            tree.record_pages(store.load_merged())
+        summary_file = Path(output_directory) / "summary.json"
+        if summary_file.exists():
+            tree.record_failures(f['url'] for f in read_json_file(summary_file).get('failed_urls', []))
+    tree.source_bytes = sitemap_file.stat().st_size
+    return sitemap_data, tree
+
+
+async def load_sitemap(output_directory: str) -> SitemapData:
+    """A job's saved sitemap.json with its tree, parsed off the event loop"""
+    sitemap_data, tree = await asyncio.to_thread(read_sitemap_tree, output_directory)
+    return SitemapData(total_urls=sitemap_data['total_urls'], urls=sitemap_data['urls'], tree=tree)
+
+
+def without_tree(sitemap: Optional[SitemapData]) -> Optional[SitemapData]:
+    """Job records keep the URL list only; the tree is read from sitemap.json on request"""
+    return sitemap.model_copy(update={'tree': None}) if sitemap else None
+
+
+async def conditional_response(request: Request, job_id: Optional[str],
+                               build: Callable[[], Awaitable[bytes]], variant: str = '') -> Response:
+    """304 when If-None-Match has the current ETag, else the cached (or freshly built) JSON bytes"""
+    etag = jobs.etag(job_id)
+    headers = {'ETag': etag, 'Cache-Control': 'no-cache'}
+
+    if_none_match = request.headers.get('if-none-match')
+    if if_none_match:
+        # Weak comparison: W/ prefixes are ignored
+        candidates = {tag.strip().removeprefix('W/') for tag in if_none_match.split(',')}
+        if '*' in candidates or etag.removeprefix('W/') in candidates:
+            return Response(status_code=304, headers=headers)
+
+    return Response(content=await jobs.cached_response(job_id, build, variant), media_type="application/json", headers=headers)
+
+
+def check_allowed_domain(url: str):
+    """Reject seeds outside ALLOWED_DOMAINS (when configured)"""
+    if settings.ALLOWED_DOMAINS:
+        scope = URLScope(url, global_allowed_hosts=settings.ALLOWED_DOMAINS)
+        if not scope.host_allowed(scope.base_host):
+            raise HTTPException(
+                status_code=403,
+                detail=f"Domain of {url} is not in ALLOWED_DOMAINS for this server."
+            )
 
 
 async def verify_authorization(request: ScrapeRequest):
@@ -117,10 +182,44 @@ async def verify_authorization(request: ScrapeRequest):
             status_code=401,
             detail="Invalid authorization token. You must own or have permission to scrape this website."
         )
+    check_allowed_domain(str(request.url))
     return True
 
 
-async def run_scraping_job(job_id: str, scrape_request: ScrapeRequest):
+async def verify_multi_site_authorization(request: MultiSiteScrapeRequest):
+    """Verify user has authorization to scrape every site in the batch"""
+    if not request.authorization_token or len(request.authorization_token) < 10:
+        raise HTTPException(
+            status_code=401,
+            detail="Invalid authorization token. You must own or have permission to scrape these websites."
+        )
+    for url in request.urls:
+        check_allowed_domain(str(url))
+    return True
+
+
+def validate_url_list(urls: List[str], rejected: int, authorization_token: str) -> List[str]:
+    """Checks shared by the JSON and upload variants of POST /scrape/batch"""
+    if not authorization_token or len(authorization_token) < 10:
+        raise HTTPException(
+            status_code=401,
+            detail="Invalid authorization token. You must own or have permission to scrape these websites."
+        )
+    if not urls:
+        raise HTTPException(status_code=400, detail=f"No valid http(s) URLs given ({rejected} rejected)")
+    if len(urls) > settings.URL_LIST_MAX_URLS:
+        raise HTTPException(
+            status_code=413,
+            detail=f"{len(urls)} URLs exceeds URL_LIST_MAX_URLS ({settings.URL_LIST_MAX_URLS})"
+        )
+
+    # One allow-list check per host rather than per URL
+    for host_url in {url.split('/', 3)[2]: url for url in urls}.values():
+        check_allowed_domain(host_url)
+    return urls
+
+
+async def run_scraping_job(job_id: str, scrape_request: ScrapeRequest, browser_pool: Optional[BrowserPool] = None):
     """Background task to run scraping"""
     try:
         jobs[job_id]['status'] = ScrapeStatus.IN_PROGRESS
@@ -128,7 +227,13 @@ async def run_scraping_job(job_id: str, scrape_request: ScrapeRequest):
 
         scraper = WebScraper(
             base_url=str(scrape_request.url),
-            max_depth=scrape_request.max_depth
+            max_depth=scrape_request.max_depth,
+            include_patterns=scrape_request.include_patterns,
+            exclude_patterns=scrape_request.exclude_patterns,
+            allowed_subdomains=scrape_request.allowed_subdomains,
+            browser_pool=browser_pool,
+            task_queue=task_queue,
+            job_id=job_id
         )
 
         results = await scraper.run_full_scrape()
@@ -137,12 +242,12 @@ async def run_scraping_job(job_id: str, scrape_request: ScrapeRequest):
             'status': ScrapeStatus.COMPLETED,
             'message': 'Scraping completed successfully',
             'output_directory': results['output_directory'],
-            'sitemap': results['sitemap'],
-            'pages': results['pages'],
+            'sitemap': without_tree(results['sitemap']),
             'total_pages_scraped': results['total_pages'],
             'failed_urls': results['failed_urls'],
             'errors': results['errors']
         })
+        await jobs.set_pages(job_id, results['pages'])
 
     except Exception as e:
         jobs[job_id].update({
@@ -152,8 +257,86 @@ async def run_scraping_job(job_id: str, scrape_request: ScrapeRequest):
         })
 
 
+async def run_url_list_job(job_id: str, urls: List[str]):
+    """Background task scraping a fixed URL list without sitemap discovery"""
+    try:
+        jobs[job_id]['status'] = ScrapeStatus.IN_PROGRESS
+        jobs[job_id]['message'] = f'Scraping {len(urls)} listed URLs...'
+
+        scraper = WebScraper(base_url=urls[0], task_queue=task_queue, job_id=job_id)
+        results = await scraper.run_url_list(urls)
+
+        jobs[job_id].update({
+            'status': ScrapeStatus.COMPLETED,
+            'message': 'Scraping completed successfully',
+            'output_directory': results['output_directory'],
+            'sitemap': without_tree(results['sitemap']),
+            'total_pages_scraped': results['total_pages'],
+            'failed_urls': results['failed_urls'],
+            'errors': results['errors']
+        })
+        await jobs.set_pages(job_id, results['pages'])
+
+    except Exception as e:
+        jobs[job_id].update({
+            'status': ScrapeStatus.FAILED,
+            'message': f'Scraping failed: {str(e)}',
+            'errors': [str(e)]
+        })
+
+
+async def run_multi_site_job(batch_id: str, requests: List[ScrapeRequest]):
+    """Background task running every site of a batch on one shared browser pool"""
+    batches[batch_id]['status'] = ScrapeStatus.IN_PROGRESS
+
+    browser_pool = BrowserPool(
+        max_concurrent_pages=settings.BATCH_MAX_CONCURRENT_PAGES,
+        per_host_concurrency=settings.PER_HOST_CONCURRENCY,
+        per_host_delay_ms=settings.PER_HOST_DELAY_MS,
+        supervisor=BrowserSupervisor.from_settings(settings)
+    )
+
+    try:
+        if not task_queue:  # Queued jobs are browsed by worker nodes
+            await browser_pool.start()
+        await asyncio.gather(*[
+            run_scraping_job(job_id, scrape_request, browser_pool)
+            for job_id, scrape_request in zip(batches[batch_id]['job_ids'], requests)
+        ])
+        batches[batch_id]['status'] = ScrapeStatus.COMPLETED
+        batches[batch_id]['browser'] = browser_pool.supervisor.report()
+
+    except Exception as e:
+        batches[batch_id]['status'] = ScrapeStatus.FAILED
+        batches[batch_id]['error'] = str(e)
+        for job_id in batches[batch_id]['job_ids']:
+            if jobs[job_id]['status'] == ScrapeStatus.PENDING:
+                jobs[job_id].update({
+                    'status': ScrapeStatus.FAILED,
+                    'message': f'Scraping failed: {str(e)}',
+                    'errors': [str(e)]
+                })
+
+    finally:
+        await browser_pool.close()
+
+
+# Retries append segments and compaction folds them into pages.json: never both at once for a job
+page_store_locks: Dict[str, asyncio.Lock] = {}
+
+
+def page_store_lock(job_id: str) -> asyncio.Lock:
+    return page_store_locks.setdefault(job_id, asyncio.Lock())
+
+
 async def run_retry_job(job_id: str, urls_to_retry: list[str]):
     """Background task to retry failed URLs"""
+    async with page_store_lock(job_id):
+        await _retry(job_id, urls_to_retry)
+
+
+async def _retry(job_id: str, urls_to_retry: list[str]):
+    """Retry body, run under the job's page store lock"""
     try:
         job_data = jobs[job_id]
         jobs[job_id]['status'] = ScrapeStatus.IN_PROGRESS
@@ -162,19 +345,14 @@ async def run_retry_job(job_id: str, urls_to_retry: list[str]):
         scraper = WebScraper(
             base_url=job_data['url'],
             max_depth=3,  # Use default depth for retries
-            existing_output_dir=job_data['output_directory']
+            existing_output_dir=job_data['output_directory'],
+            task_queue=task_queue,
+            job_id=job_id
         )
+        # Keep failures that are not being retried in the saved summary
+        scraper.failed_urls = [f for f in job_data.get('failed_urls', []) if f.url not in urls_to_retry]
 
-        # Load existing sitemap
-        sitemap_file = Path(job_data['output_directory']) / "sitemap.json"
-        with open(sitemap_file, 'r') as f:
-            sitemap_data = json.load(f)
-
-        existing_sitemap = SitemapData(
-            total_urls=sitemap_data['total_urls'],
-            urls=sitemap_data['urls'],
-            hierarchy=sitemap_data.get('hierarchy', {})
-        )
+        existing_sitemap = await load_sitemap(job_data['output_directory'])
 
         results = await scraper.retry_failed_urls(urls_to_retry, existing_sitemap)
 
@@ -187,13 +365,8 @@ async def run_retry_job(job_id: str, urls_to_retry: list[str]):
             'errors': job_data.get('errors', []) + results['errors']
         })
 
-        # Reload pages from disk
-        pages_file = Path(job_data['output_directory']) / "pages.json"
-        with open(pages_file, 'r') as f:
-            pages_data = json.load(f)
-
-        pages = [PageData(**p) for p in pages_data]
-        jobs[job_id]['pages'] = pages
+        # Merged pages are reloaded from disk on next access
+        jobs.discard_pages(job_id)
 
     except Exception as e:
         jobs[job_id].update({
@@ -203,6 +376,57 @@ async def run_retry_job(job_id: str, urls_to_retry: list[str]):
         })
 
 
+async def run_compaction_job(job_id: str):
+    """Background task folding retry segments back into pages.json/pages.csv once enough have piled up"""
+    job_data = jobs.get(job_id)
+    if not job_data or not job_data.get('output_directory'):
+        return
+
+    async with page_store_lock(job_id):
+        store = PageStore(Path(job_data['output_directory']))
+        if await asyncio.to_thread(lambda: store.segment_count) < settings.PAGE_STORE_COMPACT_SEGMENTS:
+            return
+        try:
+            scraper = WebScraper(base_url=job_data['url'], existing_output_dir=job_data['output_directory'])
+            await scraper.compact_pages()
+            jobs.discard_pages(job_id)
+        except Exception as e:
+            print(f"❌ Compaction failed for job {job_id}: {e}")
+
+
+async def run_reextract_job(job_id: str):
+    """Background task to regenerate a job's pages from its WARC capture"""
+    try:
+        job_data = jobs[job_id]
+        jobs[job_id]['status'] = ScrapeStatus.IN_PROGRESS
+        jobs[job_id]['message'] = 'Re-extracting pages from WARC capture...'
+
+        scraper = WebScraper(
+            base_url=job_data['url'],
+            existing_output_dir=job_data['output_directory']
+        )
+        scraper.failed_urls = list(job_data.get('failed_urls', []))
+
+        existing_sitemap = await load_sitemap(job_data['output_directory'])
+
+        results = await scraper.run_reextract(existing_sitemap)
+
+        jobs[job_id].update({
+            'status': ScrapeStatus.COMPLETED,
+            'message': f'Re-extraction completed! {results["total_pages"]} pages regenerated',
+            'total_pages_scraped': results['total_pages'],
+            'errors': job_data.get('errors', []) + results['errors']
+        })
+        await jobs.set_pages(job_id, results['pages'])
+
+    except Exception as e:
+        jobs[job_id].update({
+            'status': ScrapeStatus.FAILED,
+            'message': f'Re-extraction failed: {str(e)}',
+            'errors': jobs[job_id].get('errors', []) + [str(e)]
+        })
+
+
 @router.post("/scrape", response_model=ScrapeResponse)
 async def start_scrape(
         request: ScrapeRequest,
@@ -239,6 +463,146 @@ async def start_scrape(
     )
 
 
+@router.post("/scrape/sites")
+async def start_multi_site_scrape(
+        request: MultiSiteScrapeRequest,
+        background_tasks: BackgroundTasks,
+        authorized: bool = Depends(verify_multi_site_authorization)
+):
+    """
+    Start one scraping job per site, all sharing a single browser pool.
+
+    Each site gets its own job and output directory in the usual layout; pages across all
+    sites are bounded by BATCH_MAX_CONCURRENT_PAGES with per-host politeness.
+    """
+    batch_id = str(uuid.uuid4())
+    created_at = datetime.utcnow().isoformat()
+
+    # One job per distinct seed
+    seeds = list(dict.fromkeys(str(url) for url in request.urls))
+    job_ids = []
+    requests = []
+    for seed in seeds:
+        job_id = str(uuid.uuid4())
+        jobs[job_id] = {
+            'status': ScrapeStatus.PENDING,
+            'url': seed,
+            'message': 'Queued in multi-site batch',
+            'createdAt': created_at,
+            'batch_id': batch_id,
+            'failed_urls': [],
+            'errors': []
+        }
+        job_ids.append(job_id)
+        requests.append(ScrapeRequest(
+            url=seed,
+            max_depth=request.max_depth,
+            authorization_token=request.authorization_token
+        ))
+
+    batches[batch_id] = {
+        'status': ScrapeStatus.PENDING,
+        'job_ids': job_ids,
+        'createdAt': created_at
+    }
+
+    background_tasks.add_task(run_multi_site_job, batch_id, requests)
+
+    return {
+        "batch_id": batch_id,
+        "status": ScrapeStatus.PENDING,
+        "message": f"Multi-site scrape started for {len(job_ids)} sites",
+        "job_ids": job_ids
+    }
+
+
+def start_url_list_job(urls: List[str], rejected: int, background_tasks: BackgroundTasks) -> Dict:
+    job_id = str(uuid.uuid4())
+
+    jobs[job_id] = {
+        'status': ScrapeStatus.PENDING,
+        'url': urls[0],
+        'message': 'URL-list scraping job queued',
+        'createdAt': datetime.utcnow().isoformat(),
+        'failed_urls': [],
+        'errors': []
+    }
+
+    background_tasks.add_task(run_url_list_job, job_id, urls)
+
+    return {
+        "job_id": job_id,
+        "status": ScrapeStatus.PENDING,
+        "message": f"Scraping {len(urls)} URLs without sitemap discovery",
+        "accepted_urls": len(urls),
+        "rejected_urls": rejected
+    }
+
+
+@router.post("/scrape/batch")
+async def start_url_list_scrape(request: URLListScrapeRequest, background_tasks: BackgroundTasks):
+    """
+    Scrape exactly the given URLs, skipping sitemap discovery.
+
+    URLs are deduplicated by canonical form and fed straight into the concurrent scrape
+    pipeline; output uses the usual layout (every URL at depth 0 in the sitemap tree).
+    Poll GET /scrape/{job_id}.
+    """
+    urls, rejected = URLValidator.dedupe_urls(request.urls)
+    validate_url_list(urls, rejected, request.authorization_token)
+    return start_url_list_job(urls, rejected, background_tasks)
+
+
+@router.post("/scrape/batch/upload")
+async def start_url_list_scrape_upload(
+        background_tasks: BackgroundTasks,
+        file: UploadFile = File(..., description="One URL per line, CSV, JSON list or a sitemap.json"),
+        authorization_token: str = Form(...)
+):
+    """POST /scrape/batch with the URL list as an uploaded file"""
+    content = await file.read()
+    try:
+        urls, rejected = URLValidator.parse_url_list(content.decode('utf-8-sig'))
+    except (UnicodeDecodeError, ValueError) as e:
+        raise HTTPException(status_code=400, detail=f"Could not read URL list: {e}")
+    validate_url_list(urls, rejected, authorization_token)
+    return start_url_list_job(urls, rejected, background_tasks)
+
+
+@router.get("/scrape/sites/{batch_id}")
+async def get_multi_site_status(batch_id: str):
+    """Get the status of every job in a multi-site batch"""
+    if batch_id not in batches:
+        raise HTTPException(status_code=404, detail="Batch not found")
+
+    batch = batches[batch_id]
+    batch_jobs = [
+        {
+            "job_id": job_id,
+            "url": jobs[job_id].get('url'),
+            "status": jobs[job_id]['status'],
+            "total_pages": jobs[job_id].get('total_pages_scraped', 0),
+            "failed_urls_count": len(jobs[job_id].get('failed_urls', []))
+        }
+        for job_id in batch['job_ids']
+        if job_id in jobs
+    ]
+
+    status_counts: Dict[str, int] = {}
+    for job in batch_jobs:
+        status_counts[job['status']] = status_counts.get(job['status'], 0) + 1
+
+    return {
+        "batch_id": batch_id,
+        "status": batch['status'],
+        "created_at": batch['createdAt'],
+        "total_sites": len(batch['job_ids']),
+        "status_counts": status_counts,
+        "total_pages": sum(job['total_pages'] for job in batch_jobs),
+        "jobs": batch_jobs
+    }
+
+
 @router.post("/scrape/{job_id}/retry")
 async def retry_failed_urls(
         job_id: str,
@@ -278,6 +642,7 @@ async def retry_failed_urls(
 
     # Start retry in background
     background_tasks.add_task(run_retry_job, job_id, urls_to_retry)
+    background_tasks.add_task(run_compaction_job, job_id)
 
     return {
         "message": f"Retry started for {len(urls_to_retry)} URLs",
@@ -286,25 +651,166 @@ async def retry_failed_urls(
     }
 
 
+@router.post("/scrape/{job_id}/re-extract")
+async def reextract_job(job_id: str, background_tasks: BackgroundTasks):
+    """
+    Re-run content extraction for a job from its recorded WARC capture.
+
+    No network access is needed; requires the job to have been scraped with WARC_CAPTURE=true.
+    """
+    if job_id not in jobs:
+        raise HTTPException(status_code=404, detail="Job not found")
+
+    job_data = jobs[job_id]
+
+    if job_data['status'] == ScrapeStatus.IN_PROGRESS:
+        raise HTTPException(status_code=400, detail="Job is currently in progress. Wait for it to complete.")
+
+    if not job_data.get('output_directory') or \
+            not await aiofiles.os.path.exists(Path(job_data['output_directory']) / "pages.warc.gz"):
+        raise HTTPException(status_code=400, detail="Job has no WARC capture. Scrape it with WARC_CAPTURE=true.")
+
+    background_tasks.add_task(run_reextract_job, job_id)
+
+    return {
+        "message": "Re-extraction started",
+        "job_id": job_id
+    }
+
+
 @router.get("/scrape/{job_id}", response_model=ScrapeResponse)
-async def get_scrape_status(job_id: str):
-    """Get the status and results of a scraping job"""
+async def get_scrape_status(job_id: str, request: Request):
+    """Get the status and results of a scraping job (ETag / If-None-Match aware)"""
     if job_id not in jobs:
         raise HTTPException(status_code=404, detail="Job not found")
 
     job_data = jobs[job_id]
 
-    return ScrapeResponse(
-        job_id=job_id,
-        status=job_data['status'],
-        message=job_data.get('message', ''),
-        output_directory=job_data.get('output_directory'),
-        sitemap=job_data.get('sitemap'),
-        pages=job_data.get('pages'),
-        total_pages_scraped=job_data.get('total_pages_scraped', 0),
-        failed_urls=job_data.get('failed_urls', []),
-        errors=job_data.get('errors', [])
-    )
+    async def build_response(progress: Optional[Dict[str, int]] = None) -> bytes:
+        response = ScrapeResponse(
+            job_id=job_id,
+            status=job_data['status'],
+            message=job_data.get('message', ''),
+            output_directory=job_data.get('output_directory'),
+            sitemap=job_data.get('sitemap'),
+            pages=await jobs.get_pages(job_id),
+            total_pages_scraped=job_data.get('total_pages_scraped', 0),
+            failed_urls=job_data.get('failed_urls', []),
+            errors=job_data.get('errors', []),
+            progress=progress
+        )
+        # Serialized straight to bytes by pydantic-core, in a thread: large jobs take long enough to stall the loop
+        return await asyncio.to_thread(lambda: response.model_dump_json().encode())
+
+    if task_queue and job_data['status'] == ScrapeStatus.IN_PROGRESS:
+        # Queue progress moves without the job changing: always fresh
+        progress = await asyncio.to_thread(task_queue.job_counts, job_id)
+        return Response(content=await build_response(progress), media_type="application/json")
+
+    return await conditional_response(request, job_id, build_response)
+
+
+@router.get("/scrape/{job_id}/pages")
+async def get_job_pages(job_id: str):
+    """Raw pages.json bytes for a job, streamed from disk without parsing"""
+    if job_id not in jobs:
+        raise HTTPException(status_code=404, detail="Job not found")
+
+    output_directory = jobs[job_id].get('output_directory')
+    store = PageStore(Path(output_directory)) if output_directory else None
+
+    if not store or not await aiofiles.os.path.exists(store.pages_file):
+        raise HTTPException(status_code=404, detail="Job has no saved pages yet")
+
+    # Uncompacted retries must be merged; otherwise serve the file as-is
+    if await asyncio.to_thread(store.has_segments):
+        # Merging and serializing a large job takes a while: both stay off the event loop
+        payload = await asyncio.to_thread(lambda: dumps(store.load_merged()))
+        return Response(content=payload, media_type="application/json")
+
+    return FileResponse(store.pages_file, media_type="application/json")
+
+
+@router.get("/scrape/{job_id}/images")
+async def get_job_images(job_id: str):
+    """Raw images.json bytes for a job: every distinct image with alt texts, srcset variants and usage"""
+    if job_id not in jobs:
+        raise HTTPException(status_code=404, detail="Job not found")
+
+    output_directory = jobs[job_id].get('output_directory')
+    catalog_file = Path(output_directory) / "images.json" if output_directory else None
+
+    if not catalog_file or not await aiofiles.os.path.exists(catalog_file):
+        raise HTTPException(status_code=404, detail="Job has no image catalog (IMAGE_CATALOG_MODE=off or not saved yet)")
+
+    return FileResponse(catalog_file, media_type="application/json")
+
+
+@router.get("/scrape/{job_id}/sitemap")
+async def get_job_sitemap(
+        job_id: str,
+        request: Request,
+        prefix: str = Query("", description="Path on the job's site (/docs) or a full URL; empty for all origins"),
+        depth: int = Query(1, ge=0, le=10, description="Levels of children to expand below the prefix")
+):
+    """Subtree of a job's URL tree with page, failure and image totals per node, for lazy expansion"""
+    if job_id not in jobs:
+        raise HTTPException(status_code=404, detail="Job not found")
+
+    job_data = jobs[job_id]
+    output_directory = job_data.get('output_directory')
+    if not output_directory or not await aiofiles.os.path.exists(Path(output_directory) / "sitemap.json"):
+        raise HTTPException(status_code=404, detail="Job has no saved sitemap yet")
+
+    async def load_tree() -> URLTrie:
+        return (await asyncio.to_thread(read_sitemap_tree, output_directory))[1]
+
+    async def build_response() -> bytes:
+        # The parsed tree is cached per job version, so expanding one node does not re-read sitemap.json
+        tree = await jobs.cached_response(job_id, load_tree, variant='tree', size=lambda t: t.source_bytes)
+        node = tree.subtree(prefix, job_data['url'], depth)
+        if node is None:
+            raise HTTPException(status_code=404, detail=f"No URLs under {prefix}")
+        return await asyncio.to_thread(dumps, {"job_id": job_id, "prefix": prefix, "depth": depth, "node": node})
+
+    return await conditional_response(request, job_id, build_response, variant=f"sitemap:{depth}:{prefix}")
+
+
+@router.get("/scrape/{job_id}/search")
+async def search_job_pages(
+        job_id: str,
+        q: str = Query(..., min_length=1, description="Search terms; end a term with * for prefix search"),
+        limit: int = Query(20, ge=1, le=100),
+        offset: int = Query(0, ge=0)
+):
+    """Full-text search over a job's pages (title, metadata and text), ranked with snippets"""
+    if job_id not in jobs:
+        raise HTTPException(status_code=404, detail="Job not found")
+
+    output_directory = jobs[job_id].get('output_directory')
+    if not output_directory:
+        raise HTTPException(status_code=404, detail="Job has no saved pages yet")
+
+    loop = asyncio.get_running_loop()
+    index = SearchIndex(Path(output_directory) / "search.db")
+
+    # Jobs scraped before indexing existed get their index built on first search
+    if not await loop.run_in_executor(None, index.exists):
+        store = PageStore(Path(output_directory))
+        if not await aiofiles.os.path.exists(store.pages_file):
+            raise HTTPException(status_code=404, detail="Job has no saved pages yet")
+        pages_data = await loop.run_in_executor(None, store.load_merged)
+        await loop.run_in_executor(None, index.rebuild, pages_data)
+
+    results = await loop.run_in_executor(None, index.search, q, limit, offset)
+
+    return {
+        "job_id": job_id,
+        "query": q,
+        "limit": limit,
+        "offset": offset,
+        **results
+    }
 
 
 @router.delete("/scrape/{job_id}")
@@ -318,30 +824,35 @@ async def delete_job(job_id: str):
 
 
 @router.get("/jobs")
-async def list_jobs():
-    """List all scraping jobs (including loaded from disk)"""
-    return {
-        "total_jobs": len(jobs),
-        "jobs": [
-            {
-                "job_id": job_id,
-                "status": data['status'],
-                "url": data.get('url'),
-                "message": data.get('message'),
-                "total_pages": data.get('total_pages_scraped', 0),
-                "failed_urls_count": len(data.get('failed_urls', [])),
-                "created_at": data.get('createdAt')
-            }
-            for job_id, data in jobs.items()
-        ]
-    }
+async def list_jobs(request: Request):
+    """List all scraping jobs (including loaded from disk); ETag / If-None-Match aware"""
+
+    async def build_response() -> bytes:
+        summaries = {
+            "total_jobs": len(jobs),
+            "jobs": [
+                {
+                    "job_id": job_id,
+                    "status": data['status'],
+                    "url": data.get('url'),
+                    "message": data.get('message'),
+                    "total_pages": data.get('total_pages_scraped', 0),
+                    "failed_urls_count": len(data.get('failed_urls', [])),
+                    "created_at": data.get('createdAt')
+                }
+                for job_id, data in jobs.items()
+            ]
+        }
+        return await asyncio.to_thread(dumps, summaries)
+
+    return await conditional_response(request, None, build_response)
 
 
 @router.post("/reload")
 async def reload_jobs():
     """Reload jobs from disk"""
     jobs.clear()
-    load_existing_jobs()
+    await load_existing_jobs()
     return {
         "message": "Jobs reloaded from disk",
         "total_jobs": len(jobs)
@@ -355,5 +866,22 @@ async def health_check():
         "status": "healthy",
         "service": "web-scraper",
         "active_jobs": len([j for j in jobs.values() if j['status'] == ScrapeStatus.IN_PROGRESS]),
-        "total_jobs": len(jobs)
+        "total_jobs": len(jobs),
+        "page_cache": jobs.cache_stats(),
+        "task_queue": await asyncio.to_thread(task_queue.stats) if task_queue else None,
+        "event_loop": loop_monitor.report(with_stalls=False) if loop_monitor else None
     }
+
+
+@router.get("/health/loop")
+async def event_loop_health():
+    """Event-loop lag percentiles and the most recent slow callbacks (LOOP_MONITOR)"""
+    if not loop_monitor:
+        raise HTTPException(status_code=404, detail="Event-loop monitor is disabled (LOOP_MONITOR=false)")
+    return loop_monitor.report()
+
+
+@router.get("/jobs/cache")
+async def job_cache_stats():
+    """Page payload cache statistics (hits, misses, resident bytes)"""
+    return jobs.cache_stats()
@@ -0,0 +1,131 @@
+import sys
+from collections.abc import Sequence
+from typing import Any, Dict, Iterable, Iterator, List, Tuple
+
+from pydantic import GetCoreSchemaHandler, GetJsonSchemaHandler
+from pydantic_core import core_schema
+
+
+class ContentBlocks(Sequence):
+    """
+    Compact storage for a page's structured content.
+
+    Each block is kept as a tuple (type, *fields) following a fixed per-type layout instead of
+    a dict, with type tags and short repeated strings (image URLs, alt/title) interned.
+    Indexing and iteration still yield the public dict shape; to_list() is used at the
+    serialization boundary.
+    """
+
+    __slots__ = ('_blocks',)
+
+    LAYOUTS: Dict[str, Tuple[str, ...]] = {
+        'text': ('content',),
+        'image': ('url', 'alt', 'title', 'srcset'),
+        'boilerplate': ('ref',),
+    }
+    INTERNED_FIELDS = {'url', 'alt', 'title', 'srcset', 'ref'}
+
+    def __init__(self, blocks: Iterable[Dict[str, Any]] = ()):
+        self._blocks: List[tuple] = [self._pack(block) for block in blocks]
+
+    @classmethod
+    def from_packed(cls, rows: Iterable[Iterable]) -> 'ContentBlocks':
+        """Build from rows already in (type, *fields) layout, e.g. the browser extractor payload"""
+        blocks = cls()
+        intern = sys.intern
+        blocks._blocks = [
+            ('text', row[1]) if row[0] == 'text' else tuple(
+                intern(v) if isinstance(v, str) else v for v in row
+            )
+            for row in rows
+        ]
+        return blocks
+
+    @classmethod
+    def _pack(cls, block: Dict[str, Any]) -> tuple:
+        block_type = block.get('type')
+        if block_type == 'text' and len(block) == 2 and 'content' in block:
+            return ('text', block['content'])  # Fast path for the common case
+
+        layout = cls.LAYOUTS.get(block_type)
+        if layout is None or any(key != 'type' and key not in layout for key in block):
+            # Unknown shape: keep the dict as-is
+            return (None, dict(block))
+
+        values = []
+        for field in layout:
+            value = block.get(field)
+            if field in cls.INTERNED_FIELDS and isinstance(value, str):
+                value = sys.intern(value)
+            values.append(value)
+        return (sys.intern(block_type), *values)
+
+    @classmethod
+    def _unpack(cls, packed: tuple) -> Dict[str, Any]:
+        block_type = packed[0]
+        if block_type is None:
+            return dict(packed[1])
+
+        block = {'type': block_type}
+        for field, value in zip(cls.LAYOUTS[block_type], packed[1:]):
+            if value is not None:
+                block[field] = value
+        return block
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._unpack(packed) for packed in self._blocks[index]]
+        return self._unpack(self._blocks[index])
+
+    def __len__(self) -> int:
+        return len(self._blocks)
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        return map(self._unpack, self._blocks)
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, ContentBlocks):
+            return self._blocks == other._blocks
+        if isinstance(other, list):
+            return self.to_list() == other
+        return NotImplemented
+
+    def __reduce__(self):
+        # Pickle the packed rows (e.g. results sent back from worker processes)
+        return ContentBlocks.from_packed, (self._blocks,)
+
+    def __repr__(self) -> str:
+        return f"ContentBlocks({len(self._blocks)} blocks)"
+
+    def texts(self) -> Iterator[str]:
+        """Text block contents without materializing dicts"""
+        return (packed[1] for packed in self._blocks if packed[0] == 'text')
+
+    def to_list(self) -> List[Dict[str, Any]]:
+        return [self._unpack(packed) for packed in self._blocks]
+
+    @classmethod
+    def coerce(cls, value: Any) -> 'ContentBlocks':
+        if isinstance(value, ContentBlocks):
+            return value
+        if isinstance(value, (list, tuple)):
+            try:
+                return cls(value)
+            except AttributeError:
+                raise ValueError('structured_content blocks must be objects')
+        raise ValueError('structured_content must be a list of blocks')
+
+    @staticmethod
+    def serialize(value: Any) -> List[Dict[str, Any]]:
+        return value.to_list() if isinstance(value, ContentBlocks) else list(value)
+
+    @classmethod
+    def __get_pydantic_core_schema__(cls, source: Any, handler: GetCoreSchemaHandler) -> core_schema.CoreSchema:
+        return core_schema.no_info_plain_validator_function(
+            cls.coerce,
+            serialization=core_schema.plain_serializer_function_ser_schema(cls.serialize),
+        )
+
+    @classmethod
+    def __get_pydantic_json_schema__(cls, schema: core_schema.CoreSchema, handler: GetJsonSchemaHandler) -> Dict:
+        return {'type': 'array', 'items': {'type': 'object'}}
@@ -2,6 +2,10 @@ from pydantic import BaseModel, HttpUrl, Field, validator
 from typing import List, Optional, Dict, Any
 from datetime import datetime
 from enum import Enum
+import re
+
+from app.models.content_blocks import ContentBlocks
+from app.utils.url_scope import URLScope
 
 
 class ScrapeStatus(str, Enum):
@@ -15,6 +19,9 @@ class ScrapeRequest(BaseModel):
     url: HttpUrl
     max_depth: Optional[int] = Field(default=3, ge=1, le=10)
     authorization_token: str = Field(..., min_length=10, description="Your website authorization token")
+    include_patterns: List[str] = Field(default=[], description="Only crawl paths matching these globs/prefixes/'re:' regexes")
+    exclude_patterns: List[str] = Field(default=[], description="Never crawl paths matching these patterns")
+    allowed_subdomains: List[str] = Field(default=[], description="Extra hosts to crawl, e.g. 'docs.example.com' or '*.example.com'")
 
     @validator('url')
     def validate_url(cls, v):
@@ -23,6 +30,28 @@ class ScrapeRequest(BaseModel):
             raise ValueError('URL must start with http:// or https://')
         return v
 
+    @validator('include_patterns', 'exclude_patterns')
+    def validate_patterns(cls, v):
+        for pattern in v:
+            try:
+                URLScope._compile([pattern])
+            except re.error as e:
+                raise ValueError(f'Invalid pattern {pattern!r}: {e}')
+        return v
+
+
+class MultiSiteScrapeRequest(BaseModel):
+    """Scrape many sites in one job sharing a single browser pool"""
+    urls: List[HttpUrl] = Field(..., min_items=1, max_items=1000, description="Seed URL of each site")
+    max_depth: Optional[int] = Field(default=3, ge=1, le=10)
+    authorization_token: str = Field(..., min_length=10, description="Your website authorization token")
+
+
+class URLListScrapeRequest(BaseModel):
+    """Scrape exactly these URLs, skipping sitemap discovery"""
+    urls: List[str] = Field(..., min_items=1, description="Page URLs; deduplicated by canonical form")
+    authorization_token: str = Field(..., min_length=10, description="Your website authorization token")
+
 
 class RetryRequest(BaseModel):
     """Request to retry failed URLs"""
@@ -44,13 +73,15 @@ class ContentBlock(BaseModel):
     url: Optional[str] = None  # For image blocks
     alt: Optional[str] = None  # For image blocks
     title: Optional[str] = None  # For image blocks
+    srcset: Optional[str] = None  # For image blocks with responsive variants (absolute URLs)
 
 
 class PageData(BaseModel):
     url: str
     title: Optional[str] = None
-    metadata: Dict[str, str] = {}
-    structured_content: List[Dict[str, Any]] = []  # List of content blocks with images at positions
+    metadata: Dict[str, str] = {}  # Title, meta/OG/Twitter tags and canonical URL from <head>
+    json_ld: List[Any] = []  # Parsed <script type="application/ld+json"> blocks from <head>
+    structured_content: ContentBlocks = Field(default_factory=ContentBlocks)  # Content blocks with images at positions
     all_images: List[str] = []  # All image URLs found on page
     scraped_at: datetime = Field(default_factory=datetime.utcnow)
 
@@ -58,7 +89,9 @@ class PageData(BaseModel):
 class SitemapData(BaseModel):
     total_urls: int
     urls: List[str]
-    hierarchy: Dict[str, List[str]] = {}  # Hierarchical structure: parent -> children
+    # URLTrie of the site's paths with per-node stats: written to sitemap.json as 'tree', served by
+    # GET /scrape/{job_id}/sitemap and kept out of status responses
+    tree: Optional[Any] = Field(default=None, exclude=True)
 
 
 class ScrapeResponse(BaseModel):
@@ -71,6 +104,7 @@ class ScrapeResponse(BaseModel):
     total_pages_scraped: int = 0
     failed_urls: List[FailedURL] = []  # Structured failed URLs
     errors: List[str] = []  # General errors
+    progress: Optional[Dict[str, int]] = None  # Task queue batch counts while a queued job runs
 
 
 class JobSummary(BaseModel):
@@ -0,0 +1,75 @@
+import hashlib
+import re
+from collections import Counter
+from typing import List, Dict, Optional
+
+
+class BoilerplateDetector:
+    """Detect content blocks repeated across a job's pages (nav, cookie banners, footers)"""
+
+    MODES = {'off', 'mark', 'strip'}
+
+    def __init__(self, min_pages: int = 3, min_ratio: float = 0.5):
+        self.min_pages = min_pages
+        self.min_ratio = min_ratio
+
+        self.page_count = 0
+        self.block_frequency: Counter = Counter()  # fingerprint -> number of pages containing it
+        self.blocks: Dict[str, Dict] = {}  # fingerprint -> first block seen
+
+    @staticmethod
+    def fingerprint(block: Dict) -> Optional[str]:
+        """Stable fingerprint for a text or image block"""
+        if block.get('type') == 'text':
+            key = 'text:' + re.sub(r'\s+', ' ', block.get('content', '')).strip().lower()
+        elif block.get('type') == 'image':
+            key = 'image:' + (block.get('url') or '')
+        else:
+            return None
+        return hashlib.sha1(key.encode('utf-8')).hexdigest()[:16]
+
+    def add_page(self, structured_content: List[Dict]):
+        """Count each distinct block once per page"""
+        self.page_count += 1
+        seen = set()
+
+        for block in structured_content:
+            fp = self.fingerprint(block)
+            if fp is None or fp in seen:
+                continue
+            seen.add(fp)
+            self.block_frequency[fp] += 1
+            if fp not in self.blocks:
+                self.blocks[fp] = dict(block)
+
+    def detect(self) -> Dict[str, Dict]:
+        """Return site-wide repeated blocks keyed by fingerprint"""
+        if self.page_count < self.min_pages:
+            return {}
+
+        threshold = max(self.min_pages, self.page_count * self.min_ratio)
+        return {
+            fp: {**self.blocks[fp], 'page_count': count}
+            for fp, count in self.block_frequency.items()
+            if count >= threshold
+        }
+
+    @classmethod
+    def apply(cls, structured_content: List[Dict], boilerplate: Dict[str, Dict], mode: str = 'mark') -> List[Dict]:
+        """
+        Replace boilerplate blocks in a page.
+        'mark' swaps each block for a reference into boilerplate.json, 'strip' drops it.
+        """
+        if mode == 'off' or not boilerplate:
+            return structured_content
+
+        result = []
+        for block in structured_content:
+            fp = cls.fingerprint(block)
+            if fp in boilerplate:
+                if mode == 'mark':
+                    result.append({'type': 'boilerplate', 'ref': fp})
+                continue
+            result.append(block)
+
+        return result
@@ -0,0 +1,188 @@
+import difflib
+from typing import Dict, List
+
+from playwright.async_api import Page
+
+from app.models.content_blocks import ContentBlocks
+from app.services.content_cleaner import ContentCleaner
+
+# Visible text of the page's main content for duplicate/trap detection: <main>/[role=main] if present,
+# else <body>, without nav/header/footer/aside chrome (same rules as ContentCleaner._main_text)
+MAIN_TEXT_JS = """
+    () => {
+        const root = document.querySelector('main, [role="main"]') || document.body;
+        if (!root) return '';
+        const chrome = 'nav, header, footer, aside, script, style, noscript, template, [role="navigation"], '
+            + '[role="banner"], [role="contentinfo"], [role="complementary"]';
+        const walker = document.createTreeWalker(root, NodeFilter.SHOW_ELEMENT | NodeFilter.SHOW_TEXT, {
+            acceptNode: (node) => node.nodeType === Node.ELEMENT_NODE && node.matches(chrome)
+                ? NodeFilter.FILTER_REJECT : NodeFilter.FILTER_ACCEPT
+        });
+        const parts = [];
+        while (walker.nextNode()) {
+            if (walker.currentNode.nodeType === Node.TEXT_NODE) parts.push(walker.currentNode.nodeValue);
+        }
+        return parts.join(' ');
+    }
+"""
+
+
+class BrowserExtractor:
+    """
+    Extract structured content inside the page with one page.evaluate round-trip.
+
+    Walks the live DOM once and returns text/image blocks (same semantics as ContentCleaner),
+    metadata, resolved image URLs including srcset/lazy-load attributes and, on request, links
+    and main content text for discovery, so the DOM is never serialized to Python and reparsed.
+    """
+
+    SCRIPT = """
+        ({skipTags, withLinks, withText}) => {
+            const skip = new Set(skipTags);
+            const lazyAttrs = ['src', 'data-src', 'data-lazy-src', 'data-original'];
+            const blocks = [];
+            const images = new Set();
+
+            const resolve = (value) => {
+                try { return new URL(value, document.baseURI).href; } catch (e) { return null; }
+            };
+            const srcsetUrls = (value) => value ? value.split(',')
+                .map(candidate => candidate.trim().split(/\\s+/)[0])
+                .filter(Boolean) : [];
+
+            const srcsetAttr = (img) => img.getAttribute('srcset') || img.getAttribute('data-srcset');
+            const resolveSrcset = (value) => value ? value.split(',')
+                .map(candidate => candidate.trim().split(/\\s+/))
+                .map(([url, ...descriptor]) => [url && resolve(url), ...descriptor])
+                .filter(parts => parts[0])
+                .map(parts => parts.join(' '))
+                .join(', ') || null : null;
+
+            const imageSource = (img) => {
+                for (const attr of lazyAttrs) {
+                    const value = img.getAttribute(attr);
+                    if (value) return value;
+                }
+                const candidates = srcsetUrls(srcsetAttr(img));
+                return candidates.length ? candidates[0] : null;
+            };
+
+            const walk = (node) => {
+                for (let child = node.firstChild; child; child = child.nextSibling) {
+                    if (child.nodeType === Node.TEXT_NODE) {
+                        const text = child.nodeValue.replace(/\\s+/g, ' ').trim();
+                        if (text) blocks.push(['text', text]);
+                    } else if (child.nodeType === Node.ELEMENT_NODE) {
+                        const tag = child.localName;
+                        if (skip.has(tag)) continue;
+                        if (tag === 'img') {
+                            const src = imageSource(child);
+                            const url = src && resolve(src);
+                            if (url) {
+                                blocks.push(['image', url, child.getAttribute('alt') || '',
+                                             child.getAttribute('title') || '', resolveSrcset(srcsetAttr(child))]);
+                            }
+                            continue;
+                        }
+                        walk(child);
+                    }
+                }
+            };
+            walk(document.body || document.documentElement);
+
+            for (const img of document.querySelectorAll('img')) {
+                for (const attr of lazyAttrs) {
+                    const value = img.getAttribute(attr);
+                    if (value && !value.startsWith('data:')) {
+                        const url = resolve(value);
+                        if (url) images.add(url);
+                    }
+                }
+                for (const attr of ['srcset', 'data-srcset']) {
+                    for (const candidate of srcsetUrls(img.getAttribute(attr))) {
+                        const url = resolve(candidate);
+                        if (url) images.add(url);
+                    }
+                }
+            }
+
+            // Same rules as the Python head parser: <head> only, first occurrence wins
+            const metadata = {};
+            const jsonLd = [];
+            const head = document.head;
+            if (head) {
+                const title = head.querySelector('title');
+                if (title) metadata.title = title.textContent.trim();
+                for (const meta of head.querySelectorAll('meta[content]')) {
+                    const name = meta.getAttribute('name') || meta.getAttribute('property');
+                    if (!name) continue;
+                    const key = name.trim().toLowerCase().replace(/[:.\-]/g, '_');
+                    if (!(key in metadata)) metadata[key] = meta.getAttribute('content');
+                }
+                const canonical = head.querySelector('link[rel~="canonical" i][href]');
+                if (canonical) metadata.canonical = canonical.href;
+                for (const script of head.querySelectorAll('script[type="application/ld+json" i]')) {
+                    try {
+                        const data = JSON.parse(script.textContent);
+                        Array.isArray(data) ? jsonLd.push(...data) : jsonLd.push(data);
+                    } catch (e) { /* malformed block */ }
+                }
+            }
+
+            const links = withLinks ? Array.from(document.querySelectorAll('a[href]'), a => a.href) : [];
+            const text = withText ? (""" + MAIN_TEXT_JS + """)() : '';
+
+            return {blocks, images: Array.from(images), metadata, jsonLd, links, text};
+        }
+    """
+
+    async def extract(self, page: Page, with_links: bool = False, with_text: bool = False) -> Dict:
+        """Extraction result; with_links adds the page's raw links, with_text its main content text ('page_text')"""
+        payload = await page.evaluate(self.SCRIPT, {
+            'skipTags': sorted(ContentCleaner.SKIP_TAGS), 'withLinks': with_links, 'withText': with_text,
+        })
+        extracted = {
+            'metadata': payload['metadata'],
+            'json_ld': payload['jsonLd'],
+            'structured_content': ContentBlocks.from_packed(payload['blocks']),
+            'all_images': payload['images'],
+        }
+        if with_links:
+            extracted['links'] = payload['links']
+        if with_text:
+            extracted['page_text'] = payload['text']
+        return extracted
+
+
+def diff_extractions(url: str, reference: Dict, candidate: Dict) -> Dict:
+    """Compare two extraction results for one page (reference = ContentCleaner)"""
+    reference_blocks = [tuple(sorted(b.items())) for b in reference['structured_content']]
+    candidate_blocks = [tuple(sorted(b.items())) for b in candidate['structured_content']]
+
+    matcher = difflib.SequenceMatcher(None, reference_blocks, candidate_blocks, autojunk=False)
+    metadata_keys = set(reference['metadata']) | set(candidate['metadata'])
+    reference_images = set(reference['all_images'])
+    candidate_images = set(candidate['all_images'])
+
+    return {
+        'url': url,
+        'identical': reference_blocks == candidate_blocks and reference['metadata'] == candidate['metadata'],
+        'block_similarity': round(matcher.ratio(), 4),
+        'reference_blocks': len(reference_blocks),
+        'candidate_blocks': len(candidate_blocks),
+        'metadata_mismatches': sorted(
+            key for key in metadata_keys if reference['metadata'].get(key) != candidate['metadata'].get(key)
+        ),
+        'images_only_in_reference': sorted(reference_images - candidate_images),
+        'images_only_in_candidate': sorted(candidate_images - reference_images),
+    }
+
+
+def summarize_diffs(diffs: List[Dict]) -> Dict:
+    if not diffs:
+        return {'pages_compared': 0}
+    return {
+        'pages_compared': len(diffs),
+        'identical_pages': sum(1 for d in diffs if d['identical']),
+        'mean_block_similarity': round(sum(d['block_similarity'] for d in diffs) / len(diffs), 4),
+    }
@@ -0,0 +1,49 @@
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from typing import Dict, Optional
+from urllib.parse import urlparse
+
+from app.services.browser_supervisor import BrowserSupervisor
+
+
+class BrowserPool:
+    """One browser shared by many scrapers, with a global page budget and per-host politeness"""
+
+    def __init__(self, max_concurrent_pages: int = 20, per_host_concurrency: int = 2, per_host_delay_ms: int = 0,
+                 supervisor: Optional[BrowserSupervisor] = None):
+        self.max_concurrent_pages = max_concurrent_pages
+        self.per_host_concurrency = per_host_concurrency
+        self.per_host_delay = per_host_delay_ms / 1000
+
+        self.supervisor = supervisor or BrowserSupervisor()
+
+        self._pages = asyncio.Semaphore(max_concurrent_pages)
+        self._hosts: Dict[str, asyncio.Semaphore] = {}
+        self._last_request: Dict[str, float] = {}
+
+    async def start(self):
+        await self.supervisor.start()
+
+    async def close(self):
+        await self.supervisor.close()
+
+    @asynccontextmanager
+    async def slot(self, url: str):
+        """Hold one page slot for url, respecting the host's concurrency and request spacing"""
+        host = urlparse(url).netloc
+        host_semaphore = self._hosts.get(host)
+        if host_semaphore is None:
+            host_semaphore = self._hosts[host] = asyncio.Semaphore(self.per_host_concurrency)
+
+        async with host_semaphore:
+            if self.per_host_delay:
+                # Reserve the next request time before sleeping so concurrent waiters space out
+                now = time.monotonic()
+                scheduled = max(now, self._last_request.get(host, 0) + self.per_host_delay)
+                self._last_request[host] = scheduled
+                if scheduled > now:
+                    await asyncio.sleep(scheduled - now)
+
+            async with self._pages:
+                yield
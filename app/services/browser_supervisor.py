@@ -0,0 +1,201 @@
+import asyncio
+import os
+import time
+import uuid
+from contextlib import asynccontextmanager
+from typing import Dict, Optional, Set, Tuple
+
+from playwright.async_api import async_playwright, Browser, Playwright
+
+
+def _browser_tree_rss(marker: bytes, root_pid: Optional[int]) -> Tuple[Optional[int], Optional[int]]:
+    """
+    (root pid, total RSS bytes) of one browser's process tree (Linux /proc only; (None, None) elsewhere).
+    The root is the process whose command line carries marker and whose parent does not; once known,
+    pass it back as root_pid to skip the command-line scan.
+    """
+    if not os.path.isdir('/proc'):
+        return None, None
+
+    children: Dict[int, list] = {}
+    parents: Dict[int, int] = {}
+    rss_pages: Dict[int, int] = {}
+    try:
+        for entry in os.listdir('/proc'):
+            if not entry.isdigit():
+                continue
+            try:
+                with open(f'/proc/{entry}/stat', 'rb') as f:
+                    stat = f.read().rsplit(b')', 1)[1].split()
+                pid = int(entry)
+                parents[pid] = int(stat[1])  # stat[1] = ppid
+                children.setdefault(parents[pid], []).append(pid)
+                rss_pages[pid] = int(stat[21])  # stat[21] = rss in pages
+            except (OSError, IndexError, ValueError):
+                continue
+    except OSError:
+        return None, None
+
+    def marked(pid: int) -> bool:
+        try:
+            with open(f'/proc/{pid}/cmdline', 'rb') as f:
+                return marker in f.read()
+        except OSError:
+            return False
+
+    if root_pid not in rss_pages:
+        root_pid = next((pid for pid in rss_pages if marked(pid) and not marked(parents[pid])), None)
+        if root_pid is None:
+            return None, None
+
+    total = 0
+    stack = [root_pid]
+    while stack:
+        pid = stack.pop()
+        total += rss_pages.get(pid, 0)
+        stack.extend(children.get(pid, []))
+    return root_pid, total * os.sysconf('SC_PAGE_SIZE')
+
+
+class BrowserSupervisor:
+    """
+    Owns the Playwright instance and browser: relaunches after crashes/disconnects and recycles
+    the browser after a number of navigations or when its process tree RSS grows too large.
+    Recycling swaps in a fresh browser for new work; the old one closes once its in-flight pages finish.
+    """
+
+    RSS_CHECK_INTERVAL = 5.0  # Seconds between /proc scans
+
+    def __init__(self, recycle_after_navigations: int = 1000, recycle_rss_mb: int = 0, headless: bool = True):
+        self.recycle_after_navigations = recycle_after_navigations
+        self.recycle_rss_bytes = recycle_rss_mb * 1024 * 1024
+        self.headless = headless
+
+        self.playwright: Optional[Playwright] = None
+        self.browser: Optional[Browser] = None
+        self._in_flight: Dict[Browser, int] = {}
+        self._retiring: Set[Browser] = set()
+        self._lock = asyncio.Lock()
+
+        self.navigations_since_launch = 0
+        self._last_rss_check = 0.0
+        # Unique switch on the current browser's command line, to find its own process tree in /proc
+        self._marker = b''
+        self._browser_pid: Optional[int] = None
+        self.stats = {'launches': 0, 'recycles': 0, 'crashes': 0, 'navigations': 0, 'peak_rss_mb': 0}
+
+    @classmethod
+    def from_settings(cls, settings) -> 'BrowserSupervisor':
+        return cls(
+            recycle_after_navigations=settings.BROWSER_RECYCLE_NAVIGATIONS,
+            recycle_rss_mb=settings.BROWSER_RECYCLE_RSS_MB
+        )
+
+    @property
+    def running(self) -> bool:
+        return self.browser is not None
+
+    async def start(self):
+        async with self._lock:
+            if not self.playwright:
+                self.playwright = await async_playwright().start()
+            if not self.browser:
+                await self._launch()
+
+    async def _launch(self):
+        marker = f"--scraper-browser-id={uuid.uuid4().hex}"
+        browser = await self.playwright.chromium.launch(
+            headless=self.headless,
+            args=['--disable-blink-features=AutomationControlled', marker]
+        )
+        self._marker, self._browser_pid = marker.encode(), None
+        browser.on('disconnected', self._on_disconnected)
+        self.browser = browser
+        self._in_flight[browser] = 0
+        self.navigations_since_launch = 0
+        self.stats['launches'] += 1
+
+    def _on_disconnected(self, browser: Browser):
+        self._in_flight.pop(browser, None)
+        if browser in self._retiring:
+            self._retiring.discard(browser)
+            return
+        if browser is self.browser:
+            # Unexpected: crash or killed process; the next session relaunches
+            self.browser = None
+            self.stats['crashes'] += 1
+            print("💥 Browser disconnected; relaunching on next page")
+
+    async def _needs_recycle(self) -> bool:
+        if self.recycle_after_navigations and self.navigations_since_launch >= self.recycle_after_navigations:
+            return True
+        if self.recycle_rss_bytes and time.monotonic() - self._last_rss_check >= self.RSS_CHECK_INTERVAL:
+            self._last_rss_check = time.monotonic()
+            # Only this supervisor's current browser: not other jobs' browsers, retiring ones or the driver
+            self._browser_pid, rss = await asyncio.to_thread(_browser_tree_rss, self._marker, self._browser_pid)
+            if rss is not None:
+                self.stats['peak_rss_mb'] = max(self.stats['peak_rss_mb'], rss // (1024 * 1024))
+                return rss >= self.recycle_rss_bytes
+        return False
+
+    async def _recycle(self):
+        old = self.browser
+        self._retiring.add(old)
+        await self._launch()
+        self.stats['recycles'] += 1
+        print(f"♻️  Recycled browser (launch #{self.stats['launches']})")
+        if self._in_flight.get(old, 0) == 0:
+            await self._close_browser(old)
+
+    async def _close_browser(self, browser: Browser):
+        self._in_flight.pop(browser, None)
+        try:
+            await browser.close()
+        except Exception:
+            pass
+        self._retiring.discard(browser)
+
+    @asynccontextmanager
+    async def session(self):
+        """Yield a healthy browser for one navigation, relaunching or recycling first if needed"""
+        async with self._lock:
+            if not self.playwright:
+                self.playwright = await async_playwright().start()
+            if not self.browser or not self.browser.is_connected():
+                await self._launch()
+            elif await self._needs_recycle():
+                await self._recycle()
+
+            browser = self.browser
+            self._in_flight[browser] = self._in_flight.get(browser, 0) + 1
+            self.navigations_since_launch += 1
+            self.stats['navigations'] += 1
+
+        try:
+            yield browser
+        finally:
+            remaining = self._in_flight.get(browser, 0) - 1
+            if browser in self._in_flight:
+                self._in_flight[browser] = remaining
+            if browser in self._retiring and remaining <= 0:
+                await self._close_browser(browser)
+
+    def report(self, baseline: Optional[Dict] = None) -> Dict:
+        """Counters, optionally relative to an earlier stats snapshot (one job on a shared pool)"""
+        baseline = baseline or {}
+        report = {key: value - baseline.get(key, 0) for key, value in self.stats.items() if key != 'peak_rss_mb'}
+        report['peak_rss_mb'] = self.stats['peak_rss_mb']
+        report['restarts'] = report['recycles'] + report['crashes']
+        return report
+
+    async def close(self):
+        async with self._lock:
+            # Detach first so the disconnect events of a deliberate close are not counted as crashes
+            self.browser = None
+            browsers = set(self._in_flight) | self._retiring
+            self._retiring |= browsers
+            for browser in browsers:
+                await self._close_browser(browser)
+            if self.playwright:
+                await self.playwright.stop()
+                self.playwright = None
@@ -2,11 +2,42 @@ from bs4 import BeautifulSoup, NavigableString, Tag
 import re
 from typing import List, Dict, Optional
 
+from app.services.head_metadata import extract_head_metadata
+from app.services.image_catalog import srcset_candidates
+
 
 class ContentCleaner:
     """Clean and extract readable text from HTML content with image positions preserved"""
 
     SKIP_TAGS = {'script', 'style', 'meta', 'link', 'noscript', 'iframe', 'svg', 'head'}
+    LAZY_ATTRS = ('src', 'data-src', 'data-lazy-src', 'data-original')  # Same order as the browser extractor
+    # Page chrome left out of the main text (same rules as the browser's MAIN_TEXT_JS)
+    CHROME_TAGS = ['nav', 'header', 'footer', 'aside']
+    CHROME_ROLES = ['navigation', 'banner', 'contentinfo', 'complementary']
+
+    @staticmethod
+    def _srcset(img: Tag) -> Optional[str]:
+        return img.get('srcset') or img.get('data-srcset')
+
+    @staticmethod
+    def _resolve_srcset(srcset: Optional[str], base_url: str) -> str:
+        """srcset with each candidate URL made absolute ('a.png 480w, b.png 800w')"""
+        from urllib.parse import urljoin
+
+        resolved = []
+        for candidate in srcset_candidates(srcset):
+            url, _, descriptor = candidate.partition(' ')
+            resolved.append(f"{urljoin(base_url, url)} {descriptor}".rstrip())
+        return ', '.join(resolved)
+
+    @staticmethod
+    def _image_source(img: Tag) -> Optional[str]:
+        """First lazy-load/src attribute, else the first srcset candidate"""
+        for attr in ContentCleaner.LAZY_ATTRS:
+            if img.get(attr):
+                return img[attr]
+        candidates = srcset_candidates(ContentCleaner._srcset(img))
+        return candidates[0].split(' ')[0] if candidates else None
 
     @staticmethod
     def clean_html_to_structured_content(html_content: str, base_url: str) -> List[Dict]:
@@ -14,9 +45,12 @@ class ContentCleaner:
         Convert HTML to structured content preserving image positions
         Returns a list of content blocks (text or image)
         """
-        from urllib.parse import urljoin
+        return ContentCleaner._structured_content(BeautifulSoup(html_content, 'lxml'), base_url)
 
-        soup = BeautifulSoup(html_content, 'lxml')
+    @staticmethod
+    def _structured_content(soup: BeautifulSoup, base_url: str) -> List[Dict]:
+        """Structured content of a parsed document (removes SKIP_TAGS from the soup)"""
+        from urllib.parse import urljoin
 
         # Remove unwanted tags
         for tag in soup(ContentCleaner.SKIP_TAGS):
@@ -42,15 +76,19 @@ class ContentCleaner:
                     })
             elif isinstance(element, Tag):
                 if element.name == 'img':
-                    src = element.get('src') or element.get('data-src')
+                    src = ContentCleaner._image_source(element)
                     if src:
                         full_url = urljoin(base_url, src)
-                        content_blocks.append({
+                        block = {
                             'type': 'image',
                             'url': full_url,
                             'alt': element.get('alt', ''),
                             'title': element.get('title', '')
-                        })
+                        }
+                        srcset = ContentCleaner._resolve_srcset(ContentCleaner._srcset(element), base_url)
+                        if srcset:
+                            block['srcset'] = srcset
+                        content_blocks.append(block)
                 elif element.name in ['p', 'div', 'article', 'section', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'li', 'td',
                                       'th']:
                     # Process children recursively
@@ -80,57 +118,54 @@ class ContentCleaner:
 
     @staticmethod
     def extract_all_images(html_content: str, base_url: str) -> List[str]:
-        """Extract all image URLs from HTML"""
+        """Extract all image URLs from HTML (src, lazy-load attributes and srcset candidates)"""
+        return ContentCleaner._all_images(BeautifulSoup(html_content, 'lxml'), base_url)
+
+    @staticmethod
+    def _all_images(soup: BeautifulSoup, base_url: str) -> List[str]:
         from urllib.parse import urljoin
 
-        soup = BeautifulSoup(html_content, 'lxml')
         images = []
 
         for img in soup.find_all('img'):
-            src = img.get('src') or img.get('data-src')
-            if src:
-                full_url = urljoin(base_url, src)
-                images.append(full_url)
+            for attr in ContentCleaner.LAZY_ATTRS:
+                src = img.get(attr)
+                if src and not src.startswith('data:'):
+                    images.append(urljoin(base_url, src))
+            for attr in ('srcset', 'data-srcset'):
+                for candidate in srcset_candidates(img.get(attr)):
+                    images.append(urljoin(base_url, candidate.split(' ')[0]))
 
-        return list(set(images))  # Remove duplicates
+        return list(dict.fromkeys(images))  # Remove duplicates, keeping document order
 
     @staticmethod
-    def extract_metadata(html_content: str) -> Dict[str, str]:
-        """Extract metadata from HTML"""
+    def extract_metadata(html_content: str, base_url: Optional[str] = None) -> Dict[str, str]:
+        """Extract metadata (title, meta/OG/Twitter tags, canonical URL) from the document head"""
+        return extract_head_metadata(html_content, base_url)['metadata']
+
+    @staticmethod
+    def _main_text(soup: BeautifulSoup) -> str:
+        """Text of <main>/[role=main] (else <body>) without nav/header/footer/aside (removes them from the soup)"""
+        root = soup.find('main') or soup.find(attrs={'role': 'main'}) or soup.find('body') or soup
+        for tag in root.find_all(ContentCleaner.CHROME_TAGS) + root.find_all(attrs={'role': ContentCleaner.CHROME_ROLES}):
+            if not tag.decomposed:
+                tag.decompose()
+        return root.get_text(' ')
+
+    @staticmethod
+    def extract_page(html_content: str, url: str, with_text: bool = False) -> Dict:
+        """
+        Run the full extraction for one page (picklable entry point for worker processes);
+        with_text adds the main content text for duplicate/trap detection ('page_text')
+        """
+        head = extract_head_metadata(html_content, url)
         soup = BeautifulSoup(html_content, 'lxml')
-        metadata = {}
-
-        # Title
-        title_tag = soup.find('title')
-        if title_tag:
-            metadata['title'] = title_tag.get_text().strip()
-
-        # Meta description
-        meta_desc = soup.find('meta', attrs={'name': 'description'})
-        if meta_desc:
-            metadata['description'] = meta_desc.get('content', '')
-
-        # Meta keywords
-        meta_keywords = soup.find('meta', attrs={'name': 'keywords'})
-        if meta_keywords:
-            metadata['keywords'] = meta_keywords.get('content', '')
-
-        # Open Graph tags
-        og_title = soup.find('meta', attrs={'property': 'og:title'})
-        if og_title:
-            metadata['og_title'] = og_title.get('content', '')
-
-        og_desc = soup.find('meta', attrs={'property': 'og:description'})
-        if og_desc:
-            metadata['og_description'] = og_desc.get('content', '')
-
-        og_image = soup.find('meta', attrs={'property': 'og:image'})
-        if og_image:
-            metadata['og_image'] = og_image.get('content', '')
-
-        # Author
-        author = soup.find('meta', attrs={'name': 'author'})
-        if author:
-            metadata['author'] = author.get('content', '')
-
-        return metadata
+        extracted = {
+            'metadata': head['metadata'],
+            'json_ld': head['json_ld'],
+            'all_images': ContentCleaner._all_images(soup, url),
+            'structured_content': ContentCleaner._structured_content(soup, url),
+        }
+        if with_text:
+            extracted['page_text'] = ContentCleaner._main_text(soup)
+        return extracted
@@ -0,0 +1,145 @@
+import hashlib
+import re
+from collections import Counter
+from typing import List, Dict, Optional, Tuple
+
+
+class NearDuplicateDetector:
+    """Incremental SimHash near-duplicate detection over a page's main content text"""
+
+    HASH_BITS = 64
+    SHINGLE_SIZE = 3
+    MIN_TOKENS = 50  # Default: shorter pages are never fingerprinted nor declared duplicates
+
+    def __init__(self, max_distance: int = 3, min_tokens: int = MIN_TOKENS, canonical_max_distance: int = 12):
+        self.max_distance = max_distance
+        self.canonical_max_distance = max(canonical_max_distance, max_distance)
+        self.min_tokens = max(min_tokens, self.SHINGLE_SIZE)
+
+        # Pigeonhole: with max_distance + 1 bands, two hashes within max_distance bits share a band
+        self.band_count = max_distance + 1
+        self.band_bits = self.HASH_BITS // self.band_count
+        self.band_mask = (1 << self.band_bits) - 1
+
+        self.bands: List[Dict[int, List[Tuple[str, int]]]] = [{} for _ in range(self.band_count)]
+        self.fingerprints: Dict[str, int] = {}  # URL -> SimHash
+        self.canonical: Dict[str, str] = {}  # Duplicate URL -> canonical URL
+        self.clusters: Dict[str, List[str]] = {}  # Canonical URL -> duplicate URLs
+        self.declared_canonicals: Dict[str, str] = {}  # rel=canonical target -> first page declaring it
+
+    @classmethod
+    def simhash(cls, text: str, min_tokens: Optional[int] = None) -> Optional[int]:
+        """Compute a 64-bit SimHash over word shingles (None below min_tokens words)"""
+        tokens = re.findall(r'\w+', text.lower())
+        if len(tokens) < (cls.MIN_TOKENS if min_tokens is None else min_tokens):
+            return None
+
+        shingles = Counter(
+            ' '.join(tokens[i:i + cls.SHINGLE_SIZE])
+            for i in range(len(tokens) - cls.SHINGLE_SIZE + 1)
+        )
+
+        weights = [0] * cls.HASH_BITS
+        for shingle, weight in shingles.items():
+            h = int.from_bytes(hashlib.blake2b(shingle.encode('utf-8'), digest_size=8).digest(), 'big')
+            for bit in range(cls.HASH_BITS):
+                if h >> bit & 1:
+                    weights[bit] += weight
+                else:
+                    weights[bit] -= weight
+
+        fingerprint = 0
+        for bit, weight in enumerate(weights):
+            if weight > 0:
+                fingerprint |= 1 << bit
+        return fingerprint
+
+    def _band_keys(self, fingerprint: int) -> List[int]:
+        return [(fingerprint >> (i * self.band_bits)) & self.band_mask for i in range(self.band_count)]
+
+    def is_known(self, url: str) -> bool:
+        return url in self.fingerprints or url in self.canonical
+
+    def check(self, url: str, text: str) -> Optional[str]:
+        """
+        Register a page and return the canonical URL if it is a near-duplicate.
+        Returns None for pages that become (or already are) canonical.
+        """
+        if url in self.canonical:
+            return self.canonical[url]
+        if url in self.fingerprints:
+            return None
+
+        fingerprint = self.simhash(text, self.min_tokens)
+        if fingerprint is None:
+            return None
+
+        keys = self._band_keys(fingerprint)
+
+        for band, key in zip(self.bands, keys):
+            for candidate_url, candidate in band.get(key, []):
+                if candidate_url in self.canonical:
+                    continue  # Taken over by its rel=canonical target
+                if bin(fingerprint ^ candidate).count('1') <= self.max_distance:
+                    self.canonical[url] = candidate_url
+                    self.clusters.setdefault(candidate_url, []).append(url)
+                    return candidate_url
+
+        self.fingerprints[url] = fingerprint
+        for band, key in zip(self.bands, keys):
+            band.setdefault(key, []).append((url, fingerprint))
+
+        return None
+
+    def check_canonical(self, url: str, declared: Optional[str], text: str = '') -> Optional[str]:
+        """
+        Register a page's rel=canonical target; returns the page it duplicates when an earlier
+        page declared the same target (or is that target) and their fingerprints are within
+        canonical_max_distance bits, so a template pointing every canonical at the homepage does
+        not collapse the site. The target page itself always owns its URL: a similar variant
+        that claimed it first becomes the target's duplicate.
+        """
+        if url in self.canonical:
+            return self.canonical[url]
+        if not declared:
+            return None
+
+        fingerprint = self.fingerprints.get(url)
+        if fingerprint is None and text:
+            fingerprint = self.simhash(text, self.min_tokens)
+
+        # A page declaring itself canonical claims its own URL
+        previous = self.declared_canonicals.get(url)
+        self.declared_canonicals[url] = url
+        if previous and previous != url and self._similar(fingerprint, previous):
+            self._reassign(previous, url)
+
+        owner = self.declared_canonicals.setdefault(declared, url)
+        if owner == url or not self._similar(fingerprint, owner):
+            return None
+
+        self.canonical[url] = owner
+        self.clusters.setdefault(owner, []).append(url)
+        return owner
+
+    def _similar(self, fingerprint: Optional[int], other_url: str) -> bool:
+        """Whether a fingerprint is close to another page's (pages without one never match)"""
+        other = self.fingerprints.get(other_url)
+        if fingerprint is None or other is None:
+            return False
+        return bin(fingerprint ^ other).count('1') <= self.canonical_max_distance
+
+    def _reassign(self, displaced: str, owner: str):
+        """Make a page that held owner's URL (and everything clustered under it) a duplicate of owner"""
+        moved = [displaced] + self.clusters.pop(displaced, [])
+        for duplicate in moved:
+            self.canonical[duplicate] = owner
+        self.clusters.setdefault(owner, []).extend(moved)
+        for target, holder in self.declared_canonicals.items():
+            if holder == displaced:
+                self.declared_canonicals[target] = owner
+        print(f"♊ Canonical duplicate: {displaced} → {owner} (target page took over its URL)")
+
+    @property
+    def duplicate_count(self) -> int:
+        return len(self.canonical)
@@ -0,0 +1,107 @@
+import json
+from html.parser import HTMLParser
+from typing import Any, Dict, List, Optional
+from urllib.parse import urljoin
+
+
+class _HeadDone(Exception):
+    """Raised by the parser to stop at the end of <head>"""
+
+
+class HeadMetadataParser(HTMLParser):
+    """
+    Streaming <head> parser: title, every named/property meta tag, rel=canonical and JSON-LD
+    blocks in one pass. Parsing stops at </head> or the first element or text that can only
+    belong to the body, so the cost does not grow with the rest of the page.
+    """
+
+    HEAD_TAGS = {'html', 'head', 'title', 'meta', 'link', 'script', 'style', 'base', 'noscript', 'template'}
+    CHUNK_SIZE = 16 * 1024
+
+    def __init__(self, base_url: Optional[str] = None):
+        super().__init__(convert_charrefs=True)
+        self.base_url = base_url
+        self.metadata: Dict[str, str] = {}
+        self.json_ld: List[Any] = []
+        self._capture: Optional[str] = None  # 'title', 'json_ld' or 'skip' (other script/style)
+        self._buffer: List[str] = []
+
+    @staticmethod
+    def meta_key(name: str) -> str:
+        """'og:title' -> 'og_title', 'twitter:card' -> 'twitter_card', 'theme-color' -> 'theme_color'"""
+        return name.strip().lower().replace(':', '_').replace('-', '_').replace('.', '_')
+
+    def handle_starttag(self, tag: str, attrs):
+        if self._capture == 'skip':
+            return  # Inside <noscript>/<template>/<style>: e.g. a tracking <img> must not end the head
+        if tag not in self.HEAD_TAGS:
+            raise _HeadDone
+        attributes = {key: value or '' for key, value in attrs}
+
+        if tag == 'base' and attributes.get('href'):
+            self.base_url = urljoin(self.base_url or '', attributes['href'])
+        elif tag == 'meta':
+            name = attributes.get('name') or attributes.get('property')
+            if name and 'content' in attributes:
+                # First occurrence wins, as with the previous find()-based extraction
+                self.metadata.setdefault(self.meta_key(name), attributes['content'])
+        elif tag == 'link':
+            if 'canonical' in attributes.get('rel', '').lower().split() and attributes.get('href'):
+                self.metadata.setdefault('canonical', urljoin(self.base_url or '', attributes['href']))
+        elif tag == 'title':
+            self._capture, self._buffer = 'title', []
+        elif tag == 'script':
+            is_json_ld = attributes.get('type', '').strip().lower() == 'application/ld+json'
+            self._capture, self._buffer = ('json_ld' if is_json_ld else 'skip'), []
+        elif tag in ('style', 'noscript', 'template'):
+            self._capture = 'skip'
+
+    def handle_startendtag(self, tag: str, attrs):
+        self.handle_starttag(tag, attrs)
+        if tag in ('title', 'script'):
+            self.handle_endtag(tag)
+
+    def handle_endtag(self, tag: str):
+        if tag == 'head':
+            raise _HeadDone
+        if tag == 'title' and self._capture == 'title':
+            self.metadata.setdefault('title', ''.join(self._buffer).strip())
+            self._capture = None
+        elif tag == 'script' and self._capture in ('json_ld', 'skip'):
+            if self._capture == 'json_ld':
+                self._add_json_ld(''.join(self._buffer))
+            self._capture = None
+        elif tag in ('style', 'noscript', 'template') and self._capture == 'skip':
+            self._capture = None
+
+    def handle_data(self, data: str):
+        if self._capture in ('title', 'json_ld'):
+            self._buffer.append(data)
+        elif self._capture is None and data.strip():
+            # Text outside head elements starts the body
+            raise _HeadDone
+
+    def _add_json_ld(self, raw: str):
+        try:
+            data = json.loads(raw)
+        except ValueError:
+            return  # Malformed blocks are common in the wild; skip them
+        if isinstance(data, list):
+            self.json_ld.extend(data)
+        else:
+            self.json_ld.append(data)
+
+    def parse(self, html_content: str) -> 'HeadMetadataParser':
+        try:
+            for start in range(0, len(html_content), self.CHUNK_SIZE):
+                self.feed(html_content[start:start + self.CHUNK_SIZE])
+            self.close()
+        except _HeadDone:
+            pass
+        return self
+
+
+def extract_head_metadata(html_content: str, base_url: Optional[str] = None) -> Dict:
+    """{'metadata': {...}, 'json_ld': [...]} from the document head"""
+    parser = HeadMetadataParser(base_url).parse(html_content or '')
+    return {'metadata': parser.metadata, 'json_ld': parser.json_ld}
@@ -0,0 +1,137 @@
+import hashlib
+from typing import Dict, Iterable, List, Optional
+
+from app.utils.validators import URLValidator
+
+
+def srcset_candidates(srcset: Optional[str]) -> List[str]:
+    """'a.png 480w, b.png 800w' -> ['a.png 480w', 'b.png 800w'] (URL plus optional descriptor)"""
+    if not srcset:
+        return []
+    return [' '.join(candidate.split()) for candidate in srcset.split(',') if candidate.strip()]
+
+
+class ImageCatalog:
+    """
+    Job-level catalog of image assets, one record per canonical image URL: the alt texts it was
+    used with, its srcset variants, the first page it appeared on and how many pages use it.
+    With mode 'ref' pages store catalog IDs instead of repeating the URLs.
+    """
+
+    MODES = {'off', 'index', 'ref'}
+    MAX_ALTS = 20  # Distinct alt texts kept per image
+
+    def __init__(self, mode: str = 'index', records: Optional[Dict[str, Dict]] = None, page_count: int = 0):
+        self.mode = mode
+        self.records: Dict[str, Dict] = records or {}  # ID -> record
+        self.page_count = page_count
+        self._ids: Dict[str, str] = {}  # URL as found on pages -> ID
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    @staticmethod
+    def catalogued(block: Dict) -> bool:
+        """Image blocks with a real URL (inline data: URIs stay in the page)"""
+        return block.get('type') == 'image' and bool(block.get('url')) and not block['url'].startswith('data:')
+
+    def image_id(self, url: str) -> str:
+        """Stable ID for an image: hash of its canonical URL"""
+        image_id = self._ids.get(url)
+        if image_id is None:
+            canonical = URLValidator.canonical_form(url)
+            image_id = self._ids[url] = hashlib.sha1(canonical.encode('utf-8')).hexdigest()[:16]
+        return image_id
+
+    def _record(self, url: str, page_url: str) -> str:
+        image_id = self.image_id(url)
+        if image_id not in self.records:
+            self.records[image_id] = {'url': url, 'first_seen': page_url, 'page_count': 0, 'alts': [], 'srcset': []}
+        return image_id
+
+    def add_page(self, page_url: str, structured_content: Iterable[Dict], all_images: Iterable[str]):
+        """Record a page's image blocks and image URLs, counting each image once per page"""
+        self.page_count += 1
+        seen = set()
+
+        for block in structured_content:
+            if not self.catalogued(block):
+                continue
+            image_id = self._record(block['url'], page_url)
+            record = self.records[image_id]
+            seen.add(image_id)
+
+            alt = (block.get('alt') or '').strip()
+            if alt and alt not in record['alts'] and len(record['alts']) < self.MAX_ALTS:
+                record['alts'].append(alt)
+            for candidate in srcset_candidates(block.get('srcset')):
+                if candidate not in record['srcset']:
+                    record['srcset'].append(candidate)
+
+        for url in all_images:
+            seen.add(self._record(url, page_url))
+
+        for image_id in seen:
+            self.records[image_id]['page_count'] += 1
+
+    def _reference_block(self, block: Dict) -> Dict:
+        image_id = self.image_id(block['url'])
+        referenced = {'type': 'image', 'id': image_id, 'alt': block.get('alt', ''), 'title': block.get('title', '')}
+        candidates = srcset_candidates(block.get('srcset'))
+        if candidates:
+            # The block's own variants, as positions in the record's srcset list
+            known = {candidate: i for i, candidate in enumerate(self.records.get(image_id, {}).get('srcset', []))}
+            if all(candidate in known for candidate in candidates):
+                referenced['variants'] = [known[candidate] for candidate in candidates]
+            else:
+                referenced['srcset'] = block['srcset']
+        return referenced
+
+    def reference_page(self, page: Dict) -> Dict:
+        """
+        Page dict with image URLs replaced by catalog IDs: all_images -> image_ids, image blocks keep
+        alt/title and their own srcset as indices into the record's variants
+        """
+        blocks = [self._reference_block(block) if self.catalogued(block) else block
+                  for block in page['structured_content']]
+
+        referenced = {key: value for key, value in page.items() if key != 'all_images'}
+        referenced['structured_content'] = blocks
+        referenced['image_ids'] = [self.image_id(url) for url in page.get('all_images', [])]
+        return referenced
+
+    def resolve_page(self, page: Dict) -> Dict:
+        """Inverse of reference_page (pages without image_ids are returned unchanged)"""
+        if 'image_ids' not in page:
+            return page
+
+        blocks = []
+        for block in page.get('structured_content', []):
+            record = self.records.get(block.get('id')) if block.get('type') == 'image' else None
+            if record:
+                resolved_block = {'type': 'image', 'url': record['url'], 'alt': block.get('alt', ''),
+                                  'title': block.get('title', '')}
+                if 'variants' in block:
+                    resolved_block['srcset'] = ', '.join(record['srcset'][i] for i in block['variants'])
+                elif block.get('srcset'):
+                    resolved_block['srcset'] = block['srcset']
+                block = resolved_block
+            blocks.append(block)
+
+        resolved = {key: value for key, value in page.items() if key != 'image_ids'}
+        resolved['structured_content'] = blocks
+        resolved['all_images'] = [self.records[i]['url'] for i in page['image_ids'] if i in self.records]
+        return resolved
+
+    def to_dict(self) -> Dict:
+        return {
+            'mode': self.mode,
+            'pages_analyzed': self.page_count,
+            'total_images': len(self.records),
+            'images': self.records,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'ImageCatalog':
+        return cls(mode=data.get('mode', 'index'), records=data.get('images', {}),
+                   page_count=data.get('pages_analyzed', 0))
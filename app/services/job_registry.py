@@ -0,0 +1,295 @@
+import asyncio
+import sys
+import uuid
+from collections import OrderedDict
+from collections.abc import MutableMapping
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Iterator, Tuple
+
+from pydantic import BaseModel
+
+from app.models.content_blocks import ContentBlocks
+from app.models.schemas import PageData
+from app.services.image_catalog import ImageCatalog
+from app.services.page_store import PageStore
+from app.utils.serialization import read_json_file
+
+
+def load_pages_from_disk(output_directory: str, pages_data: Optional[List[Dict]] = None) -> Optional[List[PageData]]:
+    """
+    Parse a job's pages.json merged with any retry segments (or already-merged page dicts), or None
+    if it has not been written. Images referenced by catalog ID are resolved from images.json.
+    """
+    if pages_data is None:
+        store = PageStore(Path(output_directory))
+        if not store.pages_file.exists() and not store.has_segments():
+            return None
+        pages_data = store.load_merged()
+
+    catalog_file = Path(output_directory) / "images.json"
+    if catalog_file.exists() and any('image_ids' in page_dict for page_dict in pages_data):
+        catalog = ImageCatalog.from_dict(read_json_file(catalog_file))
+        pages_data = [catalog.resolve_page(page_dict) for page_dict in pages_data]
+
+    return [
+        PageData(
+            url=page_dict['url'],
+            title=page_dict.get('title'),
+            metadata=page_dict.get('metadata', {}),
+            json_ld=page_dict.get('json_ld', []),
+            structured_content=page_dict.get('structured_content', []),
+            all_images=page_dict.get('all_images', []),
+            scraped_at=datetime.fromisoformat(page_dict['scraped_at']) if page_dict.get(
+                'scraped_at') else datetime.utcnow()
+        )
+        for page_dict in pages_data
+    ]
+
+
+# Part of every ETag, so versions from before a restart never match
+INSTANCE_ID = uuid.uuid4().hex[:12]
+
+
+class JobRecord(dict):
+    """
+    Job dict whose version changes on every mutation (drives ETags and response caching).
+    Versions come from the registry-wide counter, so a replaced record never reuses one.
+    """
+
+    __slots__ = ('version', '_next_version')
+
+    def __init__(self, data: Dict, next_version: Callable[[], int]):
+        super().__init__(data)
+        self._next_version = next_version
+        self.version = next_version()
+
+    def touch(self):
+        self.version = self._next_version()
+
+    def __setitem__(self, key, value):
+        super().__setitem__(key, value)
+        self.touch()
+
+    def __delitem__(self, key):
+        super().__delitem__(key)
+        self.touch()
+
+    def update(self, *args, **kwargs):
+        super().update(*args, **kwargs)
+        self.touch()
+
+    def setdefault(self, key, default=None):
+        if key not in self:
+            self.touch()
+        return super().setdefault(key, default)
+
+    def pop(self, *args):
+        result = super().pop(*args)
+        self.touch()
+        return result
+
+    def popitem(self):
+        result = super().popitem()
+        self.touch()
+        return result
+
+    def clear(self):
+        super().clear()
+        self.touch()
+
+
+class PageCache:
+    """LRU cache of page payloads (or other sized values) bounded by an approximate byte budget"""
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.entries: "OrderedDict[str, tuple[Any, int]]" = OrderedDict()
+        self.resident_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: str) -> Optional[Any]:
+        entry = self.entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self.entries.move_to_end(key)
+        return entry[0]
+
+    def put(self, key: str, pages: Any, size: int):
+        self.discard(key)
+        if size > self.max_bytes:
+            return  # Would evict everything else and still not fit; serve uncached
+
+        self.entries[key] = (pages, size)
+        self.resident_bytes += size
+        while self.resident_bytes > self.max_bytes:
+            _, (_, evicted_size) = self.entries.popitem(last=False)
+            self.resident_bytes -= evicted_size
+            self.evictions += 1
+
+    def discard(self, key: str):
+        entry = self.entries.pop(key, None)
+        if entry is not None:
+            self.resident_bytes -= entry[1]
+
+    def discard_prefix(self, prefix: str):
+        for key in [key for key in self.entries if key.startswith(prefix)]:
+            self.discard(key)
+
+    def clear(self):
+        self.entries.clear()
+        self.resident_bytes = 0
+
+    def stats(self) -> Dict:
+        lookups = self.hits + self.misses
+        return {
+            'max_bytes': self.max_bytes,
+            'resident_bytes': self.resident_bytes,
+            'resident_jobs': len(self.entries),
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / lookups, 3) if lookups else 0.0,
+            'evictions': self.evictions,
+        }
+
+
+class JobRegistry(MutableMapping):
+    """
+    Job ID -> lightweight job dict (a JobRecord), always resident.
+    Page payloads live in a PageCache and are reloaded from the job directory on demand.
+    Serialized API responses are cached per job and version; the registry version changes
+    whenever any job does.
+    """
+
+    JOBS_LIST_KEY = '__jobs__'
+
+    def __init__(self, max_page_bytes: int, max_response_bytes: int = 0):
+        self._jobs: Dict[str, JobRecord] = {}
+        self.page_cache = PageCache(max_page_bytes)
+        self.response_cache = PageCache(max_response_bytes)
+        self.version = 0
+
+    def _changed(self) -> int:
+        self.version += 1
+        return self.version
+
+    def __getitem__(self, job_id: str) -> JobRecord:
+        return self._jobs[job_id]
+
+    def __setitem__(self, job_id: str, job_data: Dict):
+        self._jobs[job_id] = JobRecord(job_data, self._changed)
+        self.response_cache.discard(job_id)
+
+    def __delitem__(self, job_id: str):
+        del self._jobs[job_id]
+        self.page_cache.discard(job_id)
+        self.response_cache.discard(job_id)
+        self.response_cache.discard_prefix(f"{job_id}|")
+        self._changed()
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._jobs)
+
+    def __len__(self) -> int:
+        return len(self._jobs)
+
+    def clear(self):
+        self._jobs.clear()
+        self.page_cache.clear()
+        self.response_cache.clear()
+        self._changed()
+
+    @staticmethod
+    def _resident_size(pages: List[PageData]) -> int:
+        """
+        Estimated memory held by pages: sys.getsizeof over every reachable object, shared (interned)
+        strings counted once. pages.json on disk is roughly half of this, so it can't be the budget.
+        """
+        seen = set()
+        total = 0
+        stack: List[Any] = list(pages)
+        while stack:
+            obj = stack.pop()
+            if id(obj) in seen:
+                continue
+            seen.add(id(obj))
+            total += sys.getsizeof(obj)
+            if isinstance(obj, dict):
+                stack.extend(obj.keys())
+                stack.extend(obj.values())
+            elif isinstance(obj, (list, tuple, set)):
+                stack.extend(obj)
+            elif isinstance(obj, ContentBlocks):
+                stack.append(obj._blocks)
+            elif isinstance(obj, BaseModel):
+                stack.append(obj.__dict__)
+        return total
+
+    @classmethod
+    def _load_pages(cls, output_directory: str) -> Tuple[Optional[List[PageData]], int]:
+        pages = load_pages_from_disk(output_directory)
+        return pages, cls._resident_size(pages) if pages is not None else 0
+
+    async def set_pages(self, job_id: str, pages: List[PageData]):
+        """New page results for a job (bumps its version)"""
+        job_data = self._jobs[job_id]
+        size = await asyncio.to_thread(self._resident_size, pages)
+        self.page_cache.put(job_id, pages, size)
+        job_data.touch()
+
+    def discard_pages(self, job_id: str):
+        """Drop cached pages whose files changed on disk; they are reloaded on next access"""
+        self.page_cache.discard(job_id)
+        self._jobs[job_id].touch()
+
+    async def get_pages(self, job_id: str) -> Optional[List[PageData]]:
+        pages = self.page_cache.get(job_id)
+        if pages is not None:
+            return pages
+
+        job_data = self._jobs[job_id]
+        output_directory = job_data.get('output_directory')
+        if not output_directory:
+            return None
+
+        # Parsing pages.json is what makes a cold status call slow: done in a thread, cached on the loop
+        pages, size = await asyncio.to_thread(self._load_pages, output_directory)
+        if pages is not None:
+            self.page_cache.put(job_id, pages, size)  # A reload, not a change: version stays
+        return pages
+
+    def etag(self, job_id: Optional[str] = None) -> str:
+        """Weak ETag for one job's response, or for the jobs list when job_id is None"""
+        if job_id is None:
+            return f'W/"{INSTANCE_ID}-jobs-{self.version}"'
+        return f'W/"{INSTANCE_ID}-{job_id}-{self._jobs[job_id].version}"'
+
+    def response_version(self, job_id: Optional[str]) -> int:
+        return self._jobs[job_id].version if job_id else self.version
+
+    async def cached_response(self, job_id: Optional[str], build: Callable[[], Awaitable[Any]], variant: str = '',
+                              size: Callable[[Any], int] = len) -> Any:
+        """
+        Serialized response (or other value derived from the job, per variant) for the current
+        version, built at most once per version
+        """
+        key = job_id or self.JOBS_LIST_KEY
+        if variant:
+            key = f"{key}|{variant}"
+        version = self.response_version(job_id)
+
+        entry = self.response_cache.get(key)
+        if entry is not None and entry[0] == version:
+            return entry[1]
+
+        # Cached under the version it was started for; a change during the build just rebuilds next time
+        body = await build()
+        self.response_cache.put(key, (version, body), size(body))
+        return body
+
+    def cache_stats(self) -> Dict:
+        return {**self.page_cache.stats(), 'responses': self.response_cache.stats()}
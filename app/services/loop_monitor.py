@@ -0,0 +1,125 @@
+import asyncio
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from datetime import datetime
+from typing import Dict, List, Optional
+
+
+class LoopLagMonitor:
+    """
+    Event-loop lag monitor.
+
+    A sampler task sleeps for a fixed interval and records how late it wakes up; that delay is
+    time the loop spent running something else without yielding. A watchdog thread notices when
+    the sampler has not woken for longer than slow_ms and logs the loop thread's current stack,
+    which points at the callback that is blocking it.
+    """
+
+    STACK_LIMIT = 25  # Innermost frames logged for a stall
+    MAX_STALLS = 20  # Recent stalls kept for the report
+
+    def __init__(self, interval_ms: int = 100, slow_ms: int = 250, window: int = 3000):
+        self.interval = interval_ms / 1000
+        self.slow = slow_ms / 1000
+        self.samples = deque(maxlen=window)  # Lag in seconds, most recent window
+        self.stalls = deque(maxlen=self.MAX_STALLS)
+        self.slow_callbacks = 0
+        self.max_lag = 0.0
+
+        self._heartbeat = time.monotonic()
+        self._loop_thread_id: Optional[int] = None
+        self._task: Optional[asyncio.Task] = None
+        self._watchdog: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    @classmethod
+    def from_settings(cls, settings) -> 'LoopLagMonitor':
+        return cls(interval_ms=settings.LOOP_MONITOR_INTERVAL_MS, slow_ms=settings.LOOP_SLOW_CALLBACK_MS)
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    async def start(self):
+        if self.running:
+            return
+        self._loop_thread_id = threading.get_ident()
+        self._heartbeat = time.monotonic()
+        self._stop.clear()
+        self._task = asyncio.create_task(self._sample())
+        self._watchdog = threading.Thread(target=self._watch, name='loop-lag-watchdog', daemon=True)
+        self._watchdog.start()
+        print(f"⏱️  Event-loop monitor: sampling every {self.interval * 1000:.0f} ms, "
+              f"logging callbacks blocking over {self.slow * 1000:.0f} ms")
+
+    async def stop(self):
+        self._stop.set()
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _sample(self):
+        while True:
+            started = time.perf_counter()
+            await asyncio.sleep(self.interval)
+            lag = max(time.perf_counter() - started - self.interval, 0.0)
+            self.samples.append(lag)
+            self.max_lag = max(self.max_lag, lag)
+            self._heartbeat = time.monotonic()
+
+    def _watch(self):
+        reported_beat = None
+        while not self._stop.wait(self.slow / 2):
+            beat = self._heartbeat
+            blocked = time.monotonic() - beat - self.interval
+            if blocked < self.slow or beat == reported_beat:
+                continue
+            reported_beat = beat  # One report per stall, taken while it is still happening
+            self._record_stall(blocked)
+
+    def _record_stall(self, blocked: float):
+        frame = sys._current_frames().get(self._loop_thread_id)
+        if frame is None:
+            return
+        stack = traceback.extract_stack(frame, limit=self.STACK_LIMIT)
+        self.slow_callbacks += 1
+        top = stack[-1] if stack else None
+        self.stalls.append({
+            'at': datetime.utcnow().isoformat(),
+            'blocked_ms': round(blocked * 1000, 1),
+            'where': f"{top.filename}:{top.lineno} in {top.name}" if top else None,
+        })
+        print(f"🐢 Event loop blocked for {blocked * 1000:.0f} ms+, loop thread stack:\n"
+              f"{''.join(traceback.format_list(stack)).rstrip()}")
+
+    @staticmethod
+    def _percentile(ordered: List[float], q: float) -> float:
+        if not ordered:
+            return 0.0
+        return round(ordered[min(len(ordered) - 1, int(q * len(ordered)))] * 1000, 2)
+
+    def report(self, with_stalls: bool = True) -> Dict:
+        """Lag percentiles over the recent window (ms), slow-callback count and recent stalls"""
+        ordered = sorted(self.samples)
+        report = {
+            'running': self.running,
+            'interval_ms': round(self.interval * 1000),
+            'slow_threshold_ms': round(self.slow * 1000),
+            'samples': len(ordered),
+            'p50_ms': self._percentile(ordered, 0.50),
+            'p95_ms': self._percentile(ordered, 0.95),
+            'p99_ms': self._percentile(ordered, 0.99),
+            'window_max_ms': round(ordered[-1] * 1000, 2) if ordered else 0.0,
+            'max_ms': round(self.max_lag * 1000, 2),
+            'slow_callbacks': self.slow_callbacks,
+        }
+        if with_stalls:
+            report['recent_stalls'] = list(self.stalls)
+        return report
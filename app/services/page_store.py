@@ -0,0 +1,126 @@
+import asyncio
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import aiofiles
+import aiofiles.os
+
+from app.utils import serialization
+
+
+class PageStore:
+    """
+    pages.json plus append-only JSON Lines segments for retried pages.
+
+    Retries append their pages to a new segment and record URL -> (segment, offset, length)
+    in a small index, so they cost O(retried pages). Readers merge segments over pages.json
+    (latest wins); compaction folds segments back into pages.json.
+    """
+
+    def __init__(self, output_dir: Path):
+        self.output_dir = Path(output_dir)
+        self.pages_file = self.output_dir / "pages.json"
+        self.segments_dir = self.output_dir / "segments"
+        self.index_file = self.segments_dir / "index.json"
+
+    def _read_index(self) -> Dict:
+        if not self.index_file.exists():
+            return {'base_count': None, 'segments': [], 'pages': {}}
+        return serialization.read_json_file(self.index_file)
+
+    @property
+    def segment_count(self) -> int:
+        return len(self._read_index()['segments'])
+
+    def has_segments(self) -> bool:
+        return self.index_file.exists()
+
+    async def append(self, pages_data: List[Dict], base_count: int) -> int:
+        """Write retried pages to a new segment; returns the merged page count"""
+        index = await asyncio.to_thread(self._read_index)
+        if index['base_count'] is None:
+            index['base_count'] = base_count
+
+        await aiofiles.os.makedirs(self.segments_dir, exist_ok=True)
+        segment_name = f"segment-{len(index['segments']) + 1:06d}.jsonl"
+        segment = await asyncio.to_thread(self._encode_segment, pages_data, segment_name, index)
+
+        async with aiofiles.open(self.segments_dir / segment_name, 'wb') as f:
+            await f.write(segment)
+
+        index['segments'].append(segment_name)
+        await self._write_atomic(self.index_file, await asyncio.to_thread(serialization.dumps, index))
+
+        return self.page_count(index)
+
+    @staticmethod
+    def _encode_segment(pages_data: List[Dict], segment_name: str, index: Dict) -> bytes:
+        """JSON Lines for a segment, recording each page's location in index"""
+        offset = 0
+        lines = []
+        for page_dict in pages_data:
+            line = serialization.dumps(page_dict) + b'\n'
+            index['pages'][page_dict['url']] = [segment_name, offset, len(line)]
+            offset += len(line)
+            lines.append(line)
+        return b''.join(lines)
+
+    def page_count(self, index: Optional[Dict] = None) -> int:
+        """Pages after merge; retried URLs are previously failed, so they add to the base"""
+        index = index or self._read_index()
+        return (index['base_count'] or 0) + len(index['pages'])
+
+    def read_page(self, url: str) -> Optional[Dict]:
+        """Fetch one page from the segments via the index (None if it only lives in pages.json)"""
+        location = self._read_index()['pages'].get(url)
+        if not location:
+            return None
+        segment_name, offset, length = location
+        with open(self.segments_dir / segment_name, 'rb') as f:
+            f.seek(offset)
+            return serialization.loads(f.read(length))
+
+    def load_merged(self) -> List[Dict]:
+        """pages.json with segment pages applied (latest wins)"""
+        pages_data = serialization.read_json_file(self.pages_file) if self.pages_file.exists() else []
+        index = self._read_index()
+        if not index['pages']:
+            return pages_data
+
+        # Read each segment once, keeping only the records the index points at
+        overrides: Dict[str, Dict] = {}
+        wanted: Dict[str, List] = {}
+        for url, (segment_name, offset, length) in index['pages'].items():
+            wanted.setdefault(segment_name, []).append((url, offset, length))
+        for segment_name, records in wanted.items():
+            with open(self.segments_dir / segment_name, 'rb') as f:
+                data = f.read()
+            for url, offset, length in records:
+                overrides[url] = serialization.loads(data[offset:offset + length])
+
+        merged = []
+        for page_dict in pages_data:
+            merged.append(overrides.pop(page_dict['url'], page_dict))
+        merged.extend(overrides.values())
+        return merged
+
+    async def compact(self, pages_data: List[Dict], pretty: bool = False):
+        """Replace pages.json with merged data, then drop the segments"""
+        await self._write_atomic(self.pages_file, await asyncio.to_thread(serialization.dumps, pages_data, pretty))
+        await asyncio.to_thread(self.clear_segments)
+
+    def clear_segments(self):
+        if not self.segments_dir.exists():
+            return
+        # Index first, so readers never see an index pointing at deleted segments
+        if self.index_file.exists():
+            self.index_file.unlink()
+        for segment in self.segments_dir.glob("segment-*.jsonl"):
+            segment.unlink()
+
+    @staticmethod
+    async def _write_atomic(path: Path, data: bytes):
+        tmp_path = path.with_suffix(path.suffix + '.tmp')
+        async with aiofiles.open(tmp_path, 'wb') as f:
+            await f.write(data)
+        await aiofiles.os.replace(tmp_path, path)
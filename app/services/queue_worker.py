@@ -0,0 +1,79 @@
+import asyncio
+import os
+import socket
+from collections import OrderedDict
+from typing import Dict, Optional
+
+from config import settings
+from app.services.browser_pool import BrowserPool
+from app.services.browser_supervisor import BrowserSupervisor
+from app.services.scraper import WebScraper
+from app.services.sharding import scrape_batch
+from app.services.task_queue import TaskQueue
+from app.utils import serialization
+
+
+class QueueWorker:
+    """
+    Worker node: claims page batches from the task queue, loads and extracts them on one
+    supervised browser, and writes results back for the coordinating API.
+    """
+
+    POLL_INTERVAL = 1.0
+    MAX_CACHED_SCRAPERS = 16  # Per-job scrapers (scope, readiness learning) kept between batches
+
+    def __init__(self, task_queue: TaskQueue, concurrency: int = 1, worker_id: Optional[str] = None):
+        self.task_queue = task_queue
+        self.concurrency = concurrency
+        self.worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}"
+        self.browser_pool = BrowserPool(
+            max_concurrent_pages=settings.MAX_CONCURRENT_PAGES * concurrency,
+            per_host_concurrency=settings.PER_HOST_CONCURRENCY,
+            per_host_delay_ms=settings.PER_HOST_DELAY_MS,
+            supervisor=BrowserSupervisor.from_settings(settings)
+        )
+        self._scrapers: 'OrderedDict[tuple, WebScraper]' = OrderedDict()
+        self.batches_done = 0
+
+    def _scraper_for(self, slot: int, job_id: str, scraper_kwargs: Dict) -> WebScraper:
+        # Keyed by slot too: a batch collects errors on its scraper, so concurrent batches can't share one
+        key = (slot, job_id)
+        scraper = self._scrapers.get(key)
+        if scraper is None:
+            scraper = WebScraper(**scraper_kwargs, browser_pool=self.browser_pool)
+            self._scrapers[key] = scraper
+            if len(self._scrapers) > self.MAX_CACHED_SCRAPERS:
+                self._scrapers.popitem(last=False)
+        self._scrapers.move_to_end(key)
+        return scraper
+
+    async def _run_task(self, slot: int, task_id: str, job_id: str, payload: bytes):
+        task = serialization.loads(payload)
+        scraper = self._scraper_for(slot, job_id, task['scraper'])
+        print(f"📦 Task {task_id} ({job_id}): {len(task['urls'])} URLs")
+        result = await scrape_batch(scraper, task['urls'], task['with_links'], self.worker_id,
+                                    with_html=task.get('with_html', False))
+        await asyncio.to_thread(self.task_queue.complete, task_id, serialization.dumps(result))
+        self.batches_done += 1
+
+    async def _loop(self, slot: int):
+        while True:
+            claimed = await asyncio.to_thread(self.task_queue.claim, self.worker_id)
+            if claimed is None:
+                await asyncio.sleep(self.POLL_INTERVAL)
+                continue
+            try:
+                await self._run_task(slot, *claimed)
+            except Exception as e:
+                # Left claimed: the lease expires and another worker (or this one) retries it
+                print(f"❌ Task {claimed[0]} failed: {e}")
+
+    async def run(self):
+        print(f"👷 Worker {self.worker_id} polling {type(self.task_queue).__name__} "
+              f"({self.concurrency} concurrent batches)")
+        await self.browser_pool.start()
+        try:
+            await asyncio.gather(*[self._loop(slot) for slot in range(self.concurrency)])
+        finally:
+            await self.browser_pool.close()
+            print(f"👋 Worker {self.worker_id} stopped after {self.batches_done} batches")
@@ -0,0 +1,159 @@
+import hashlib
+import time
+from abc import ABC, abstractmethod
+from typing import List, Dict, Optional
+
+from playwright.async_api import Page, TimeoutError as PlaywrightTimeoutError
+
+
+class ReadinessStrategy(ABC):
+    """Decides when a page navigated with wait_until='domcontentloaded' is ready for extraction"""
+
+    name = 'base'
+
+    @abstractmethod
+    async def wait(self, page: Page):
+        ...
+
+
+class DomQuietStrategy(ReadinessStrategy):
+    """Wait until the DOM stops mutating for quiet_ms (capped at max_ms)"""
+
+    name = 'dom_quiet'
+
+    def __init__(self, quiet_ms: int = 500, max_ms: int = 10000):
+        self.quiet_ms = quiet_ms
+        self.max_ms = max_ms
+
+    async def wait(self, page: Page):
+        await page.evaluate("""
+            ([quietMs, maxMs]) => new Promise(resolve => {
+                let timer = setTimeout(done, quietMs);
+                const cap = setTimeout(done, maxMs);
+                const observer = new MutationObserver(() => {
+                    clearTimeout(timer);
+                    timer = setTimeout(done, quietMs);
+                });
+                function done() {
+                    observer.disconnect();
+                    clearTimeout(timer);
+                    clearTimeout(cap);
+                    resolve(true);
+                }
+                observer.observe(document.documentElement, {childList: true, subtree: true, characterData: true});
+            })
+        """, [self.quiet_ms, self.max_ms])
+
+
+class SelectorStrategy(ReadinessStrategy):
+    """Wait for a configured selector to appear"""
+
+    name = 'selector'
+
+    def __init__(self, selector: str, timeout: int = 10000):
+        self.selector = selector
+        self.timeout = timeout
+
+    async def wait(self, page: Page):
+        try:
+            await page.wait_for_selector(self.selector, timeout=self.timeout)
+        except PlaywrightTimeoutError:
+            pass
+
+
+class NetworkIdleStrategy(ReadinessStrategy):
+    """Wait for networkidle, treating the cap as 'ready enough' instead of failing"""
+
+    name = 'networkidle'
+
+    def __init__(self, timeout: int = 10000):
+        self.timeout = timeout
+
+    async def wait(self, page: Page):
+        try:
+            await page.wait_for_load_state('networkidle', timeout=self.timeout)
+        except PlaywrightTimeoutError:
+            pass
+
+
+class ReadinessLearner:
+    """
+    Per-site selection of the cheapest readiness strategy.
+    Sample pages wait through every strategy in cost order, snapshotting the page text after each;
+    the first strategy whose snapshot matches the final one on all samples is used from then on.
+    """
+
+    def __init__(self, strategies: List[ReadinessStrategy], sample_pages: int = 5,
+                 fixed: Optional[str] = None):
+        self.strategies = strategies  # Cheapest first, reference (most thorough) last
+        self.sample_pages = sample_pages
+        self.samples = 0
+        self.matches: Dict[str, int] = {s.name: 0 for s in strategies}
+        self.timings: Dict[str, float] = {s.name: 0.0 for s in strategies}
+
+        self.chosen: Optional[ReadinessStrategy] = None
+        if fixed:
+            self.chosen = next((s for s in strategies if s.name == fixed), None)
+
+    STRATEGIES = {'adaptive', DomQuietStrategy.name, SelectorStrategy.name, NetworkIdleStrategy.name}
+
+    @classmethod
+    def from_settings(cls, settings) -> 'ReadinessLearner':
+        if settings.READINESS_STRATEGY not in cls.STRATEGIES:
+            raise ValueError(f"Unsupported READINESS_STRATEGY: {settings.READINESS_STRATEGY} "
+                             f"(expected one of {', '.join(sorted(cls.STRATEGIES))})")
+        if settings.READINESS_STRATEGY == SelectorStrategy.name and not settings.READINESS_SELECTOR:
+            raise ValueError("READINESS_STRATEGY=selector needs READINESS_SELECTOR")
+
+        strategies: List[ReadinessStrategy] = [
+            DomQuietStrategy(quiet_ms=settings.READINESS_QUIET_MS, max_ms=settings.READINESS_MAX_WAIT)
+        ]
+        if settings.READINESS_SELECTOR:
+            strategies.append(SelectorStrategy(settings.READINESS_SELECTOR, timeout=settings.READINESS_MAX_WAIT))
+        strategies.append(NetworkIdleStrategy(timeout=settings.READINESS_MAX_WAIT))
+
+        fixed = None if settings.READINESS_STRATEGY == 'adaptive' else settings.READINESS_STRATEGY
+        return cls(strategies, sample_pages=settings.READINESS_SAMPLE_PAGES, fixed=fixed)
+
+    @staticmethod
+    async def _snapshot(page: Page) -> str:
+        text = await page.evaluate("() => document.body ? document.body.innerText : ''")
+        return hashlib.sha1(text.encode('utf-8')).hexdigest()
+
+    async def wait_until_ready(self, page: Page):
+        """Wait with the chosen strategy, or sample all strategies while still learning"""
+        if self.chosen:
+            await self.chosen.wait(page)
+            return
+
+        start = time.monotonic()
+        snapshots = []
+        for strategy in self.strategies:
+            await strategy.wait(page)
+            snapshots.append((strategy.name, await self._snapshot(page), time.monotonic() - start))
+
+        # Another concurrent sample may have already decided
+        if self.chosen:
+            return
+
+        reference = snapshots[-1][1]
+        self.samples += 1
+        for name, digest, elapsed in snapshots:
+            self.timings[name] += elapsed
+            if digest == reference:
+                self.matches[name] += 1
+
+        if self.samples >= self.sample_pages:
+            self.chosen = next(s for s in self.strategies if self.matches[s.name] == self.samples)
+            print(f"⏱️  Readiness strategy: {self.chosen.name} (after {self.samples} sample pages)")
+
+    def summary(self) -> Dict:
+        return {
+            'strategy': self.chosen.name if self.chosen else None,
+            'samples': self.samples,
+            'matches': self.matches,
+            'avg_wait_ms': {
+                name: round(total * 1000 / self.samples) if self.samples else 0
+                for name, total in self.timings.items()
+            }
+        }
@@ -1,19 +1,42 @@
 import re
-from playwright.async_api import async_playwright, Page, Browser
+from playwright.async_api import Page
 from urllib.parse import urljoin, urlparse
 import asyncio
-from typing import Set, List, Dict, Optional
+from typing import Set, List, Dict, Optional, Tuple
 import aiofiles
+import aiofiles.os
 import os
 from pathlib import Path
 import hashlib
 from datetime import datetime
-import json
 import csv
+from concurrent.futures import ProcessPoolExecutor
+import multiprocessing
+from functools import partial
+from itertools import islice
+from contextlib import nullcontext
 
 from app.models.schemas import PageData, SitemapData, FailedURL
+from app.models.content_blocks import ContentBlocks
 from app.services.content_cleaner import ContentCleaner
+from app.services.boilerplate import BoilerplateDetector
+from app.services.image_catalog import ImageCatalog
+from app.services.job_registry import load_pages_from_disk
+from app.services.browser_pool import BrowserPool
+from app.services.browser_supervisor import BrowserSupervisor
+from app.services.browser_extractor import BrowserExtractor, MAIN_TEXT_JS, diff_extractions, summarize_diffs
+from app.services.deduplication import NearDuplicateDetector
+from app.services.readiness import ReadinessLearner
+from app.services.trap_detector import CrawlTrapDetector
+from app.services.warc import WARCWriter, iter_warc_pages
+from app.services.page_store import PageStore
+from app.services.search_index import SearchIndex
+from app.services.sharding import ShardedCrawl
+from app.services.task_queue import TaskQueue
+from app.services.url_trie import URLTrie
 from app.utils.validators import URLValidator
+from app.utils.url_scope import URLScope
+from app.utils import serialization
 from config import settings
 
 
@@ -31,20 +54,64 @@ class WebScraper:
         '.xml', '.json', '.csv', '.txt'
     }
 
-    def __init__(self, base_url: str, max_depth: int = 3, existing_output_dir: Optional[str] = None):
+    MAX_SITEMAP_PAGES = 500  # Pages loaded while building the sitemap
+    REEXTRACT_CHUNK_PER_WORKER = 4  # WARC captures read ahead per re-extraction process
+
+    def __init__(self, base_url: str, max_depth: int = 3, existing_output_dir: Optional[str] = None,
+                 include_patterns: Optional[List[str]] = None, exclude_patterns: Optional[List[str]] = None,
+                 allowed_subdomains: Optional[List[str]] = None, browser_pool: Optional[BrowserPool] = None,
+                 task_queue: Optional[TaskQueue] = None, job_id: Optional[str] = None):
         self.base_url = URLValidator.normalize_url(base_url)
         self.base_domain = urlparse(base_url).netloc
         self.max_depth = max_depth
 
+        # Compiled once; every discovered link is checked against it with a single parse
+        self.scope = URLScope(
+            self.base_url,
+            include=include_patterns,
+            exclude=exclude_patterns,
+            allowed_hosts=allowed_subdomains,
+            global_allowed_hosts=settings.ALLOWED_DOMAINS,
+            skip_extensions=self.SKIP_EXTENSIONS
+        )
+
         self.visited_urls: Set[str] = set()
-        self.url_hierarchy: Dict[str, List[str]] = {}  # Parent -> Children mapping
+        self.url_depths: Dict[str, int] = {}  # Crawl depth of each discovered URL (for the sitemap tree)
         self.scraped_pages: List[PageData] = []
         self.failed_urls: List[FailedURL] = []  # Track failed URLs with details
         self.errors: List[str] = []
 
-        self.browser: Optional[Browser] = None
+        self.browser_pool = browser_pool  # Shared across scrapers in a multi-site batch
+        self.supervisor = browser_pool.supervisor if browser_pool else BrowserSupervisor.from_settings(settings)
+        self._browser_baseline = dict(self.supervisor.stats)  # Per-job counters on a shared supervisor
         self.content_cleaner = ContentCleaner()
+        self.browser_extractor = BrowserExtractor()
+        self.extraction_diffs: List[Dict] = []  # Filled when EXTRACTION_ENGINE=compare
+        self.shard: Optional[ShardedCrawl] = None
+        if task_queue:
+            # Worker nodes do the browsing; this process only coordinates
+            self.shard = ShardedCrawl(self, workers=0, batch_size=settings.SHARD_BATCH_SIZE, task_queue=task_queue,
+                                      job_id=job_id, max_in_flight=settings.TASK_QUEUE_MAX_IN_FLIGHT,
+                                      timeout=settings.SHARD_JOB_TIMEOUT)
+        elif settings.SCRAPE_WORKERS > 1 and not browser_pool:
+            self.shard = ShardedCrawl(self, workers=settings.SCRAPE_WORKERS, batch_size=settings.SHARD_BATCH_SIZE,
+                                      timeout=settings.SHARD_JOB_TIMEOUT)
         self.validator = URLValidator()
+        self.readiness = ReadinessLearner.from_settings(settings)
+        self.trap_detector: Optional[CrawlTrapDetector] = (
+            CrawlTrapDetector(
+                max_urls_per_pattern=settings.TRAP_MAX_URLS_PER_PATTERN,
+                max_repeated_segments=settings.TRAP_MAX_REPEATED_SEGMENTS,
+                duplicate_content_ratio=settings.TRAP_DUPLICATE_CONTENT_RATIO
+            )
+            if settings.TRAP_DETECTION else None
+        )
+        self.duplicate_detector: Optional[NearDuplicateDetector] = (
+            NearDuplicateDetector(max_distance=settings.NEAR_DUPLICATE_MAX_DISTANCE,
+                                  min_tokens=settings.NEAR_DUPLICATE_MIN_TOKENS,
+                                  canonical_max_distance=settings.NEAR_DUPLICATE_CANONICAL_MAX_DISTANCE)
+            if settings.NEAR_DUPLICATE_DETECTION else None
+        )
 
         # Create or use existing output directory
         if existing_output_dir:
@@ -52,8 +119,22 @@ class WebScraper:
         else:
             self.directory_name = self._create_url_based_directory()
             self.output_dir = Path(settings.OUTPUT_DIR) / self.directory_name
+        # Created by _prepare_output_dir() when a run starts; worker processes never write here
+
+        self.page_store = PageStore(self.output_dir)
+        self.search_index: Optional[SearchIndex] = (
+            SearchIndex(self.output_dir / "search.db") if settings.SEARCH_INDEX else None
+        )
+
+        self.warc_file = self.output_dir / "pages.warc.gz"
+        self.warc_writer: Optional[WARCWriter] = (
+            WARCWriter(self.warc_file, software=f"{settings.APP_NAME}/{settings.APP_VERSION}")
+            if settings.WARC_CAPTURE else None
+        )
 
-        self.output_dir.mkdir(parents=True, exist_ok=True)
+    async def _prepare_output_dir(self):
+        """Create the output directory without blocking the event loop"""
+        await aiofiles.os.makedirs(self.output_dir, exist_ok=True)
         print(f"📁 Output directory: {self.output_dir}")
 
     def _create_url_based_directory(self) -> str:
@@ -62,179 +143,306 @@ class WebScraper:
         timestamp = datetime.utcnow().strftime('%Y%m%d_%H%M%S')
         return f"{domain}_{timestamp}"
 
-    def _is_valid_webpage_url(self, url: str) -> bool:
-        """Check if URL is a valid webpage (not a file)"""
-        parsed = urlparse(url)
-        path = parsed.path.lower()
-
-        # Check for file extensions
-        for ext in self.SKIP_EXTENSIONS:
-            if path.endswith(ext):
-                return False
-
-        # Check if it's a valid HTTP(S) URL
-        if parsed.scheme not in ['http', 'https']:
-            return False
-
-        return True
-
     async def initialize_browser(self):
         """Initialize Playwright browser"""
-        playwright = await async_playwright().start()
-        self.browser = await playwright.chromium.launch(
-            headless=True,
-            args=['--disable-blink-features=AutomationControlled']
-        )
+        await self.supervisor.start()
 
     async def close_browser(self):
-        """Close browser"""
-        if self.browser:
-            await self.browser.close()
-
-    async def discover_urls(self, page: Page, current_url: str) -> List[str]:
-        """Discover all URLs on a page"""
+        """Close browser and stop Playwright"""
+        if self.browser_pool:
+            # The pool owner closes the shared browser
+            return
+        await self.supervisor.close()
+
+    DISCOVERY_SCRIPT = """
+        (withText) => ({
+            links: Array.from(document.querySelectorAll('a[href]'), a => a.href),
+            text: withText ? (""" + MAIN_TEXT_JS + """)() : ''
+        })
+    """
+
+    async def discover_urls(self, page: Page, current_url: str) -> Tuple[List[str], str]:
+        """Discover all URLs on a page, along with its main content text for duplicate/trap detection"""
         discovered = []
+        page_text = ''
 
         try:
-            await page.wait_for_load_state('networkidle', timeout=settings.PAGE_TIMEOUT)
-
-            links = await page.evaluate("""
-                () => {
-                    const links = Array.from(document.querySelectorAll('a[href]'));
-                    return links.map(a => a.href);
-                }
-            """)
-
-            for link in links:
-                try:
-                    normalized = self.validator.normalize_url(link)
+            await self.readiness.wait_until_ready(page)
 
-                    if (self.validator.is_same_domain(normalized, self.base_url) and
-                            normalized not in self.visited_urls and
-                            self.validator.is_valid_url(normalized) and
-                            self._is_valid_webpage_url(normalized)):
-                        discovered.append(normalized)
-                except Exception:
-                    continue
+            result = await page.evaluate(self.DISCOVERY_SCRIPT, self._wants_page_text)
+            discovered = self._filter_links(result['links'])
+            page_text = result['text']
 
         except Exception as e:
             self.errors.append(f"URL discovery error on {current_url}: {str(e)}")
 
-        return list(set(discovered))
+        return discovered, page_text
+
+    def _filter_links(self, links: List[str]) -> List[str]:
+        """Normalized, in-scope, not yet visited links (deduplicated)"""
+        discovered = set()
+        for link in links:
+            normalized = self.scope.normalize(link)
+            if normalized and normalized not in self.visited_urls:
+                discovered.add(normalized)
+
+        return list(discovered)
+
+    @property
+    def _wants_page_text(self) -> bool:
+        return self.duplicate_detector is not None or self.trap_detector is not None
+
+    def _check_near_duplicate(self, url: str, text: str) -> Optional[str]:
+        """Return the canonical URL if this page is a near-duplicate of one already seen"""
+        if not self.duplicate_detector or not text:
+            return None
+
+        canonical_url = self.duplicate_detector.check(url, text)
+        if canonical_url:
+            print(f"♊ Near-duplicate: {url} ≈ {canonical_url}")
+        return canonical_url
+
+    def _page_slot(self, url: str):
+        """Global page budget and per-host politeness when running on a shared pool"""
+        return self.browser_pool.slot(url) if self.browser_pool else nullcontext()
+
+    async def _load_for_discovery(self, url: str) -> Tuple[List[str], str]:
+        """Open a page for sitemap building and return its links and text"""
+        async with self._page_slot(url), self.supervisor.session() as browser:
+            context = await browser.new_context()
+            try:
+                page = await context.new_page()
+                await page.goto(url, wait_until='domcontentloaded', timeout=settings.PAGE_TIMEOUT)
+                return await self.discover_urls(page, url)
+            finally:
+                await context.close()
 
     async def build_sitemap_hierarchy(self) -> SitemapData:
         """Build hierarchical sitemap by crawling the website"""
-        if not self.browser:
+        if not self.supervisor.running:
             await self.initialize_browser()
 
         all_urls: Set[str] = {self.base_url}
-        url_queue: List[tuple[str, int, Optional[str]]] = [(self.base_url, 0, None)]
+        self.url_depths[self.base_url] = 0
+        url_queue: List[tuple[str, int]] = [(self.base_url, 0)]
 
         print(f"🗺️  Building hierarchical sitemap (max depth: {self.max_depth})...")
 
-        while url_queue and len(self.visited_urls) < 500:
-            current_url, depth, parent_url = url_queue.pop(0)
+        while url_queue and len(self.visited_urls) < self.MAX_SITEMAP_PAGES:
+            current_url, depth = url_queue.pop(0)
 
             if current_url in self.visited_urls or depth > self.max_depth:
                 continue
 
+            # Pattern may have turned out to serve identical content after this URL was queued
+            if self.trap_detector and self.trap_detector.is_content_trap(current_url):
+                continue
+
             self.visited_urls.add(current_url)
             print(f"📍 Depth {depth}: {current_url}")
 
             try:
-                context = await self.browser.new_context()
-                page = await context.new_page()
-                await page.goto(current_url, wait_until='domcontentloaded', timeout=settings.PAGE_TIMEOUT)
+                discovered, page_text = await self._load_for_discovery(current_url)
+                self._record_discovery(current_url, discovered, page_text)
 
-                discovered = await self.discover_urls(page, current_url)
+                for url in self._admit_links(discovered, all_urls, depth + 1):
+                    url_queue.append((url, depth + 1))
 
-                # Build hierarchy
-                if parent_url:
-                    if parent_url not in self.url_hierarchy:
-                        self.url_hierarchy[parent_url] = []
-                    self.url_hierarchy[parent_url].append(current_url)
+            except Exception as e:
+                self.errors.append(f"Sitemap building error {current_url}: {str(e)}")
 
-                if current_url not in self.url_hierarchy:
-                    self.url_hierarchy[current_url] = []
+        return self._finish_sitemap(all_urls)
 
-                # Add discovered URLs to hierarchy
-                for url in discovered:
-                    if url not in self.visited_urls:
-                        url_queue.append((url, depth + 1, current_url))
-                        all_urls.add(url)
+    def _record_discovery(self, current_url: str, discovered: List[str], page_text: str) -> bool:
+        """Update traps and duplicates for a loaded page; returns True if it is a near-duplicate"""
+        if self.trap_detector:
+            self.trap_detector.record_content(current_url, page_text)
 
-                await context.close()
+        # Near-duplicates are not scraped and optionally not expanded
+        is_duplicate = self._check_near_duplicate(current_url, page_text) is not None
+        if is_duplicate and settings.NEAR_DUPLICATE_SKIP_LINKS:
+            discovered.clear()
 
-            except Exception as e:
-                self.errors.append(f"Sitemap building error {current_url}: {str(e)}")
+        return is_duplicate
+
+    def _admit_links(self, discovered: List[str], all_urls: Set[str], depth: int) -> List[str]:
+        """New links worth queueing (not seen yet and not from a trap pattern); marks them as seen at depth"""
+        admitted = []
+        for url in discovered:
+            if url in self.visited_urls or url in all_urls:
+                continue
+            if self.trap_detector and not self.trap_detector.admit(url):
+                continue
+            admitted.append(url)
+            all_urls.add(url)
+            self.url_depths[url] = depth
+        return admitted
+
+    def _finish_sitemap(self, all_urls: Set[str]) -> SitemapData:
+        if self.trap_detector:
+            all_urls = {url for url in all_urls if not self.trap_detector.is_content_trap(url)}
+            if self.trap_detector.rejected_urls:
+                print(f"🪤 Skipped {self.trap_detector.rejected_urls} URLs from crawler-trap patterns")
 
         print(f"✅ Sitemap complete: {len(all_urls)} URLs discovered")
 
         return SitemapData(
             total_urls=len(all_urls),
             urls=list(all_urls),
-            hierarchy=self.url_hierarchy
+            tree=URLTrie.from_urls(all_urls, self.url_depths)
         )
 
-    async def scrape_page(self, url: str, retry_count: int = 0) -> Optional[PageData]:
-        """Scrape a single page with structured content"""
+    async def _fetch_and_extract(self, url: str, with_links: bool = False, crash_retried: bool = False,
+                                 with_html: Optional[bool] = None) -> Tuple[Dict, Optional[str]]:
+        """
+        Load url and extract it; returns (extracted, html). with_links also collects links and page text.
+        html is only returned when with_html (default: WARC capture is on), otherwise it is None.
+        """
+        if with_html is None:
+            with_html = self.warc_writer is not None
+        browser = None
         try:
-            context = await self.browser.new_context(
-                user_agent='Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-            )
-            page = await context.new_page()
-
-            response = await page.goto(url, wait_until='networkidle', timeout=settings.PAGE_TIMEOUT)
-
-            if not response or response.status not in [200, 304]:
-                raise Exception(f"Failed to load page: HTTP {response.status if response else 'No response'}")
-
-            html_content = await page.content()
-
-            # Extract metadata
-            metadata = self.content_cleaner.extract_metadata(html_content)
-
-            # Extract structured content with images at their positions
-            structured_content = self.content_cleaner.clean_html_to_structured_content(html_content, url)
+            async with self.supervisor.session() as browser:
+                context = await browser.new_context(
+                    user_agent='Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+                )
+                try:
+                    page = await context.new_page()
+
+                    response = await page.goto(url, wait_until='domcontentloaded', timeout=settings.PAGE_TIMEOUT)
+
+                    if not response or response.status not in [200, 304]:
+                        raise Exception(f"Failed to load page: HTTP {response.status if response else 'No response'}")
+
+                    engine = settings.EXTRACTION_ENGINE
+                    in_browser = engine in ('browser', 'compare')
+                    # Main content text: for discovery, or for the duplicate check of pages discovery didn't see
+                    with_text = (with_links and self._wants_page_text) or bool(
+                        self.duplicate_detector and not self.duplicate_detector.is_known(url)
+                    )
+
+                    if with_links and not in_browser:
+                        # Waits for readiness as part of discovery
+                        links, page_text = await self.discover_urls(page, url)
+                    else:
+                        # The browser extractor collects links and text in its own evaluate call
+                        await self.readiness.wait_until_ready(page)
+
+                    html_content = None
+                    if engine != 'browser' or with_html:
+                        html_content = await page.content()
+
+                    # Extract metadata, structured content with images at their positions and all image URLs
+                    if in_browser:
+                        extracted = await self.browser_extractor.extract(
+                            page, with_links=with_links, with_text=with_text
+                        )
+                        if with_links:
+                            extracted['links'] = self._filter_links(extracted['links'])
+                        if engine == 'compare':
+                            reference = await asyncio.to_thread(ContentCleaner.extract_page, html_content, url)
+                            self.extraction_diffs.append(diff_extractions(url, reference, extracted))
+                    else:
+                        # HTML parsing takes tens of milliseconds per page: keep it off the event loop
+                        extracted = await asyncio.to_thread(
+                            ContentCleaner.extract_page, html_content, url, with_text and not with_links
+                        )
+
+                    if with_links and not in_browser:
+                        extracted['links'] = links
+                        extracted['page_text'] = page_text
+                finally:
+                    # Always release the context; leaked contexts are what bloats long-running browsers
+                    await context.close()
+
+            # The DOM is only needed for the WARC record; don't hand it back (or across processes) otherwise
+            return extracted, html_content if with_html else None
+
+        except Exception:
+            if browser is not None and not browser.is_connected() and not crash_retried:
+                # The browser died under this page, not the page itself: retry once on the relaunched one
+                print(f"🔁 Browser lost while scraping {url}; retrying")
+                return await self._fetch_and_extract(url, with_links, crash_retried=True, with_html=with_html)
+            raise
+
+    async def _build_page(self, url: str, extracted: Dict, html_content: Optional[str]) -> Optional[PageData]:
+        """Turn an extraction into PageData (None for near-duplicates) and record it in the WARC"""
+        metadata = extracted['metadata']
+        structured_content = extracted['structured_content']
+
+        page_text = extracted.pop('page_text', '')
+
+        # Pages declaring the same rel=canonical as an earlier, similar page are duplicates of it
+        if self.duplicate_detector and metadata.get('canonical'):
+            try:
+                canonical = self.validator.normalize_url(metadata['canonical'])
+            except Exception:
+                canonical = None
+            canonical_url = self.duplicate_detector.check_canonical(url, canonical, page_text)
+            if canonical_url:
+                print(f"♊ Canonical duplicate: {url} → {canonical_url}")
+                return None
+
+        # Pages not fingerprinted during discovery are checked on their main content text
+        if self.duplicate_detector and not self.duplicate_detector.is_known(url):
+            if self._check_near_duplicate(url, page_text):
+                return None
+
+        if self.warc_writer:
+            await self.warc_writer.write_resource(url, html_content)
+
+        return PageData(
+            url=url,
+            title=metadata.get('title'),
+            metadata=metadata,
+            structured_content=structured_content,
+            all_images=extracted['all_images'],
+            json_ld=extracted.get('json_ld', [])
+        )
 
-            # Extract all image URLs
-            all_images = self.content_cleaner.extract_all_images(html_content, url)
+    def _record_failure(self, url: str, error: str, retry_count: int = 0):
+        self.errors.append(f"Page scraping error {url}: {error}")
 
-            await context.close()
+        # Add to failed URLs list
+        self.failed_urls.append(FailedURL(
+            url=url,
+            error=error,
+            attempted_at=datetime.utcnow(),
+            retry_count=retry_count
+        ))
 
-            return PageData(
-                url=url,
-                title=metadata.get('title'),
-                metadata=metadata,
-                structured_content=structured_content,
-                all_images=all_images
-            )
+    async def scrape_page(self, url: str, retry_count: int = 0) -> Optional[PageData]:
+        """Scrape a single page with structured content"""
+        try:
+            extracted, html_content = await self._fetch_and_extract(url)
+            return await self._build_page(url, extracted, html_content)
 
         except Exception as e:
-            error_msg = f"Page scraping error {url}: {str(e)}"
-            self.errors.append(error_msg)
-
-            # Add to failed URLs list
-            self.failed_urls.append(FailedURL(
-                url=url,
-                error=str(e),
-                attempted_at=datetime.utcnow(),
-                retry_count=retry_count
-            ))
-
+            self._record_failure(url, str(e), retry_count)
             return None
 
     async def scrape_all_pages(self, urls: List[str]) -> List[PageData]:
         """Scrape all discovered pages"""
-        if not self.browser:
+        if self.warc_writer:
+            await self.warc_writer.write_warcinfo()
+
+        if self.shard:
+            return await self.shard.scrape(urls)
+
+        if not self.supervisor.running:
             await self.initialize_browser()
 
         semaphore = asyncio.Semaphore(settings.MAX_CONCURRENT_PAGES)
 
         async def scrape_with_limit(url: str):
-            async with semaphore:
+            async with semaphore, self._page_slot(url):
                 print(f"🔍 Scraping: {url}")
-                return await self.scrape_page(url)
+                page_data = await self.scrape_page(url)
+
+            # Index as pages arrive so search works without loading pages.json
+            if page_data and self.search_index:
+                await self.search_index.add(page_data)
+            return page_data
 
         tasks = [scrape_with_limit(url) for url in urls]
         results = await asyncio.gather(*tasks, return_exceptions=True)
@@ -247,10 +455,9 @@ class WebScraper:
     async def retry_failed_urls(self, urls_to_retry: List[str], existing_sitemap: Optional[SitemapData] = None) -> Dict:
         """Retry scraping specific failed URLs"""
         print(f"🔄 Retrying {len(urls_to_retry)} failed URLs...")
+        await self._prepare_output_dir()
 
         try:
-            await self.initialize_browser()
-
             # Update retry count for these URLs
             for failed_url in self.failed_urls:
                 if failed_url.url in urls_to_retry:
@@ -280,17 +487,91 @@ class WebScraper:
         finally:
             await self.close_browser()
 
+    async def run_reextract(self, existing_sitemap: Optional[SitemapData] = None) -> Dict:
+        """Regenerate pages.json/pages.csv from the job's WARC capture without any network access"""
+        if not await aiofiles.os.path.exists(self.warc_file):
+            raise FileNotFoundError(f"No WARC capture found at {self.warc_file}")
+
+        loop = asyncio.get_running_loop()
+        print(f"♻️  Re-extracting pages from {self.warc_file.name}...")
+
+        workers = settings.REEXTRACT_WORKERS or os.cpu_count() or 1
+        # Spawned, not forked: this process runs an event loop and Playwright threads
+        executor = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn'))
+        captures = iter_warc_pages(self.warc_file)
+        pages: Dict[str, PageData] = {}  # Latest capture of each URL wins
+        try:
+            while True:
+                # Bounded chunks, so only a few captures' HTML is in memory at a time
+                chunk = await asyncio.to_thread(list, islice(captures, workers * self.REEXTRACT_CHUNK_PER_WORKER))
+                if not chunk:
+                    break
+                results = await asyncio.gather(*[
+                    loop.run_in_executor(executor, ContentCleaner.extract_page, html, url)
+                    for url, html, _ in chunk
+                ], return_exceptions=True)
+
+                for (url, _, captured_at), extracted in zip(chunk, results):
+                    pages.pop(url, None)
+                    if isinstance(extracted, Exception):
+                        self.errors.append(f"Re-extraction error {url}: {str(extracted)}")
+                        continue
+                    pages[url] = PageData(
+                        url=url,
+                        title=extracted['metadata'].get('title'),
+                        metadata=extracted['metadata'],
+                        structured_content=extracted['structured_content'],
+                        all_images=extracted['all_images'],
+                        json_ld=extracted.get('json_ld', []),
+                        scraped_at=captured_at
+                    )
+        finally:
+            # Joining the workers blocks; keep it off the event loop
+            await asyncio.to_thread(partial(executor.shutdown, cancel_futures=True))
+
+        scraped_pages = list(pages.values())
+
+        if self.search_index:
+            await loop.run_in_executor(None, self.search_index.rebuild, [
+                {'url': p.url, 'title': p.title, 'metadata': p.metadata, 'structured_content': p.structured_content}
+                for p in scraped_pages
+            ])
+
+        await self._save_results(existing_sitemap, scraped_pages)
+
+        print(f"✅ Re-extraction complete! {len(scraped_pages)} pages regenerated")
+
+        return {
+            "sitemap": existing_sitemap,
+            "pages": scraped_pages,
+            "total_pages": len(scraped_pages),
+            "failed_urls": self.failed_urls,
+            "errors": self.errors,
+            "output_directory": str(self.output_dir)
+        }
+
     async def run_full_scrape(self) -> Dict:
         """Execute complete scraping process"""
         try:
             print(f"🚀 Starting scrape for: {self.base_url}")
-            await self.initialize_browser()
+            await self._prepare_output_dir()
+
+            if self.shard:
+                # Steps 1 and 2 in a single pass: worker processes load each page once
+                if self.warc_writer:
+                    await self.warc_writer.write_warcinfo()
+                sitemap, scraped_pages = await self.shard.crawl()
+            else:
+                await self.initialize_browser()
 
-            # Step 1: Build hierarchical sitemap FIRST
-            sitemap = await self.build_sitemap_hierarchy()
+                # Step 1: Build hierarchical sitemap FIRST
+                sitemap = await self.build_sitemap_hierarchy()
 
-            # Step 2: Scrape all pages
-            scraped_pages = await self.scrape_all_pages(sitemap.urls)
+                # Step 2: Scrape all pages (canonical representatives only)
+                urls_to_scrape = sitemap.urls
+                if self.duplicate_detector:
+                    urls_to_scrape = [u for u in sitemap.urls if u not in self.duplicate_detector.canonical]
+                scraped_pages = await self.scrape_all_pages(urls_to_scrape)
 
             # Step 3: Save results
             await self._save_results(sitemap, scraped_pages)
@@ -309,106 +590,176 @@ class WebScraper:
         finally:
             await self.close_browser()
 
+    async def run_url_list(self, urls: List[str]) -> Dict:
+        """Scrape a known list of URLs straight away, without sitemap discovery (all at depth 0)"""
+        try:
+            print(f"🚀 Starting URL-list scrape: {len(urls)} URLs")
+            await self._prepare_output_dir()
+            self.visited_urls.update(urls)
+            sitemap = SitemapData(total_urls=len(urls), urls=urls, tree=URLTrie.from_urls(urls, dict.fromkeys(urls, 0)))
+
+            scraped_pages = await self.scrape_all_pages(urls)
+            await self._save_results(sitemap, scraped_pages)
+
+            print(f"🎉 Scraping complete! Files saved to: {self.output_dir}")
+
+            return {
+                "sitemap": sitemap,
+                "pages": scraped_pages,
+                "total_pages": len(scraped_pages),
+                "failed_urls": self.failed_urls,
+                "errors": self.errors,
+                "output_directory": str(self.output_dir)
+            }
+
+        finally:
+            await self.close_browser()
+
+    async def _process_boilerplate(self, pages: List[PageData], is_retry: bool = False) -> int:
+        """Detect site-wide repeated blocks, store them in boilerplate.json and mark/strip them in pages"""
+        mode = settings.BOILERPLATE_MODE
+        if mode not in BoilerplateDetector.MODES or mode == 'off':
+            return 0
+
+        boilerplate_file = self.output_dir / "boilerplate.json"
+
+        if is_retry:
+            # Reuse the blocks detected during the original scrape
+            if not await aiofiles.os.path.exists(boilerplate_file):
+                return 0
+            boilerplate = (await self._read_json(boilerplate_file)).get('blocks', {})
+        else:
+            detector = BoilerplateDetector(
+                min_pages=settings.BOILERPLATE_MIN_PAGES,
+                min_ratio=settings.BOILERPLATE_MIN_RATIO
+            )
+
+            def detect() -> Dict[str, Dict]:
+                for page in pages:
+                    detector.add_page(page.structured_content)
+                return detector.detect()
+
+            # Hashing every block of every page is CPU-bound: keep it off the event loop
+            boilerplate = await asyncio.to_thread(detect)
+
+            await self._write_json(boilerplate_file, {
+                'mode': mode,
+                'pages_analyzed': detector.page_count,
+                'total_blocks': len(boilerplate),
+                'blocks': boilerplate
+            })
+
+        def apply():
+            for page in pages:
+                page.structured_content = ContentBlocks(
+                    BoilerplateDetector.apply(page.structured_content, boilerplate, mode)
+                )
+
+        await asyncio.to_thread(apply)
+        return len(boilerplate)
+
+    async def _build_image_catalog(self, pages: List[PageData], is_retry: bool = False) -> Optional[ImageCatalog]:
+        """Record every image of the job once in images.json (retries add to the existing catalog)"""
+        mode = settings.IMAGE_CATALOG_MODE
+        if mode not in ImageCatalog.MODES or mode == 'off':
+            return None
+
+        catalog_file = self.output_dir / "images.json"
+        if is_retry and await aiofiles.os.path.exists(catalog_file):
+            catalog = ImageCatalog.from_dict(await self._read_json(catalog_file))
+        else:
+            catalog = ImageCatalog(mode)
+
+        def build() -> Dict:
+            for page in pages:
+                catalog.add_page(page.url, page.structured_content, page.all_images)
+            return catalog.to_dict()
+
+        await self._write_json(catalog_file, await asyncio.to_thread(build))
+        return catalog
+
+    @staticmethod
+    async def _write_json(path: Path, data):
+        """Write JSON through the serialization backend (compact unless JSON_PRETTY)"""
+        # Serializing pages.json for a large job takes seconds; the encoder runs in a thread
+        payload = await asyncio.to_thread(serialization.dumps, data, settings.JSON_PRETTY)
+        async with aiofiles.open(path, 'wb') as f:
+            await f.write(payload)
+
+    @staticmethod
+    async def _read_json(path: Path):
+        async with aiofiles.open(path, 'rb') as f:
+            raw = await f.read()
+        return await asyncio.to_thread(serialization.loads, raw)
+
+    @staticmethod
+    def _page_to_dict(page: PageData, catalog: Optional[ImageCatalog] = None) -> Dict:
+        """Public JSON shape of a page (content blocks expanded back to dicts, images by ID in 'ref' mode)"""
+        data = {
+            'url': page.url,
+            'title': page.title,
+            'metadata': page.metadata,
+            'json_ld': page.json_ld,
+            'structured_content': ContentBlocks.serialize(page.structured_content),
+            'all_images': page.all_images,
+            'scraped_at': page.scraped_at.isoformat() if page.scraped_at else None
+        }
+        if catalog and catalog.mode == 'ref':
+            data = catalog.reference_page(data)
+        return data
+
     async def _save_results(self, sitemap: Optional[SitemapData], pages: List[PageData], is_retry: bool = False):
         """Save scraping results to JSON and CSV"""
 
-        # For retries, load existing data and merge
+        # A rel=canonical target scraped after a variant that claimed its URL turns the variant into a duplicate
+        if self.duplicate_detector:
+            displaced = [page.url for page in pages if page.url in self.duplicate_detector.canonical]
+            if displaced:
+                pages[:] = [page for page in pages if page.url not in self.duplicate_detector.canonical]
+                if self.search_index:
+                    await self.search_index.remove(displaced)
+
+        # Catalog first: boilerplate processing replaces repeated image blocks (logos, icons) with refs
+        catalog = await self._build_image_catalog(pages, is_retry=is_retry)
+        boilerplate_count = await self._process_boilerplate(pages, is_retry=is_retry)
+
+        if self.search_index:
+            await self.search_index.flush()
+
+        # Retries append to a segment instead of rewriting pages.json/pages.csv
         if is_retry:
-            # Load existing pages
-            pages_json_file = self.output_dir / "pages.json"
-            if pages_json_file.exists():
-                async with aiofiles.open(pages_json_file, 'r', encoding='utf-8') as f:
-                    content = await f.read()
-                    existing_pages_data = json.loads(content)
-
-                # Remove old versions of retried pages and add new ones
-                retried_urls = {page.url for page in pages}
-                existing_pages_data = [p for p in existing_pages_data if p['url'] not in retried_urls]
-
-                # Add new pages
-                for page in pages:
-                    existing_pages_data.append({
-                        'url': page.url,
-                        'title': page.title,
-                        'metadata': page.metadata,
-                        'structured_content': page.structured_content,
-                        'all_images': page.all_images,
-                        'scraped_at': page.scraped_at.isoformat() if page.scraped_at else None
-                    })
-
-                # Save merged data
-                async with aiofiles.open(pages_json_file, 'w', encoding='utf-8') as f:
-                    await f.write(json.dumps(existing_pages_data, indent=2, ensure_ascii=False))
-
-                pages = [PageData(**p) for p in existing_pages_data]
-
-        # Save hierarchical sitemap as JSON (if provided)
+            await self._save_retry_results(sitemap, pages, catalog)
+            return
+
+        # Save hierarchical sitemap as JSON (if provided), with page outcomes in its tree
         if sitemap:
-            sitemap_file = self.output_dir / "sitemap.json"
-            async with aiofiles.open(sitemap_file, 'w', encoding='utf-8') as f:
-                await f.write(json.dumps({
-                    'total_urls': sitemap.total_urls,
-                    'base_url': self.base_url,
-                    'scraped_at': datetime.utcnow().isoformat(),
-                    'hierarchy': sitemap.hierarchy,
-                    'urls': sitemap.urls
-                }, indent=2, default=str))
-
-        # Save all pages as JSON (new or updated)
-        if not is_retry:
-            pages_json_file = self.output_dir / "pages.json"
-            pages_data = []
+            await self._save_sitemap(sitemap, pages)
 
-            for page in pages:
-                page_dict = {
-                    'url': page.url,
-                    'title': page.title,
-                    'metadata': page.metadata,
-                    'structured_content': page.structured_content,
-                    'all_images': page.all_images,
-                    'scraped_at': page.scraped_at.isoformat() if page.scraped_at else None
-                }
-                pages_data.append(page_dict)
-
-            async with aiofiles.open(pages_json_file, 'w', encoding='utf-8') as f:
-                await f.write(json.dumps(pages_data, indent=2, ensure_ascii=False))
+        # Save all pages as JSON (replaces any retry segments)
+        pages_json_file = self.output_dir / "pages.json"
+        pages_data = await asyncio.to_thread(lambda: [self._page_to_dict(page, catalog) for page in pages])
 
-        # Save pages as CSV
-        pages_csv_file = self.output_dir / "pages.csv"
-        async with aiofiles.open(pages_csv_file, 'w', encoding='utf-8', newline='') as f:
-            if pages:
-                fieldnames = ['url', 'title', 'description', 'keywords', 'author',
-                              'image_count', 'content_blocks', 'full_content', 'all_images']
+        await self._write_json(pages_json_file, pages_data)
+        await asyncio.to_thread(self.page_store.clear_segments)
 
-                csv_data = []
-                csv_data.append(','.join(f'"{field}"' for field in fieldnames) + '\n')
+        # Save near-duplicate clusters (canonical URL -> duplicates)
+        if self.duplicate_detector and self.duplicate_detector.clusters:
+            duplicates_file = self.output_dir / "duplicates.json"
+            await self._write_json(duplicates_file, {
+                'total_duplicates': self.duplicate_detector.duplicate_count,
+                'max_distance': self.duplicate_detector.max_distance,
+                'clusters': self.duplicate_detector.clusters
+            })
 
-                for page in pages:
-                    # Combine structured content into readable text
-                    full_content = ''
-                    for block in page.structured_content:
-                        if block['type'] == 'text':
-                            full_content += block['content'] + ' '
-                        else:
-                            full_content += f"[IMAGE: {block['url']}] "
-
-                    row = [
-                        page.url,
-                        page.title or '',
-                        page.metadata.get('description', ''),
-                        page.metadata.get('keywords', ''),
-                        page.metadata.get('author', ''),
-                        str(len(page.all_images)),
-                        str(len(page.structured_content)),
-                        full_content.strip(),
-                        '; '.join(page.all_images)
-                    ]
-
-                    # Escape and quote CSV values
-                    escaped_row = ','.join(f'"{str(val).replace(chr(34), chr(34) + chr(34))}"' for val in row)
-                    csv_data.append(escaped_row + '\n')
-
-                await f.writelines(csv_data)
+        # Save pages as CSV
+        await self._write_csv(pages)
+
+        # Browser engine vs ContentCleaner comparison (EXTRACTION_ENGINE=compare)
+        if self.extraction_diffs:
+            await self._write_json(self.output_dir / "extraction_diff.json", {
+                'summary': summarize_diffs(self.extraction_diffs),
+                'pages': self.extraction_diffs
+            })
 
         # Save summary with failed URLs
         summary_file = self.output_dir / "summary.json"
@@ -418,23 +769,158 @@ class WebScraper:
             'total_urls_discovered': sitemap.total_urls if sitemap else len(pages),
             'pages_scraped': len(pages),
             'total_images_found': sum(len(p.all_images) for p in pages),
+            'distinct_images': len(catalog) if catalog else None,
             'failed_urls_count': len(self.failed_urls),
-            'failed_urls': [
-                {
-                    'url': f.url,
-                    'error': f.error,
-                    'attempted_at': f.attempted_at.isoformat(),
-                    'retry_count': f.retry_count
-                }
-                for f in self.failed_urls
-            ],
+            'failed_urls': self._failed_urls_data(),
             'errors_count': len(self.errors),
             'errors': self.errors[:50],  # Limit errors
+            'boilerplate_blocks': boilerplate_count,
+            'readiness': self.readiness.summary(),
+            'browser': self.shard.browser_report() if self.shard else self.supervisor.report(self._browser_baseline),
+            'near_duplicates_count': self.duplicate_detector.duplicate_count if self.duplicate_detector else 0,
             'max_depth': self.max_depth,
+            'scope': self.scope.to_dict(),
+            'crawl_traps': self.trap_detector.report() if self.trap_detector else [],
+            'trap_rejected_urls': self.trap_detector.rejected_urls if self.trap_detector else 0,
             'output_formats': ['JSON', 'CSV']
         }
 
-        async with aiofiles.open(summary_file, 'w', encoding='utf-8') as f:
-            await f.write(json.dumps(summary, indent=2))
+        await self._write_json(summary_file, summary)
+
+        print(f"💾 Saved: sitemap.json, pages.json, pages.csv, boilerplate.json, images.json, summary.json")
+
+    def _failed_urls_data(self) -> List[Dict]:
+        return [
+            {
+                'url': f.url,
+                'error': f.error,
+                'attempted_at': f.attempted_at.isoformat(),
+                'retry_count': f.retry_count
+            }
+            for f in self.failed_urls
+        ]
+
+    async def _save_sitemap(self, sitemap: SitemapData, pages: List[PageData]):
+        def tree_dict() -> Dict:
+            tree = sitemap.tree or URLTrie.from_urls(sitemap.urls, self.url_depths)
+            tree.record_pages(pages)
+            tree.record_failures(f.url for f in self.failed_urls)
+            return tree.to_dict()
+
+        sitemap_file = self.output_dir / "sitemap.json"
+        await self._write_json(sitemap_file, {
+            'total_urls': sitemap.total_urls,
+            'base_url': self.base_url,
+            'scraped_at': datetime.utcnow().isoformat(),
+            'tree': await asyncio.to_thread(tree_dict),
+            'urls': sitemap.urls
+        })
+
+    @staticmethod
+    def _csv_lines(pages: List[PageData]) -> List[str]:
+        """pages.csv rows, header first"""
+        fieldnames = ['url', 'title', 'description', 'keywords', 'author',
+                      'image_count', 'content_blocks', 'full_content', 'all_images']
+
+        csv_data = []
+        csv_data.append(','.join(f'"{field}"' for field in fieldnames) + '\n')
+
+        for page in pages:
+            # Combine structured content into readable text
+            full_content = ''
+            for block in page.structured_content:
+                if block['type'] == 'text':
+                    full_content += block['content'] + ' '
+                elif block['type'] == 'image':
+                    full_content += f"[IMAGE: {block['url']}] "
+
+            row = [
+                page.url,
+                page.title or '',
+                page.metadata.get('description', ''),
+                page.metadata.get('keywords', ''),
+                page.metadata.get('author', ''),
+                str(len(page.all_images)),
+                str(len(page.structured_content)),
+                full_content.strip(),
+                '; '.join(page.all_images)
+            ]
+
+            # Escape and quote CSV values
+            escaped_row = ','.join(f'"{str(val).replace(chr(34), chr(34) + chr(34))}"' for val in row)
+            csv_data.append(escaped_row + '\n')
+
+        return csv_data
+
+    async def _write_csv(self, pages: List[PageData]):
+        """Write pages.csv for the full set of pages"""
+        pages_csv_file = self.output_dir / "pages.csv"
+        csv_data = await asyncio.to_thread(self._csv_lines, pages) if pages else []
+        async with aiofiles.open(pages_csv_file, 'w', encoding='utf-8', newline='') as f:
+            await f.writelines(csv_data)
+
+    async def _append_csv(self, pages: List[PageData]):
+        """Add rows for retried pages to pages.csv (written with a header if it doesn't exist yet)"""
+        pages_csv_file = self.output_dir / "pages.csv"
+        if not pages:
+            return
+        if not await aiofiles.os.path.exists(pages_csv_file):
+            await self._write_csv(pages)
+            return
+        rows = (await asyncio.to_thread(self._csv_lines, pages))[1:]
+        async with aiofiles.open(pages_csv_file, 'a', encoding='utf-8', newline='') as f:
+            await f.writelines(rows)
+
+    async def _save_retry_results(self, sitemap: Optional[SitemapData], pages: List[PageData],
+                                  catalog: Optional[ImageCatalog] = None):
+        """Append retried pages to a segment and pages.csv, and update summary.json in place (O(retried pages))"""
+        summary_file = self.output_dir / "summary.json"
+        summary = await self._read_json(summary_file) if await aiofiles.os.path.exists(summary_file) \
+            else {'website': self.base_url}
+
+        total_pages = await self.page_store.append(
+            await asyncio.to_thread(lambda: [self._page_to_dict(page, catalog) for page in pages]),
+            base_count=summary.get('pages_scraped', 0)
+        )
+
+        summary.update({
+            'scraped_at': datetime.utcnow().isoformat(),
+            'pages_scraped': total_pages,
+            'total_images_found': summary.get('total_images_found', 0) + sum(len(p.all_images) for p in pages),
+            'distinct_images': len(catalog) if catalog else summary.get('distinct_images'),
+            'failed_urls_count': len(self.failed_urls),
+            'failed_urls': self._failed_urls_data(),
+            'errors_count': summary.get('errors_count', 0) + len(self.errors),
+            'errors': (summary.get('errors', []) + self.errors)[:50],
+            'pending_segments': await asyncio.to_thread(lambda: self.page_store.segment_count)
+        })
+
+        await self._write_json(summary_file, summary)
+        await self._append_csv(pages)
+
+        # Retried pages change the tree's page and failure counts
+        if sitemap:
+            await self._save_sitemap(sitemap, pages)
+
+        print(f"💾 Saved: {len(pages)} retried pages to segment, pages.csv, images.json, summary.json, sitemap.json")
+
+    async def compact_pages(self):
+        """Fold retry segments into pages.json and regenerate pages.csv"""
+        if not await asyncio.to_thread(self.page_store.has_segments):
+            return
+
+        loop = asyncio.get_running_loop()
+        pages_data = await loop.run_in_executor(None, self.page_store.load_merged)
+        pages = await loop.run_in_executor(None, load_pages_from_disk, str(self.output_dir), pages_data)
+
+        await self.page_store.compact(pages_data, pretty=settings.JSON_PRETTY)
+        await self._write_csv(pages)
+
+        summary_file = self.output_dir / "summary.json"
+        if await aiofiles.os.path.exists(summary_file):
+            summary = await self._read_json(summary_file)
+            summary['pages_scraped'] = len(pages)
+            summary['pending_segments'] = 0
+            await self._write_json(summary_file, summary)
 
-        print(f"💾 Saved: sitemap.json, pages.json, pages.csv, summary.json")
+        print(f"🗜️  Compacted retry segments into pages.json ({len(pages)} pages)")
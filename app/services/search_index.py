@@ -0,0 +1,146 @@
+import asyncio
+import re
+import sqlite3
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+from app.models.content_blocks import ContentBlocks
+
+
+class SearchIndex:
+    """SQLite FTS5 full-text index over a job's pages (search.db in the job directory)"""
+
+    FLUSH_SIZE = 100
+
+    def __init__(self, db_path: Path):
+        self.db_path = Path(db_path)
+        self._pending: List[tuple] = []
+        self._flush_lock = asyncio.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.executescript("""
+            CREATE TABLE IF NOT EXISTS docs (id INTEGER PRIMARY KEY, url TEXT UNIQUE NOT NULL);
+            CREATE VIRTUAL TABLE IF NOT EXISTS pages_fts USING fts5(
+                title, metadata, content, tokenize='unicode61 remove_diacritics 2'
+            );
+        """)
+        return conn
+
+    def exists(self) -> bool:
+        return self.db_path.exists()
+
+    @staticmethod
+    def _document(page: Dict) -> tuple:
+        blocks = page.get('structured_content') or []
+        if isinstance(blocks, ContentBlocks):
+            content = ' '.join(blocks.texts())
+        else:
+            content = ' '.join(b.get('content', '') for b in blocks if b.get('type') == 'text')
+        metadata = ' '.join(str(v) for v in (page.get('metadata') or {}).values())
+        return page['url'], page.get('title') or '', metadata, content
+
+    def _write(self, documents: List[tuple]):
+        conn = self._connect()
+        try:
+            with conn:
+                for url, title, metadata, content in documents:
+                    row = conn.execute("SELECT id FROM docs WHERE url = ?", (url,)).fetchone()
+                    if row:
+                        doc_id = row[0]
+                        conn.execute("DELETE FROM pages_fts WHERE rowid = ?", (doc_id,))
+                    else:
+                        doc_id = conn.execute("INSERT INTO docs (url) VALUES (?)", (url,)).lastrowid
+                    conn.execute(
+                        "INSERT INTO pages_fts (rowid, title, metadata, content) VALUES (?, ?, ?, ?)",
+                        (doc_id, title, metadata, content)
+                    )
+        finally:
+            conn.close()
+
+    async def add(self, page):
+        """Queue a page (PageData or dict) for indexing; writes happen in batches off the event loop"""
+        page_dict = page if isinstance(page, dict) else {
+            'url': page.url, 'title': page.title, 'metadata': page.metadata,
+            'structured_content': page.structured_content,
+        }
+        self._pending.append(self._document(page_dict))
+        if len(self._pending) >= self.FLUSH_SIZE:
+            await self.flush()
+
+    async def flush(self):
+        async with self._flush_lock:
+            if not self._pending:
+                return
+            documents, self._pending = self._pending, []
+            await asyncio.get_running_loop().run_in_executor(None, self._write, documents)
+
+    def _delete(self, urls: List[str]):
+        conn = self._connect()
+        try:
+            with conn:
+                for url in urls:
+                    row = conn.execute("SELECT id FROM docs WHERE url = ?", (url,)).fetchone()
+                    if row:
+                        conn.execute("DELETE FROM pages_fts WHERE rowid = ?", (row[0],))
+                        conn.execute("DELETE FROM docs WHERE id = ?", (row[0],))
+        finally:
+            conn.close()
+
+    async def remove(self, urls: List[str]):
+        """Drop pages from the index (e.g. pages found to be duplicates after they were indexed)"""
+        await self.flush()
+        await asyncio.get_running_loop().run_in_executor(None, self._delete, urls)
+
+    def rebuild(self, pages_data: Iterable[Dict]):
+        """Index every page from scratch (blocking)"""
+        if self.db_path.exists():
+            self.db_path.unlink()
+        for suffix in ('-wal', '-shm'):
+            Path(str(self.db_path) + suffix).unlink(missing_ok=True)
+        self._write([self._document(p) for p in pages_data])
+
+    @staticmethod
+    def build_query(q: str) -> Optional[str]:
+        """Turn free text into a safe FTS5 query: every term is quoted, trailing '*' keeps prefix search"""
+        terms = []
+        for term in q.split():
+            prefix = term.endswith('*')
+            term = re.sub(r'[^\w\-]', ' ', term).strip()
+            if not term:
+                continue
+            quoted = '"' + term.replace('"', '') + '"'
+            terms.append(quoted + '*' if prefix else quoted)
+        return ' '.join(terms) or None
+
+    def search(self, q: str, limit: int = 20, offset: int = 0) -> Dict:
+        """Ranked (bm25, title weighted highest) results with highlighted snippets"""
+        query = self.build_query(q)
+        if not query:
+            return {'total': 0, 'results': []}
+
+        conn = self._connect()
+        try:
+            total = conn.execute("SELECT count(*) FROM pages_fts WHERE pages_fts MATCH ?", (query,)).fetchone()[0]
+            rows = conn.execute("""
+                SELECT docs.url,
+                       highlight(pages_fts, 0, '<mark>', '</mark>'),
+                       snippet(pages_fts, -1, '<mark>', '</mark>', '…', 16),
+                       bm25(pages_fts, 10.0, 2.0, 1.0) AS score
+                FROM pages_fts JOIN docs ON docs.id = pages_fts.rowid
+                WHERE pages_fts MATCH ?
+                ORDER BY score
+                LIMIT ? OFFSET ?
+            """, (query, limit, offset)).fetchall()
+        finally:
+            conn.close()
+
+        return {
+            'total': total,
+            'results': [
+                {'url': url, 'title': title, 'snippet': snippet, 'score': round(-score, 4)}
+                for url, title, snippet, score in rows
+            ]
+        }
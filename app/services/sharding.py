@@ -0,0 +1,350 @@
+import asyncio
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing.util import Finalize
+from typing import Dict, List, Optional, Set, Tuple
+
+from config import settings
+from app.models.schemas import PageData, SitemapData
+from app.services.task_queue import TaskQueue
+from app.utils import serialization
+
+
+# Per-process state of a shard worker (set by _init_worker)
+_worker_scraper = None
+_worker_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+def _init_worker(scraper_kwargs: Dict):
+    """Give this worker process its own event loop, browser and ContentCleaner for its lifetime"""
+    global _worker_scraper, _worker_loop
+    from app.services.scraper import WebScraper  # Imported here: scraper imports this module
+
+    _worker_loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(_worker_loop)
+    _worker_scraper = WebScraper(**scraper_kwargs)
+    _worker_scraper.shard = None
+
+    # Run on orderly pool shutdown (atexit does not run in multiprocessing children)
+    Finalize(None, _close_worker, exitpriority=10)
+
+
+def _close_worker():
+    if _worker_scraper and _worker_loop:
+        _worker_loop.run_until_complete(_worker_scraper.close_browser())
+        _worker_loop.close()
+
+
+async def scrape_batch(scraper, urls: List[str], with_links: bool, worker_id: str, with_html: bool = False) -> Dict:
+    """
+    Load and extract a batch of URLs with scraper (in a shard process or a queue worker).
+    Page HTML is only sent back with_html (the coordinator is writing a WARC).
+    """
+    scraper.errors, scraper.extraction_diffs = [], []
+    semaphore = asyncio.Semaphore(settings.MAX_CONCURRENT_PAGES)
+
+    async def fetch(url: str) -> Tuple:
+        # The page slot applies a queue worker's shared BrowserPool limits (global cap, per-host politeness)
+        async with semaphore, scraper._page_slot(url):
+            try:
+                extracted, html_content = await scraper._fetch_and_extract(url, with_links=with_links,
+                                                                           with_html=with_html)
+                return url, extracted, html_content, None
+            except Exception as e:
+                return url, None, None, str(e)
+
+    results = await asyncio.gather(*[fetch(url) for url in urls])
+    return {
+        'worker': worker_id,
+        'results': results,
+        'errors': scraper.errors,
+        'extraction_diffs': scraper.extraction_diffs,
+        'browser': scraper.supervisor.report(),
+    }
+
+
+def _run_batch(urls: List[str], with_links: bool, with_html: bool) -> Dict:
+    """Shard process entry point"""
+    return _worker_loop.run_until_complete(
+        scrape_batch(_worker_scraper, urls, with_links, worker_id=f"pid-{os.getpid()}", with_html=with_html)
+    )
+
+
+class ProcessDispatcher:
+    """Batches run on a local pool of spawned shard processes"""
+
+    def __init__(self, workers: int, scraper_kwargs: Dict, with_html: bool = False):
+        self.workers = workers
+        self.scraper_kwargs = scraper_kwargs
+        self.with_html = with_html
+        self.executor: Optional[ProcessPoolExecutor] = None
+        self.abandoned = False
+
+    async def __aenter__(self):
+        # Spawn, not fork: the parent runs an event loop and Playwright threads
+        self.executor = ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context('spawn'),
+            initializer=_init_worker,
+            initargs=(self.scraper_kwargs,)
+        )
+        return self
+
+    async def __aexit__(self, *exc_info):
+        # After a timeout, don't wait on shards that may never finish their batch
+        wait = not self.abandoned
+        await asyncio.get_running_loop().run_in_executor(
+            None, lambda: self.executor.shutdown(wait=wait, cancel_futures=True)
+        )
+
+    async def submit(self, urls: List[str], with_links: bool) -> asyncio.Future:
+        return asyncio.get_running_loop().run_in_executor(self.executor, _run_batch, urls, with_links, self.with_html)
+
+
+class QueueDispatcher:
+    """Batches go to a shared TaskQueue and are picked up by worker nodes (python worker.py)"""
+
+    POLL_INTERVAL = 0.5
+
+    def __init__(self, task_queue: TaskQueue, job_id: str, scraper_kwargs: Dict, with_html: bool = False):
+        self.task_queue = task_queue
+        self.job_id = job_id
+        self.scraper_kwargs = scraper_kwargs
+        self.with_html = with_html
+        self.abandoned = False
+        self._futures: Dict[str, asyncio.Future] = {}
+        self._poller: Optional[asyncio.Task] = None
+
+    async def __aenter__(self):
+        self._poller = asyncio.create_task(self._poll())
+        return self
+
+    async def __aexit__(self, *exc_info):
+        self._poller.cancel()
+        await asyncio.to_thread(self.task_queue.purge, self.job_id)
+
+    async def submit(self, urls: List[str], with_links: bool) -> asyncio.Future:
+        payload = serialization.dumps({'scraper': self.scraper_kwargs, 'urls': urls, 'with_links': with_links,
+                                       'with_html': self.with_html})
+        future = asyncio.get_running_loop().create_future()
+        task_id = await asyncio.to_thread(self.task_queue.enqueue, self.job_id, payload)
+        self._futures[task_id] = future
+        return future
+
+    async def _poll(self):
+        while True:
+            if self._futures:
+                for task_id, result, error in await asyncio.to_thread(self.task_queue.take_results, self.job_id):
+                    future = self._futures.pop(task_id, None)
+                    if future is None or future.done():
+                        continue
+                    if error:
+                        future.set_exception(RuntimeError(error))
+                    else:
+                        future.set_result(serialization.loads(result))
+            await asyncio.sleep(self.POLL_INTERVAL)
+
+
+class ShardedCrawl:
+    """
+    Coordinator for SCRAPE_WORKERS > 1 or TASK_QUEUE: owns the frontier, hierarchy and all output
+    state of a WebScraper, and hands URL batches to worker processes (local shards or queue worker
+    nodes) that each run their own browser and ContentCleaner. Results stream back as batches
+    finish. Each page is loaded once: workers return links and page text with the extraction.
+    """
+
+    def __init__(self, scraper, workers: int, batch_size: int = 10, task_queue: Optional[TaskQueue] = None,
+                 job_id: Optional[str] = None, max_in_flight: Optional[int] = None, timeout: int = 0):
+        self.scraper = scraper
+        self.workers = workers
+        self.batch_size = batch_size
+        self.task_queue = task_queue
+        self.job_id = job_id or scraper.output_dir.name
+        self.max_in_flight = max_in_flight or workers * 2
+        self.timeout = timeout  # Overall seconds to wait for batches (0 = no limit)
+        self.worker_browsers: Dict[str, Dict] = {}
+        self._deadline: Optional[float] = None
+
+    def _dispatcher(self):
+        scraper = self.scraper
+        scraper_kwargs = {
+            'base_url': scraper.base_url,
+            'max_depth': scraper.max_depth,
+            'existing_output_dir': str(scraper.output_dir),
+            'include_patterns': scraper.scope.include,
+            'exclude_patterns': scraper.scope.exclude,
+            'allowed_subdomains': scraper.scope.allowed_hosts,
+        }
+        # Page HTML only crosses process boundaries when the coordinator records it in the WARC
+        with_html = scraper.warc_writer is not None
+        if self.task_queue:
+            return QueueDispatcher(self.task_queue, self.job_id, scraper_kwargs, with_html)
+        return ProcessDispatcher(self.workers, scraper_kwargs, with_html)
+
+    def _start_clock(self):
+        self._deadline = asyncio.get_running_loop().time() + self.timeout if self.timeout else None
+
+    @property
+    def expired(self) -> bool:
+        return self._deadline is not None and asyncio.get_running_loop().time() >= self._deadline
+
+    async def _wait(self, dispatcher, in_flight: Dict) -> Set[asyncio.Future]:
+        """
+        Finished batches. Past the job deadline every outstanding batch is cancelled and returned,
+        so a lost task can't keep the job waiting forever.
+        """
+        timeout = None
+        if self._deadline is not None:
+            timeout = max(self._deadline - asyncio.get_running_loop().time(), 0)
+        done, pending = await asyncio.wait(in_flight, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+        if not done and pending:
+            print(f"⏰ Gave up on {len(pending)} batches after {self.timeout}s (SHARD_JOB_TIMEOUT)")
+            dispatcher.abandoned = True
+            for future in pending:
+                future.cancel()
+            done = pending
+        return done
+
+    def _completed(self, future: asyncio.Future, urls: List[str]) -> List[Tuple]:
+        """Successful (url, extracted, html) results of a finished batch; failures are recorded on the scraper"""
+        scraper = self.scraper
+        if future.cancelled():
+            for url in urls:
+                scraper._record_failure(url, f"No worker result within SHARD_JOB_TIMEOUT ({self.timeout}s)")
+            return []
+        try:
+            batch = future.result()
+        except Exception as e:
+            # The worker process died: every page of the batch fails (and can be retried)
+            for url in urls:
+                scraper._record_failure(url, f"Shard worker failed: {e}")
+            return []
+
+        scraper.errors.extend(batch['errors'])
+        scraper.extraction_diffs.extend(batch['extraction_diffs'])
+        self.worker_browsers[batch['worker']] = batch['browser']
+
+        completed = []
+        for url, extracted, html_content, error in batch['results']:
+            if error:
+                scraper._record_failure(url, error)
+            else:
+                completed.append((url, extracted, html_content))
+        return completed
+
+    def browser_report(self) -> Dict:
+        """Worker browser counters summed across processes"""
+        report: Dict[str, int] = {}
+        for worker_report in self.worker_browsers.values():
+            for key, value in worker_report.items():
+                report[key] = max(report.get(key, 0), value) if key == 'peak_rss_mb' else report.get(key, 0) + value
+        report['workers'] = len(self.worker_browsers)
+        return report
+
+    async def crawl(self) -> Tuple[SitemapData, List[PageData]]:
+        """Discover and scrape the site in one pass across the worker processes"""
+        scraper = self.scraper
+
+        all_urls: Set[str] = {scraper.base_url}
+        scraper.url_depths[scraper.base_url] = 0
+        frontier: List[Tuple[str, int]] = [(scraper.base_url, 0)]
+        pages: List[PageData] = []
+        in_flight = {}
+
+        target = 'the task queue' if self.task_queue else f"{self.workers} worker processes"
+        print(f"🧩 Sharded crawl on {target} (max depth: {scraper.max_depth})...")
+        self._start_clock()
+
+        async with self._dispatcher() as dispatcher:
+            while frontier or in_flight:
+                if self.expired:
+                    frontier.clear()  # Out of time: only collect (or give up on) what is in flight
+                # Top up the workers while there is room and budget
+                while frontier and len(in_flight) < self.max_in_flight:
+                    batch = []
+                    while frontier and len(batch) < self.batch_size:
+                        url, depth = frontier.pop(0)
+                        if url in scraper.visited_urls or depth > scraper.max_depth:
+                            continue
+                        if scraper.trap_detector and scraper.trap_detector.is_content_trap(url):
+                            continue
+                        if len(scraper.visited_urls) >= scraper.MAX_SITEMAP_PAGES:
+                            frontier.clear()
+                            break
+                        scraper.visited_urls.add(url)
+                        batch.append((url, depth))
+                    if batch:
+                        future = await dispatcher.submit([url for url, _ in batch], True)
+                        in_flight[future] = batch
+
+                if not in_flight:
+                    break
+
+                for future in await self._wait(dispatcher, in_flight):
+                    batch = in_flight.pop(future)
+                    depths = dict(batch)
+                    for url, extracted, html_content in self._completed(future, list(depths)):
+                        depth = depths[url]
+                        discovered = [
+                            link for link in extracted.pop('links') if link not in scraper.visited_urls
+                        ]
+                        page_text = extracted.pop('page_text', '')
+                        print(f"📍 Depth {depth}: {url}")
+
+                        is_duplicate = scraper._record_discovery(url, discovered, page_text)
+                        for link in scraper._admit_links(discovered, all_urls, depth + 1):
+                            frontier.append((link, depth + 1))
+
+                        if not is_duplicate:
+                            page = await scraper._build_page(url, extracted, html_content)
+                            if page:
+                                pages.append(page)
+                                if scraper.search_index:
+                                    await scraper.search_index.add(page)
+
+            sitemap = scraper._finish_sitemap(all_urls)
+
+            # Discovered but not expanded (beyond max depth or the page budget): scrape without links
+            leftovers = [url for url in sitemap.urls if url not in scraper.visited_urls]
+            if scraper.duplicate_detector:
+                leftovers = [url for url in leftovers if url not in scraper.duplicate_detector.canonical]
+            pages.extend(await self._scrape_with(dispatcher, leftovers))
+
+        print(f"✅ Scraped {len(pages)} pages successfully")
+        return sitemap, pages
+
+    async def scrape(self, urls: List[str]) -> List[PageData]:
+        """Scrape a fixed URL list (e.g. retries) across the worker processes"""
+        self._start_clock()
+        async with self._dispatcher() as dispatcher:
+            pages = await self._scrape_with(dispatcher, urls)
+
+        print(f"✅ Scraped {len(pages)} pages successfully")
+        return pages
+
+    async def _scrape_with(self, dispatcher, urls: List[str]) -> List[PageData]:
+        scraper = self.scraper
+        pages: List[PageData] = []
+
+        if self.expired:
+            for url in urls:
+                scraper._record_failure(url, f"Not scraped within SHARD_JOB_TIMEOUT ({self.timeout}s)")
+            return pages
+
+        in_flight = {}
+        for i in range(0, len(urls), self.batch_size):
+            batch = urls[i:i + self.batch_size]
+            in_flight[await dispatcher.submit(batch, False)] = batch
+
+        while in_flight:
+            for future in await self._wait(dispatcher, in_flight):
+                batch = in_flight.pop(future)
+                for url, extracted, html_content in self._completed(future, batch):
+                    page = await scraper._build_page(url, extracted, html_content)
+                    if page:
+                        pages.append(page)
+                        if scraper.search_index:
+                            await scraper.search_index.add(page)
+
+        return pages
@@ -0,0 +1,334 @@
+import sqlite3
+import threading
+from abc import ABC, abstractmethod
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlparse
+
+try:
+    import redis
+except ImportError:  # Only needed for redis:// queues
+    redis = None
+
+
+class TaskQueue(ABC):
+    """
+    Page batch tasks shared between the coordinating API and worker nodes.
+
+    A task is claimed with a lease; if its worker does not complete it before the lease runs
+    out (crash, lost node) it is handed out again, up to max_attempts. Payloads and results
+    are opaque bytes.
+    """
+
+    STATUSES = ('pending', 'claimed', 'done', 'failed')
+
+    def __init__(self, lease_seconds: int = 300, max_attempts: int = 3):
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+
+    @abstractmethod
+    def enqueue(self, job_id: str, payload: bytes) -> str:
+        ...
+
+    @abstractmethod
+    def claim(self, worker_id: str) -> Optional[Tuple[str, str, bytes]]:
+        """Next (task_id, job_id, payload) or None when nothing is pending"""
+
+    @abstractmethod
+    def complete(self, task_id: str, result: bytes):
+        ...
+
+    @abstractmethod
+    def take_results(self, job_id: str) -> List[Tuple[str, Optional[bytes], Optional[str]]]:
+        """Finished tasks not yet collected: (task_id, result, error); error is set for failed tasks"""
+
+    @abstractmethod
+    def job_counts(self, job_id: str) -> Dict[str, int]:
+        ...
+
+    @abstractmethod
+    def stats(self) -> Dict:
+        ...
+
+    @abstractmethod
+    def purge(self, job_id: str):
+        """Drop every task of a job, pending or not"""
+
+
+class SQLiteTaskQueue(TaskQueue):
+    """Queue in a local SQLite file: workers on the same machine (or a shared filesystem)"""
+
+    def __init__(self, path: Path, **kwargs):
+        super().__init__(**kwargs)
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._local = threading.local()
+        with self._connect() as conn:
+            conn.executescript("""
+                CREATE TABLE IF NOT EXISTS tasks (
+                    id INTEGER PRIMARY KEY,
+                    job_id TEXT NOT NULL,
+                    payload BLOB,
+                    status TEXT NOT NULL DEFAULT 'pending',
+                    worker TEXT,
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    lease_until REAL,
+                    result BLOB,
+                    error TEXT,
+                    collected INTEGER NOT NULL DEFAULT 0
+                );
+                CREATE INDEX IF NOT EXISTS tasks_status ON tasks (status, id);
+                CREATE INDEX IF NOT EXISTS tasks_job ON tasks (job_id, status);
+            """)
+
+    def _connect(self) -> sqlite3.Connection:
+        # One connection per thread: the API calls in from executor threads
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def enqueue(self, job_id: str, payload: bytes) -> str:
+        conn = self._connect()
+        cursor = conn.execute("INSERT INTO tasks (job_id, payload) VALUES (?, ?)", (job_id, payload))
+        return str(cursor.lastrowid)
+
+    def claim(self, worker_id: str) -> Optional[Tuple[str, str, bytes]]:
+        conn = self._connect()
+        now = time.time()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            # Expired leases go back to pending, or fail once out of attempts
+            conn.execute("""
+                UPDATE tasks SET status = CASE WHEN attempts >= ? THEN 'failed' ELSE 'pending' END,
+                                 error = CASE WHEN attempts >= ? THEN 'Lease expired ' || attempts || ' times' END,
+                                 worker = NULL
+                WHERE status = 'claimed' AND lease_until < ?
+            """, (self.max_attempts, self.max_attempts, now))
+            row = conn.execute(
+                "SELECT id, job_id, payload FROM tasks WHERE status = 'pending' ORDER BY id LIMIT 1"
+            ).fetchone()
+            if row:
+                conn.execute(
+                    "UPDATE tasks SET status = 'claimed', worker = ?, attempts = attempts + 1, lease_until = ? "
+                    "WHERE id = ?",
+                    (worker_id, now + self.lease_seconds, row[0])
+                )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+        if not row:
+            return None
+        return str(row[0]), row[1], row[2]
+
+    def complete(self, task_id: str, result: bytes):
+        self._connect().execute(
+            "UPDATE tasks SET status = 'done', result = ?, payload = NULL, lease_until = NULL "
+            "WHERE id = ? AND status != 'done'",
+            (result, int(task_id))
+        )
+
+    def take_results(self, job_id: str) -> List[Tuple[str, Optional[bytes], Optional[str]]]:
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            rows = conn.execute(
+                "SELECT id, result, error FROM tasks "
+                "WHERE job_id = ? AND status IN ('done', 'failed') AND collected = 0",
+                (job_id,)
+            ).fetchall()
+            if rows:
+                # Results are dropped once collected; the row stays for progress counts
+                conn.executemany(
+                    "UPDATE tasks SET collected = 1, result = NULL, payload = NULL WHERE id = ?",
+                    [(row[0],) for row in rows]
+                )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return [(str(task_id), result, error) for task_id, result, error in rows]
+
+    def job_counts(self, job_id: str) -> Dict[str, int]:
+        counts = dict.fromkeys(self.STATUSES, 0)
+        for status, count in self._connect().execute(
+            "SELECT status, count(*) FROM tasks WHERE job_id = ? GROUP BY status", (job_id,)
+        ):
+            counts[status] = count
+        return counts
+
+    def stats(self) -> Dict:
+        conn = self._connect()
+        counts = dict.fromkeys(self.STATUSES, 0)
+        for status, count in conn.execute("SELECT status, count(*) FROM tasks GROUP BY status"):
+            counts[status] = count
+        workers = conn.execute(
+            "SELECT count(DISTINCT worker) FROM tasks WHERE status = 'claimed' AND lease_until >= ?",
+            (time.time(),)
+        ).fetchone()[0]
+        return {'backend': 'sqlite', **counts, 'busy_workers': workers}
+
+    def purge(self, job_id: str):
+        self._connect().execute("DELETE FROM tasks WHERE job_id = ?", (job_id,))
+
+
+class RedisTaskQueue(TaskQueue):
+    """
+    Queue on a Redis-compatible server: workers on any number of nodes.
+
+    Claiming (with the requeue of expired leases) and completing run as Lua scripts, so a worker
+    dying mid-call can't leave a task popped from the pending list without a lease.
+    """
+
+    PREFIX = 'scraper:queue'
+
+    # KEYS: pending list, leases zset. ARGV: prefix, now, lease expiry, worker id, lease seconds, max attempts
+    CLAIM_SCRIPT = """
+        local prefix = ARGV[1]
+        for _, task_id in ipairs(redis.call('ZRANGEBYSCORE', KEYS[2], 0, ARGV[2])) do
+            redis.call('ZREM', KEYS[2], task_id)
+            local task_key = prefix .. ':task:' .. task_id
+            local job_id = redis.call('HGET', task_key, 'job_id')
+            if job_id then
+                local job_key = prefix .. ':job:' .. job_id
+                redis.call('HINCRBY', job_key, 'claimed', -1)
+                if tonumber(redis.call('HGET', task_key, 'attempts') or 0) >= tonumber(ARGV[6]) then
+                    redis.call('HSET', task_key, 'error', 'Lease expired ' .. ARGV[6] .. ' times')
+                    redis.call('HINCRBY', job_key, 'failed', 1)
+                    redis.call('RPUSH', prefix .. ':results:' .. job_id, task_id)
+                else
+                    redis.call('HINCRBY', job_key, 'pending', 1)
+                    redis.call('LPUSH', KEYS[1], task_id)
+                end
+            end
+        end
+
+        while true do
+            local task_id = redis.call('LPOP', KEYS[1])
+            if not task_id then
+                return nil
+            end
+            local task_key = prefix .. ':task:' .. task_id
+            local job_id = redis.call('HGET', task_key, 'job_id')
+            if job_id then  -- Otherwise the job was purged: skip the leftover entry
+                local job_key = prefix .. ':job:' .. job_id
+                redis.call('ZADD', KEYS[2], ARGV[3], task_id)
+                redis.call('HSET', task_key, 'worker', ARGV[4])
+                redis.call('HINCRBY', task_key, 'attempts', 1)
+                redis.call('HINCRBY', job_key, 'pending', -1)
+                redis.call('HINCRBY', job_key, 'claimed', 1)
+                redis.call('SETEX', prefix .. ':worker:' .. ARGV[4], ARGV[5], 1)
+                return {task_id, job_id, redis.call('HGET', task_key, 'payload')}
+            end
+        end
+    """
+
+    # KEYS: leases zset. ARGV: prefix, task id, result
+    COMPLETE_SCRIPT = """
+        if redis.call('ZREM', KEYS[1], ARGV[2]) == 0 then
+            return 0  -- Lease expired and the task was handed to another worker
+        end
+        local task_key = ARGV[1] .. ':task:' .. ARGV[2]
+        local job_id = redis.call('HGET', task_key, 'job_id')
+        if not job_id then
+            return 0
+        end
+        local job_key = ARGV[1] .. ':job:' .. job_id
+        redis.call('HSET', task_key, 'result', ARGV[3])
+        redis.call('HDEL', task_key, 'payload')
+        redis.call('HINCRBY', job_key, 'claimed', -1)
+        redis.call('HINCRBY', job_key, 'done', 1)
+        redis.call('RPUSH', ARGV[1] .. ':results:' .. job_id, ARGV[2])
+        return 1
+    """
+
+    def __init__(self, url: str, **kwargs):
+        super().__init__(**kwargs)
+        if redis is None:
+            raise RuntimeError("redis:// task queues need the 'redis' package (pip install redis)")
+        self.client = redis.Redis.from_url(url)
+        self._claim = self.client.register_script(self.CLAIM_SCRIPT)
+        self._complete = self.client.register_script(self.COMPLETE_SCRIPT)
+
+    def _key(self, *parts: str) -> str:
+        return ':'.join((self.PREFIX,) + parts)
+
+    def enqueue(self, job_id: str, payload: bytes) -> str:
+        task_id = str(self.client.incr(self._key('next_id')))
+        pipe = self.client.pipeline()
+        pipe.hset(self._key('task', task_id), mapping={'job_id': job_id, 'payload': payload, 'attempts': 0})
+        pipe.sadd(self._key('tasks', job_id), task_id)
+        pipe.hincrby(self._key('job', job_id), 'pending', 1)
+        pipe.rpush(self._key('pending'), task_id)
+        pipe.execute()
+        return task_id
+
+    def claim(self, worker_id: str) -> Optional[Tuple[str, str, bytes]]:
+        now = time.time()
+        claimed = self._claim(
+            keys=[self._key('pending'), self._key('leases')],
+            args=[self.PREFIX, now, now + self.lease_seconds, worker_id, self.lease_seconds, self.max_attempts]
+        )
+        if not claimed:
+            return None
+        task_id, job_id, payload = claimed
+        return task_id.decode(), job_id.decode(), payload
+
+    def complete(self, task_id: str, result: bytes):
+        self._complete(keys=[self._key('leases')], args=[self.PREFIX, task_id, result])
+
+    def take_results(self, job_id: str) -> List[Tuple[str, Optional[bytes], Optional[str]]]:
+        results = []
+        while True:
+            raw_id = self.client.lpop(self._key('results', job_id))
+            if raw_id is None:
+                return results
+            task_id = raw_id.decode()
+            task_key = self._key('task', task_id)
+            result, error = self.client.hmget(task_key, 'result', 'error')
+            pipe = self.client.pipeline()
+            pipe.delete(task_key)
+            pipe.srem(self._key('tasks', job_id), task_id)
+            pipe.execute()
+            results.append((task_id, result, error.decode() if error else None))
+
+    def job_counts(self, job_id: str) -> Dict[str, int]:
+        raw = self.client.hgetall(self._key('job', job_id))
+        counts = dict.fromkeys(self.STATUSES, 0)
+        counts.update({key.decode(): int(value) for key, value in raw.items()})
+        return counts
+
+    def stats(self) -> Dict:
+        return {
+            'backend': 'redis',
+            'pending': self.client.llen(self._key('pending')),
+            'claimed': self.client.zcard(self._key('leases')),
+            'busy_workers': sum(1 for _ in self.client.scan_iter(self._key('worker', '*'))),
+        }
+
+    def purge(self, job_id: str):
+        task_ids = [raw_id.decode() for raw_id in self.client.smembers(self._key('tasks', job_id))]
+        pipe = self.client.pipeline()
+        for task_id in task_ids:
+            pipe.delete(self._key('task', task_id))
+            pipe.lrem(self._key('pending'), 0, task_id)
+            pipe.zrem(self._key('leases'), task_id)
+        pipe.delete(self._key('tasks', job_id), self._key('job', job_id), self._key('results', job_id))
+        pipe.execute()
+
+
+def open_task_queue(url: str, lease_seconds: int = 300, max_attempts: int = 3) -> TaskQueue:
+    """sqlite:///path/to/queue.db (relative) or sqlite:////abs/path.db, redis://host:6379/0"""
+    parsed = urlparse(url)
+    if parsed.scheme == 'sqlite':
+        return SQLiteTaskQueue(Path(parsed.path[1:] if parsed.path.startswith('/') else parsed.path),
+                               lease_seconds=lease_seconds, max_attempts=max_attempts)
+    if parsed.scheme in ('redis', 'rediss', 'unix'):
+        return RedisTaskQueue(url, lease_seconds=lease_seconds, max_attempts=max_attempts)
+    raise ValueError(f"Unsupported TASK_QUEUE URL: {url}")
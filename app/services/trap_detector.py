@@ -0,0 +1,166 @@
+import hashlib
+import re
+from collections import Counter
+from urllib.parse import urlsplit, parse_qsl
+from typing import List, Dict, Set
+
+
+class PatternStats:
+    """Growth and content statistics for one URL template"""
+
+    __slots__ = ('pattern', 'discovered', 'admitted', 'rejected', 'status', 'reason', 'retroactive', 'content_hashes')
+
+    def __init__(self, pattern: str):
+        self.pattern = pattern
+        self.discovered = 0
+        self.admitted = 0
+        self.rejected = 0
+        self.status = 'ok'  # ok, throttled, quarantined
+        self.reason = ''
+        self.retroactive = False  # Also drop URLs admitted before the quarantine
+        self.content_hashes: Counter = Counter()
+
+    def to_dict(self) -> Dict:
+        return {
+            'pattern': self.pattern,
+            'status': self.status,
+            'reason': self.reason,
+            'urls_discovered': self.discovered,
+            'urls_admitted': self.admitted,
+            'urls_rejected': self.rejected,
+            'pages_visited': sum(self.content_hashes.values()),
+            'distinct_contents': len(self.content_hashes),
+        }
+
+
+class CrawlTrapDetector:
+    """
+    Detect crawler traps (calendars, infinite pagination, filter combinations, session IDs)
+    by templating discovered URLs and watching how each template grows.
+    """
+
+    THROTTLE_SAMPLE = 10  # Throttled patterns admit one URL in this many
+    MIN_CONTENT_SAMPLES = 10
+    MAX_QUERY_VARIANTS = 8  # Distinct query-key sets per path before query variants are quarantined
+
+    _ID_SEGMENT = re.compile(r'^(?:[0-9a-f]{8,}|[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12})$', re.I)
+    _DIGITS = re.compile(r'\d+')
+    # Session parameters in the path, or sid/session/sess followed by a hex token containing a digit
+    # (so slugs like /docs/session-management are not matched)
+    _SESSION = re.compile(
+        r';(?:jsessionid|sid|phpsessid)=|/(?:sid|session|sess)[-_=](?=[0-9a-f]*\d)[0-9a-f]{16,}(?=/|$)', re.I
+    )
+
+    def __init__(self, max_urls_per_pattern: int = 200, max_repeated_segments: int = 3,
+                 duplicate_content_ratio: float = 0.8):
+        self.max_urls_per_pattern = max_urls_per_pattern
+        self.max_repeated_segments = max_repeated_segments
+        self.duplicate_content_ratio = duplicate_content_ratio
+
+        self.patterns: Dict[str, PatternStats] = {}
+        self.url_patterns: Dict[str, str] = {}  # Admitted URL -> pattern
+        self.query_variants: Dict[str, Set[str]] = {}  # Path template -> query templates
+        self.rejected_urls = 0
+
+    def _template_segment(self, segment: str) -> str:
+        if self._ID_SEGMENT.match(segment):
+            return '{id}'
+        return self._DIGITS.sub('{n}', segment)
+
+    def template(self, url: str) -> str:
+        """Collapse variable parts of a URL: digit runs, hex/UUID ids and query values"""
+        parts = urlsplit(url)
+        path = '/'.join(self._template_segment(s) for s in parts.path.split('/'))
+        keys = sorted({key for key, _ in parse_qsl(parts.query, keep_blank_values=True)})
+        query = '?' + '&'.join(keys) if keys else ''
+        return parts.netloc + path + query
+
+    def _has_repeating_segments(self, path: str) -> bool:
+        segments = [s for s in path.split('/') if s]
+        if not segments:
+            return False
+        return Counter(segments).most_common(1)[0][1] > self.max_repeated_segments
+
+    def _stats(self, pattern: str) -> PatternStats:
+        stats = self.patterns.get(pattern)
+        if stats is None:
+            stats = self.patterns[pattern] = PatternStats(pattern)
+        return stats
+
+    def _quarantine(self, stats: PatternStats, reason: str, retroactive: bool = False):
+        """
+        Stop admitting URLs of a pattern. Only retroactive quarantines (pages serving identical
+        content) also drop the pattern's already admitted URLs; a pattern that merely grew large
+        keeps the pages it has.
+        """
+        if stats.status != 'quarantined' or (retroactive and not stats.retroactive):
+            stats.status = 'quarantined'
+            stats.reason = reason
+            stats.retroactive = retroactive
+            print(f"🪤 Quarantined URL pattern {stats.pattern}: {reason}")
+
+    def admit(self, url: str) -> bool:
+        """Decide whether a newly discovered URL should be queued"""
+        parts = urlsplit(url)
+        pattern = self.template(url)
+        stats = self._stats(pattern)
+        stats.discovered += 1
+
+        if stats.status == 'ok':
+            if self._SESSION.search(parts.path):
+                self._quarantine(stats, 'session identifier in path')
+            elif self._has_repeating_segments(parts.path):
+                self._quarantine(stats, 'repeating path segments')
+            elif parts.query:
+                path_pattern = pattern.split('?', 1)[0]
+                variants = self.query_variants.setdefault(path_pattern, set())
+                variants.add(pattern)
+                if len(variants) > self.MAX_QUERY_VARIANTS:
+                    self._quarantine(stats, 'query parameter combinations')
+
+        if stats.status == 'ok' and stats.admitted >= self.max_urls_per_pattern:
+            stats.status = 'throttled'
+            stats.reason = f'more than {self.max_urls_per_pattern} URLs'
+            print(f"🐢 Throttling URL pattern {pattern}")
+
+        if stats.status == 'throttled' and stats.admitted >= self.max_urls_per_pattern * 2:
+            self._quarantine(stats, f'more than {self.max_urls_per_pattern * 2} URLs')
+
+        admitted = stats.status == 'ok' or (
+            stats.status == 'throttled' and stats.discovered % self.THROTTLE_SAMPLE == 0
+        )
+
+        if admitted:
+            stats.admitted += 1
+            self.url_patterns[url] = pattern
+        else:
+            stats.rejected += 1
+            self.rejected_urls += 1
+
+        return admitted
+
+    def record_content(self, url: str, text: str):
+        """Track visited page content per pattern; patterns serving the same content are quarantined"""
+        pattern = self.url_patterns.get(url)
+        if pattern is None or not text:
+            return
+
+        stats = self.patterns[pattern]
+        stats.content_hashes[hashlib.sha1(text.encode('utf-8')).hexdigest()] += 1
+
+        visited = sum(stats.content_hashes.values())
+        if visited >= self.MIN_CONTENT_SAMPLES:
+            repeated = stats.content_hashes.most_common(1)[0][1]
+            if repeated / visited >= self.duplicate_content_ratio:
+                self._quarantine(stats, 'pages return identical content', retroactive=True)
+
+    def is_content_trap(self, url: str) -> bool:
+        """Whether an admitted URL belongs to a pattern quarantined for serving identical content"""
+        pattern = self.url_patterns.get(url)
+        return pattern is not None and self.patterns[pattern].retroactive
+
+    def report(self) -> List[Dict]:
+        """Throttled and quarantined patterns, worst first"""
+        flagged = [s for s in self.patterns.values() if s.status != 'ok']
+        flagged.sort(key=lambda s: s.discovered, reverse=True)
+        return [s.to_dict() for s in flagged]
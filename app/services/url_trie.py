@@ -0,0 +1,227 @@
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+
+def _split(url: str) -> Tuple[str, Tuple[str, ...]]:
+    """'https://example.com/docs/api?v=2' -> ('https://example.com', ('docs', 'api', '?v=2'))"""
+    parts = urlsplit(url)
+    segments = parts.path.split('/')[1:] if parts.path not in ('', '/') else []
+    if parts.query:
+        segments.append('?' + parts.query)
+    return f"{parts.scheme}://{parts.netloc}", tuple(segments)
+
+
+def _label(segments: Iterable[str]) -> str:
+    """Path text for segments: ('docs', 'api', '?v=2') -> '/docs/api?v=2'"""
+    return ''.join(segment if segment.startswith('?') else '/' + segment for segment in segments)
+
+
+def _parse_label(label: str) -> Tuple[str, ...]:
+    head, sep, query = label.partition('?')
+    segments = head.split('/')[1:] if head else []
+    if sep:
+        segments.append('?' + query)
+    return tuple(segments)
+
+
+class TrieNode:
+    """One edge of the path trie; single-child chains share a node (segments holds the whole chain)"""
+
+    __slots__ = ('segments', 'children', 'status', 'depth', 'images')
+
+    def __init__(self, segments: Tuple[str, ...] = ()):
+        self.segments = segments
+        self.children: Dict[str, 'TrieNode'] = {}  # First segment of the child's edge -> child
+        self.status: Optional[str] = None  # Set when the node is a URL: discovered, scraped or failed
+        self.depth: Optional[int] = None  # Crawl depth (links from the start URL)
+        self.images = 0
+
+    def stats(self) -> Dict[str, int]:
+        """Totals for this node and everything below it"""
+        totals = {'urls': 0, 'pages': 0, 'failed': 0, 'images': 0}
+        stack = [self]
+        while stack:
+            node = stack.pop()
+            if node.status:
+                totals['urls'] += 1
+                totals['pages'] += node.status == 'scraped'
+                totals['failed'] += node.status == 'failed'
+                totals['images'] += node.images
+            stack.extend(node.children.values())
+        return totals
+
+    def own(self) -> Optional[Dict]:
+        if not self.status:
+            return None
+        return {'status': self.status, 'depth': self.depth, 'images': self.images}
+
+
+class URLTrie:
+    """
+    Site structure as a compact path trie: origin -> path segments (query strings last), with
+    per-node page, failure and image totals. Shared prefixes are stored once, and chains of
+    path segments without a page of their own collapse into a single node.
+    """
+
+    def __init__(self):
+        self.root = TrieNode()
+        self.source_bytes = 0  # Size of the sitemap.json it was read from (cache accounting)
+
+    def __len__(self) -> int:
+        return self.root.stats()['urls']
+
+    def _insert(self, url: str) -> TrieNode:
+        origin, segments = _split(url)
+        node = self.root.children.get(origin)
+        if node is None:
+            node = self.root.children[origin] = TrieNode((origin,))
+
+        while segments:
+            child = node.children.get(segments[0])
+            if child is None:
+                child = node.children[segments[0]] = TrieNode(segments)
+                return child
+
+            common = 0
+            while common < min(len(child.segments), len(segments)) and \
+                    child.segments[common] == segments[common]:
+                common += 1
+            if common < len(child.segments):
+                # The new path leaves this edge partway: split it
+                middle = TrieNode(child.segments[:common])
+                child.segments = child.segments[common:]
+                middle.children[child.segments[0]] = child
+                node.children[segments[0]] = middle
+                child = middle
+
+            node, segments = child, segments[common:]
+        return node
+
+    def _find(self, url: str) -> Optional[TrieNode]:
+        origin, segments = _split(url)
+        node = self.root.children.get(origin)
+        while node is not None and segments:
+            child = node.children.get(segments[0])
+            if child is None or segments[:len(child.segments)] != child.segments:
+                return None
+            node, segments = child, segments[len(child.segments):]
+        return node if node is not None and node.status else None
+
+    def add(self, url: str, depth: Optional[int] = None, status: str = 'discovered'):
+        node = self._insert(url)
+        if not node.status or status != 'discovered':
+            node.status = status
+        if depth is not None and (node.depth is None or depth < node.depth):
+            node.depth = depth
+
+    @classmethod
+    def from_urls(cls, urls: Iterable[str], depths: Optional[Dict[str, int]] = None) -> 'URLTrie':
+        trie = cls()
+        depths = depths or {}
+        for url in urls:
+            trie.add(url, depths.get(url))
+        return trie
+
+    def record_pages(self, pages: Iterable[Any]):
+        """Mark scraped pages (PageData or page dicts, catalog-referenced or not) with their image counts"""
+        for page in pages:
+            if isinstance(page, dict):
+                url, images = page['url'], page.get('all_images') or page.get('image_ids') or []
+            else:
+                url, images = page.url, page.all_images
+            node = self._find(url) or self._insert(url)
+            node.status = 'scraped'
+            node.images = len(images)
+
+    def record_failures(self, urls: Iterable[str]):
+        for url in urls:
+            node = self._find(url) or self._insert(url)
+            node.status = 'failed'
+
+    def to_dict(self, max_depth: Optional[int] = None) -> Dict:
+        """Serializable tree; below max_depth levels only child counts are kept"""
+        return self._node_dict(self.root, '', max_depth)
+
+    def _node_dict(self, node: TrieNode, label: str, max_depth: Optional[int]) -> Dict:
+        data = {'label': label}
+        own = node.own()
+        if own:
+            data['url'] = own
+
+        if not node.children or (max_depth is not None and max_depth <= 0):
+            data['stats'] = node.stats()
+            if node.children:
+                data['child_count'] = len(node.children)
+            return data
+
+        next_depth = None if max_depth is None else max_depth - 1
+        children = [
+            self._node_dict(child, key if node is self.root else _label(child.segments), next_depth)
+            for key, child in sorted(node.children.items())
+        ]
+        # Totals from the children already computed: one pass over the subtree
+        stats = {key: sum(child['stats'][key] for child in children) for key in ('urls', 'pages', 'failed', 'images')}
+        if own:
+            stats['urls'] += 1
+            stats['pages'] += own['status'] == 'scraped'
+            stats['failed'] += own['status'] == 'failed'
+            stats['images'] += own['images']
+        data['stats'] = stats
+        data['children'] = children
+        return data
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'URLTrie':
+        trie = cls()
+        stack: List[Tuple[TrieNode, Dict]] = [(trie.root, data)]
+        while stack:
+            node, node_data = stack.pop()
+            for child_data in node_data.get('children', []):
+                # Origins are labelled with the full origin, everything below with its path
+                segments = (child_data['label'],) if node is trie.root else _parse_label(child_data['label'])
+                child = TrieNode(segments)
+                own = child_data.get('url')
+                if own:
+                    child.status, child.depth, child.images = own['status'], own.get('depth'), own.get('images', 0)
+                node.children[segments[0]] = child
+                stack.append((child, child_data))
+        return trie
+
+    @classmethod
+    def from_hierarchy(cls, urls: List[str], hierarchy: Dict[str, List[str]], base_url: str) -> 'URLTrie':
+        """Trie for a sitemap.json written before trees existed (parent -> children link map)"""
+        depths = {base_url: 0}
+        queue = [base_url]
+        for parent in queue:
+            for child in hierarchy.get(parent, []):
+                if child not in depths:
+                    depths[child] = depths[parent] + 1
+                    queue.append(child)
+        return cls.from_urls(urls, depths)
+
+    def subtree(self, prefix: str, base_url: str, max_depth: int = 1) -> Optional[Dict]:
+        """
+        Node for a path prefix ('/docs' on the base URL's origin, or a full URL), expanded max_depth
+        levels. A prefix ending inside a collapsed chain resolves to the node the chain leads to.
+        """
+        if not prefix:
+            return {**self.to_dict(max_depth), 'path': '', 'href': None}
+
+        if '://' not in prefix:
+            prefix = _split(base_url)[0] + '/' + prefix.lstrip('/')
+        origin, segments = _split(prefix)
+
+        node = self.root.children.get(origin)
+        path: List[str] = []
+        while node is not None and segments:
+            child = node.children.get(segments[0])
+            matched = segments[:len(child.segments)] if child else ()
+            if child is None or child.segments[:len(matched)] != matched:
+                return None
+            node, segments = child, segments[len(matched):]
+            path.extend(child.segments)
+        if node is None:
+            return None
+
+        label = origin if not path else _label(node.segments)
+        return {**self._node_dict(node, label, max_depth), 'path': _label(path) or '/', 'href': origin + _label(path)}
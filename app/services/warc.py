@@ -0,0 +1,96 @@
+import asyncio
+import gzip
+import uuid
+from datetime import datetime
+from pathlib import Path
+from typing import Iterator, Dict, Optional, Tuple
+
+import aiofiles
+import aiofiles.os
+
+
+class WARCWriter:
+    """Append-only writer for compressed WARC/1.1 files (one gzip member per record)"""
+
+    def __init__(self, path: Path, software: str = 'web-scraper'):
+        self.path = Path(path)
+        self.software = software
+        self._lock = asyncio.Lock()
+
+    @staticmethod
+    def _build_record(record_type: str, headers: Dict[str, str], payload: bytes) -> bytes:
+        header_lines = [
+            'WARC/1.1',
+            f'WARC-Type: {record_type}',
+            f'WARC-Record-ID: <urn:uuid:{uuid.uuid4()}>',
+        ]
+        header_lines += [f'{key}: {value}' for key, value in headers.items()]
+        header_lines.append(f'Content-Length: {len(payload)}')
+
+        record = ('\r\n'.join(header_lines) + '\r\n\r\n').encode('utf-8') + payload + b'\r\n\r\n'
+        return gzip.compress(record)
+
+    async def _append(self, data: bytes):
+        async with self._lock:
+            async with aiofiles.open(self.path, 'ab') as f:
+                await f.write(data)
+
+    async def write_warcinfo(self):
+        """Write a warcinfo record when starting a new file"""
+        if await aiofiles.os.path.exists(self.path):
+            return
+        payload = f'software: {self.software}\r\nformat: WARC File Format 1.1\r\n'.encode('utf-8')
+        await self._append(self._build_record('warcinfo', {
+            'WARC-Date': datetime.utcnow().strftime('%Y-%m-%dT%H:%M:%SZ'),
+            'WARC-Filename': self.path.name,
+            'Content-Type': 'application/warc-fields',
+        }, payload))
+
+    async def write_resource(self, url: str, html: str, captured_at: Optional[datetime] = None):
+        """
+        Record a rendered page. The payload is the post-JavaScript DOM (page.content()),
+        which is exactly what ContentCleaner consumes, so replays reproduce extraction.
+        """
+        captured_at = captured_at or datetime.utcnow()
+        await self._append(self._build_record('resource', {
+            'WARC-Target-URI': url,
+            'WARC-Date': captured_at.strftime('%Y-%m-%dT%H:%M:%SZ'),
+            'Content-Type': 'text/html; charset=utf-8',
+        }, html.encode('utf-8')))
+
+
+def iter_warc_records(path: Path) -> Iterator[Dict]:
+    """Yield records from a (possibly multi-member) .warc.gz file as {'headers', 'payload'}"""
+    with gzip.open(path, 'rb') as f:
+        while True:
+            line = f.readline()
+            if not line:
+                return
+            if not line.strip():
+                continue
+            if not line.startswith(b'WARC/'):
+                raise ValueError(f'Invalid WARC record header in {path}: {line[:40]!r}')
+
+            headers = {}
+            while True:
+                line = f.readline()
+                if not line or line in (b'\r\n', b'\n'):
+                    break
+                key, _, value = line.decode('utf-8').partition(':')
+                headers[key.strip()] = value.strip()
+
+            payload = f.read(int(headers.get('Content-Length', 0)))
+            yield {'headers': headers, 'payload': payload}
+
+
+def iter_warc_pages(path: Path) -> Iterator[Tuple[str, str, datetime]]:
+    """(url, html, captured_at) for each captured page in file order; a URL captured again appears again"""
+    for record in iter_warc_records(path):
+        headers = record['headers']
+        if headers.get('WARC-Type') != 'resource':
+            continue
+        yield (
+            headers['WARC-Target-URI'],
+            record['payload'].decode('utf-8', errors='replace'),
+            datetime.strptime(headers['WARC-Date'], '%Y-%m-%dT%H:%M:%SZ'),
+        )
@@ -0,0 +1,47 @@
+import json
+from datetime import datetime, date
+from typing import Any, Union
+
+try:
+    import orjson
+except ImportError:  # Optional speedup; stdlib json is used otherwise
+    orjson = None
+
+from app.models.content_blocks import ContentBlocks
+
+
+BACKEND = 'orjson' if orjson else 'json'
+
+
+def _default(obj: Any) -> Any:
+    if isinstance(obj, ContentBlocks):
+        return obj.to_list()
+    if isinstance(obj, (datetime, date)):
+        return obj.isoformat()
+    if hasattr(obj, 'model_dump'):
+        return obj.model_dump(mode='json')
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def dumps(obj: Any, pretty: bool = False) -> bytes:
+    """Serialize to UTF-8 JSON bytes, compact unless pretty is set"""
+    if orjson:
+        option = orjson.OPT_NON_STR_KEYS
+        if pretty:
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, default=_default, option=option)
+
+    if pretty:
+        return json.dumps(obj, default=_default, ensure_ascii=False, indent=2).encode('utf-8')
+    return json.dumps(obj, default=_default, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+def loads(data: Union[bytes, str]) -> Any:
+    if orjson:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def read_json_file(path) -> Any:
+    with open(path, 'rb') as f:
+        return loads(f.read())
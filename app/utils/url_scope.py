@@ -0,0 +1,162 @@
+import re
+from urllib.parse import urlsplit, SplitResult
+from typing import List, Optional, Iterable, Dict, Pattern
+
+
+class URLScope:
+    """
+    Compiled include/exclude rules for crawl scoping.
+
+    Patterns are matched against the URL path (plus '?query' when present):
+    - 're:<regex>'  regular expression (searched)
+    - '/docs/'      plain path prefix (no wildcards)
+    - '/docs/**'    glob; '**' crosses '/', '*' and '?' do not
+
+    Links are matched without their trailing slash, so '/docs/' and '/docs/**' also match the
+    section's own page (/docs).
+
+    Hosts: the base host is always in scope, extra hosts come from allowed_hosts
+    ('*.example.com' matches any subdomain). If global_allowed_hosts is given,
+    every host must also match it.
+    """
+
+    def __init__(self, base_url: str, include: Optional[List[str]] = None, exclude: Optional[List[str]] = None,
+                 allowed_hosts: Optional[List[str]] = None, global_allowed_hosts: Optional[List[str]] = None,
+                 skip_extensions: Iterable[str] = ()):
+        self.base_host = urlsplit(base_url).netloc.lower()
+        self.include = list(include or [])
+        self.exclude = list(exclude or [])
+        self.allowed_hosts = list(allowed_hosts or [])
+        self.global_allowed_hosts = list(global_allowed_hosts or [])
+
+        self._include_re = self._compile(self.include)
+        self._exclude_re = self._compile(self.exclude)
+        self._allowed_hosts_re = self._compile_hosts(self.allowed_hosts)
+        self._global_hosts_re = self._compile_hosts(self.global_allowed_hosts)
+        self._skip_extensions = {ext.lower().lstrip('.') for ext in skip_extensions}
+        self._host_cache: Dict[str, bool] = {}
+
+    @staticmethod
+    def _glob_to_regex(pattern: str) -> str:
+        parts = []
+        i = 0
+        while i < len(pattern):
+            if pattern.startswith('**', i):
+                parts.append('.*')
+                i += 2
+            elif pattern[i] == '*':
+                parts.append('[^/]*')
+                i += 1
+            elif pattern[i] == '?':
+                parts.append('[^/]')
+                i += 1
+            else:
+                parts.append(re.escape(pattern[i]))
+                i += 1
+        return '^' + ''.join(parts) + '$'
+
+    @classmethod
+    def _compile(cls, patterns: List[str]) -> Optional[Pattern]:
+        """Merge all rules into one alternation so each link is matched in a single pass"""
+        if not patterns:
+            return None
+
+        alternatives = []
+        for pattern in patterns:
+            if pattern.startswith('re:'):
+                alternatives.append(f'(?:{pattern[3:]})')
+            elif not any(c in pattern for c in '*?'):
+                if pattern.endswith('/') and pattern != '/':
+                    # Section prefix: its pages, or the bare section path itself
+                    alternatives.append('^' + re.escape(pattern[:-1]) + r'(?:[/?]|$)')
+                else:
+                    alternatives.append('^' + re.escape(pattern))
+            elif pattern.endswith('/**') and not any(c in pattern[:-3] for c in '*?'):
+                alternatives.append('^' + re.escape(pattern[:-3]) + r'(?:[/?].*)?$')
+            else:
+                alternatives.append(f'(?:{cls._glob_to_regex(pattern)})')
+
+        return re.compile('|'.join(alternatives))
+
+    @staticmethod
+    def _compile_hosts(hosts: List[str]) -> Optional[Pattern]:
+        if not hosts:
+            return None
+
+        alternatives = []
+        for host in hosts:
+            host = host.strip().lower()
+            if host.startswith('*.'):
+                alternatives.append(r'(?:[^.]+\.)+' + re.escape(host[2:]))
+            else:
+                alternatives.append(re.escape(host))
+
+        return re.compile('^(?:' + '|'.join(alternatives) + ')$')
+
+    def host_allowed(self, host: str) -> bool:
+        cached = self._host_cache.get(host)
+        if cached is not None:
+            return cached
+
+        name = host.lower().split(':', 1)[0]
+        allowed = host.lower() == self.base_host or bool(
+            self._allowed_hosts_re and self._allowed_hosts_re.match(name)
+        )
+        if allowed and self._global_hosts_re:
+            allowed = bool(self._global_hosts_re.match(name))
+
+        self._host_cache[host] = allowed
+        return allowed
+
+    def has_skipped_extension(self, path: str) -> bool:
+        last_segment = path.rpartition('/')[2]
+        if '.' not in last_segment:
+            return False
+        return last_segment.rpartition('.')[2].lower() in self._skip_extensions
+
+    def allows(self, url: str) -> bool:
+        """Check a normalized URL against scheme, host, extension and path rules (parses once)"""
+        try:
+            parts = urlsplit(url)
+        except ValueError:
+            return False
+        return self._allows_parts(parts)
+
+    def normalize(self, url: str) -> Optional[str]:
+        """
+        Normalize a raw link (no fragment or trailing slash, as URLValidator.normalize_url)
+        and return it if in scope, else None; the URL is parsed once
+        """
+        normalized = url.split('#', 1)[0].rstrip('/')
+        try:
+            parts = urlsplit(normalized)
+        except ValueError:
+            return None
+        return normalized if self._allows_parts(parts) else None
+
+    def _allows_parts(self, parts: SplitResult) -> bool:
+        if parts.scheme not in ('http', 'https') or not parts.netloc:
+            return False
+        if not self.host_allowed(parts.netloc):
+            return False
+        if self.has_skipped_extension(parts.path):
+            return False
+
+        if self._exclude_re or self._include_re:
+            target = parts.path or '/'
+            if parts.query:
+                target += '?' + parts.query
+            if self._exclude_re and self._exclude_re.search(target):
+                return False
+            if self._include_re and not self._include_re.search(target):
+                return False
+
+        return True
+
+    def to_dict(self) -> Dict:
+        return {
+            'include': self.include,
+            'exclude': self.exclude,
+            'allowed_hosts': self.allowed_hosts,
+            'global_allowed_hosts': self.global_allowed_hosts,
+        }
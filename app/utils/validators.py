@@ -1,5 +1,6 @@
-from urllib.parse import urlparse
-from typing import Optional
+from urllib.parse import urlparse, urlsplit, urlunsplit, parse_qsl, urlencode
+from typing import List, Optional, Tuple
+import json
 import re
 
 
@@ -24,6 +25,58 @@ class URLValidator:
         url = url.rstrip('/')
         return url
 
+    @staticmethod
+    def canonical_form(url: str) -> str:
+        """Lowercase scheme/host, no default port, fragment or trailing slash, sorted query parameters"""
+        parts = urlsplit(url.strip())
+        scheme = parts.scheme.lower()
+        host = (parts.hostname or '').lower()
+        if parts.port and (scheme, parts.port) not in (('http', 80), ('https', 443)):
+            host = f"{host}:{parts.port}"
+        if parts.username:
+            host = f"{parts.username}{':' + parts.password if parts.password else ''}@{host}"
+        query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+        return urlunsplit((scheme, host, parts.path.rstrip('/'), query, ''))
+
+    @staticmethod
+    def parse_url_list(text: str) -> Tuple[List[str], int]:
+        """URLs from a JSON list, a sitemap.json ({"urls": [...]}), CSV or one URL per line, deduplicated"""
+        stripped = text.strip()
+        entries: List[str] = []
+        if stripped.startswith(('[', '{')):
+            data = json.loads(stripped)
+            entries = data.get('urls', []) if isinstance(data, dict) else data
+            entries = [entry if isinstance(entry, str) else str(entry) for entry in entries]
+        else:
+            lines = stripped.splitlines()
+            if lines and '://' not in lines[0]:
+                lines = lines[1:]  # CSV header
+            for line in lines:
+                # CSV rows: take the first column that looks like a URL
+                fields = [field.strip().strip('"') for field in line.split(',')]
+                entries.append(next((f for f in fields if f.startswith(('http://', 'https://'))), line.strip()))
+
+        return URLValidator.dedupe_urls(entries)
+
+    @staticmethod
+    def dedupe_urls(entries: List[str]) -> Tuple[List[str], int]:
+        """Valid http(s) URLs in canonical form, first occurrence kept; returns (urls, rejected count)"""
+        urls = {}
+        rejected = 0
+        for entry in entries:
+            if not entry.startswith(('http://', 'https://')) or not URLValidator.is_valid_url(entry):
+                if entry:
+                    rejected += 1
+                continue
+            try:
+                canonical = URLValidator.canonical_form(entry)
+            except ValueError:
+                # e.g. a non-numeric or out-of-range port
+                rejected += 1
+                continue
+            urls.setdefault(canonical, None)
+        return list(urls), rejected
+
     @staticmethod
     def is_valid_content_type(content_type: Optional[str]) -> bool:
         if not content_type:
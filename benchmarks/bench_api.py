@@ -0,0 +1,329 @@
+"""
+API load test: seeds OUTPUT_DIR with synthetic jobs, then drives the app with concurrent
+clients and reports latency percentiles, throughput and server RSS per endpoint.
+
+Runs in-process over the ASGI transport by default, or against a local uvicorn server with
+--uvicorn (closer to production: separate process, real sockets). Exits non-zero when an
+endpoint's p99 exceeds --max-p99-ms, so it can gate a deploy.
+
+Usage: python -m benchmarks.bench_api [--jobs 20] [--pages 500] [--blocks 50] [--clients 16]
+                                      [--requests 400] [--uvicorn] [--endpoints jobs,status,...]
+"""
+import argparse
+import asyncio
+import os
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+import httpx
+
+API = '/api/v1'
+ENDPOINTS = ('jobs', 'status', 'status_304', 'pages', 'sitemap', 'health', 'reload')
+
+
+# --- Synthetic jobs ---------------------------------------------------------------------------
+
+def seed_jobs(output_dir: Path, jobs: int, pages: int, blocks: int, failed_ratio: float = 0.02):
+    """Write jobs in the on-disk layout load_existing_jobs() reads; deterministic for a given size"""
+    from app.services.url_trie import URLTrie
+    from app.utils import serialization
+
+    started = datetime(2025, 1, 1)
+    for j in range(jobs):
+        site = f'https://site-{j}.example.com'
+        job_dir = output_dir / f'site_{j}_example_com_{started:%Y%m%d}_{j:06d}'
+        job_dir.mkdir(parents=True, exist_ok=True)
+        scraped_at = (started + timedelta(minutes=j)).isoformat()
+
+        urls = [site] + [f'{site}/section-{p % 20}/page-{p}' for p in range(1, pages)]
+        failed = set(urls[1::int(1 / failed_ratio)]) if failed_ratio else set()
+        pages_data = [
+            {
+                'url': url,
+                'title': f'Page {p} of site {j}',
+                'metadata': {'title': f'Page {p}', 'description': 'Synthetic page for load tests'},
+                'structured_content': [
+                    {'type': 'image', 'url': f'{site}/img/{b}.png', 'alt': 'Photo', 'title': ''} if b % 10 == 0
+                    else {'type': 'text', 'content': f'Paragraph {b} of page {p} with some representative text.'}
+                    for b in range(blocks)
+                ],
+                'all_images': [f'{site}/img/{b}.png' for b in range(0, blocks, 10)],
+                'scraped_at': scraped_at,
+            }
+            for p, url in enumerate(urls) if url not in failed
+        ]
+        failed_urls = [
+            {'url': url, 'error': 'HTTP 503', 'attempted_at': scraped_at, 'retry_count': 0} for url in sorted(failed)
+        ]
+
+        tree = URLTrie.from_urls(urls, {**dict.fromkeys(urls, 1), site: 0})
+        tree.record_pages(pages_data)
+        tree.record_failures(failed)
+
+        (job_dir / 'pages.json').write_bytes(serialization.dumps(pages_data))
+        (job_dir / 'sitemap.json').write_bytes(serialization.dumps({
+            'total_urls': len(urls), 'base_url': site, 'scraped_at': scraped_at,
+            'tree': tree.to_dict(), 'urls': urls,
+        }))
+        (job_dir / 'summary.json').write_bytes(serialization.dumps({
+            'website': site, 'scraped_at': scraped_at, 'total_urls_discovered': len(urls),
+            'pages_scraped': len(pages_data), 'failed_urls_count': len(failed_urls), 'failed_urls': failed_urls,
+            'errors_count': 0, 'errors': [],
+        }))
+
+
+# --- Server side ------------------------------------------------------------------------------
+
+def create_server_app():
+    """main.app without the Playwright install step, loading jobs at startup (uvicorn --factory)"""
+    from main import app
+    from app.api import routes
+
+    @asynccontextmanager
+    async def lifespan(_app):
+        if routes.loop_monitor:
+            await routes.loop_monitor.start()
+        await routes.load_existing_jobs()
+        yield
+        if routes.loop_monitor:
+            await routes.loop_monitor.stop()
+
+    app.router.lifespan_context = lifespan
+    return app
+
+
+def rss_bytes(pid: int) -> Optional[int]:
+    """Resident set size of pid (Linux /proc only; None elsewhere)"""
+    try:
+        with open(f'/proc/{pid}/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, IndexError, ValueError):
+        return None
+
+
+class RSSSampler:
+    """Peak RSS of the server process while a phase runs (sampled from a thread)"""
+
+    INTERVAL = 0.02
+
+    def __init__(self, pid: int):
+        self.pid = pid
+        self.start = self.peak = self.end = rss_bytes(pid)
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        while not self._stop.wait(self.INTERVAL):
+            rss = rss_bytes(self.pid)
+            if rss and rss > (self.peak or 0):
+                self.peak = rss
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+        self.end = rss_bytes(self.pid)
+        self.peak = max(self.peak or 0, self.end or 0) or None
+
+
+# --- Client side ------------------------------------------------------------------------------
+
+def percentile(ordered: List[float], q: float) -> float:
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))] if ordered else 0.0
+
+
+async def run_phase(client: httpx.AsyncClient, name: str, make_request: Callable, requests: int,
+                    clients: int, pid: int) -> Dict:
+    """requests calls of make_request(i) spread over clients concurrent workers"""
+    latencies: List[float] = []
+    errors = 0
+    counter = iter(range(requests))
+
+    async def worker():
+        nonlocal errors
+        for i in counter:
+            start = time.perf_counter()
+            response = await make_request(client, i)
+            await response.aread()
+            latencies.append(time.perf_counter() - start)
+            if response.status_code >= 400:
+                errors += 1
+
+    with RSSSampler(pid) as rss:
+        started = time.perf_counter()
+        await asyncio.gather(*[worker() for _ in range(clients)])
+        elapsed = time.perf_counter() - started
+
+    ordered = sorted(latencies)
+    mib = lambda value: round(value / 1024 / 1024, 1) if value else None
+    return {
+        'endpoint': name, 'requests': len(ordered), 'errors': errors, 'clients': clients,
+        'req_per_s': round(len(ordered) / elapsed, 1) if elapsed else 0.0,
+        'p50_ms': round(percentile(ordered, 0.50) * 1000, 2), 'p95_ms': round(percentile(ordered, 0.95) * 1000, 2),
+        'p99_ms': round(percentile(ordered, 0.99) * 1000, 2), 'max_ms': round(ordered[-1] * 1000, 2) if ordered else 0.0,
+        'rss_start_mib': mib(rss.start), 'rss_peak_mib': mib(rss.peak), 'rss_end_mib': mib(rss.end),
+    }
+
+
+async def drive(client: httpx.AsyncClient, pid: int, args) -> List[Dict]:
+    job_ids = [job['job_id'] for job in (await client.get(f'{API}/jobs')).json()['jobs']]
+    if not job_ids:
+        raise RuntimeError("No jobs loaded from the seeded OUTPUT_DIR")
+    etags = {}
+    for job_id in job_ids:
+        etags[job_id] = (await client.get(f'{API}/scrape/{job_id}')).headers.get('etag', '')
+
+    job = lambda i: job_ids[i % len(job_ids)]
+    phases = {
+        'jobs': lambda c, i: c.get(f'{API}/jobs'),
+        'status': lambda c, i: c.get(f'{API}/scrape/{job(i)}'),
+        'status_304': lambda c, i: c.get(f'{API}/scrape/{job(i)}', headers={'If-None-Match': etags[job(i)]}),
+        'pages': lambda c, i: c.get(f'{API}/scrape/{job(i)}/pages'),
+        'sitemap': lambda c, i: c.get(f'{API}/scrape/{job(i)}/sitemap', params={'depth': 2}),
+        'health': lambda c, i: c.get(f'{API}/health'),
+        'reload': lambda c, i: c.post(f'{API}/reload'),  # Replaces job IDs, so it always runs last
+    }
+
+    results = []
+    for name in sorted(args.endpoints, key=ENDPOINTS.index):
+        # Reload rescans every job directory: a handful of sequential calls is enough
+        requests, clients = (args.reload_requests, 1) if name == 'reload' else (args.requests, args.clients)
+        result = await run_phase(client, name, phases[name], requests, clients, pid)
+        print_row(result)
+        results.append(result)
+
+    loop_response = await client.get(f'{API}/health/loop')
+    if loop_response.status_code == 200:  # 404 with LOOP_MONITOR=false
+        loop_report = loop_response.json()
+        print(f"\n⏱️  Server event-loop lag: p50 {loop_report['p50_ms']} ms, p99 {loop_report['p99_ms']} ms, "
+              f"max {loop_report['max_ms']} ms, {loop_report['slow_callbacks']} slow callbacks")
+    return results
+
+
+def print_header():
+    print(f"{'endpoint':<11} {'reqs':>6} {'err':>4} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} "
+          f"{'p99 ms':>8} {'max ms':>8}   RSS MiB start/peak/end")
+
+
+def print_row(r: Dict):
+    print(f"{r['endpoint']:<11} {r['requests']:>6} {r['errors']:>4} {r['req_per_s']:>8.1f} {r['p50_ms']:>8.2f} "
+          f"{r['p95_ms']:>8.2f} {r['p99_ms']:>8.2f} {r['max_ms']:>8.2f}   "
+          f"{r['rss_start_mib']}/{r['rss_peak_mib']}/{r['rss_end_mib']}")
+
+
+async def run_in_process(args) -> List[Dict]:
+    from app.api import routes
+    app = create_server_app()
+
+    # httpx's ASGI transport does not run the lifespan: do the startup work here
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url='http://bench', timeout=None) as client:
+            print(f"📦 {len(routes.jobs)} jobs loaded in-process (pid {os.getpid()})\n")
+            print_header()
+            return await drive(client, os.getpid(), args)
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+async def run_uvicorn(args, env: Dict[str, str]) -> List[Dict]:
+    port = free_port()
+    server = subprocess.Popen(
+        [sys.executable, '-m', 'uvicorn', 'benchmarks.bench_api:create_server_app', '--factory',
+         '--host', '127.0.0.1', '--port', str(port), '--log-level', 'warning', '--no-access-log'],
+        env=env, cwd=Path(__file__).resolve().parent.parent
+    )
+    try:
+        async with httpx.AsyncClient(base_url=f'http://127.0.0.1:{port}', timeout=None,
+                                     limits=httpx.Limits(max_connections=args.clients)) as client:
+            deadline = time.monotonic() + 120
+            while True:
+                try:
+                    if (await client.get(f'{API}/health')).status_code == 200:
+                        break
+                except httpx.TransportError:
+                    pass
+                if server.poll() is not None or time.monotonic() > deadline:
+                    raise RuntimeError("uvicorn did not start")
+                await asyncio.sleep(0.2)
+
+            print(f"🌐 uvicorn on port {port} (pid {server.pid})\n")
+            print_header()
+            return await drive(client, server.pid, args)
+    finally:
+        server.terminate()
+        server.wait(timeout=30)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load-test the scraper API against synthetic jobs")
+    parser.add_argument('--jobs', type=int, default=20, help="Synthetic jobs to seed")
+    parser.add_argument('--pages', type=int, default=500, help="Pages per job")
+    parser.add_argument('--blocks', type=int, default=50, help="Content blocks per page")
+    parser.add_argument('--clients', type=int, default=16, help="Concurrent clients")
+    parser.add_argument('--requests', type=int, default=400, help="Requests per endpoint")
+    parser.add_argument('--reload-requests', type=int, default=3, help="Sequential POST /reload calls")
+    parser.add_argument('--endpoints', default=','.join(ENDPOINTS),
+                        type=lambda value: [name for name in value.split(',') if name],
+                        help=f"Comma-separated subset of: {', '.join(ENDPOINTS)}")
+    parser.add_argument('--uvicorn', action='store_true', help="Run the app in a local uvicorn process")
+    parser.add_argument('--output-dir', help="Seed here instead of a temporary directory (kept afterwards)")
+    parser.add_argument('--json', help="Also write the results to this file")
+    parser.add_argument('--max-p99-ms', type=float, help="Exit 1 if any endpoint's p99 exceeds this")
+    args = parser.parse_args()
+
+    unknown = set(args.endpoints) - set(ENDPOINTS)
+    if unknown:
+        parser.error(f"Unknown endpoints: {', '.join(sorted(unknown))}")
+
+    output_dir = Path(args.output_dir or tempfile.mkdtemp(prefix='bench-api-'))
+    # Settings are read at import time: point OUTPUT_DIR at the seeded jobs before the app loads
+    os.environ['OUTPUT_DIR'] = str(output_dir)
+    try:
+        start = time.perf_counter()
+        seed_jobs(output_dir, args.jobs, args.pages, args.blocks)
+        size = sum(f.stat().st_size for f in output_dir.rglob('*.json'))
+        print(f"🌱 Seeded {args.jobs} jobs x {args.pages} pages ({size / 1024 / 1024:.0f} MiB) "
+              f"in {time.perf_counter() - start:.1f}s: {output_dir}")
+
+        if args.uvicorn:
+            results = asyncio.run(run_uvicorn(args, dict(os.environ)))
+        else:
+            results = asyncio.run(run_in_process(args))
+    finally:
+        if not args.output_dir:
+            shutil.rmtree(output_dir, ignore_errors=True)
+
+    if args.json:
+        from app.utils import serialization
+        Path(args.json).write_bytes(serialization.dumps({
+            'mode': 'uvicorn' if args.uvicorn else 'in-process',
+            'jobs': args.jobs, 'pages': args.pages, 'blocks': args.blocks, 'clients': args.clients,
+            'results': results,
+        }, pretty=True))
+
+    if args.max_p99_ms is not None:
+        slow = [r['endpoint'] for r in results if r['p99_ms'] > args.max_p99_ms]
+        if slow:
+            print(f"\n❌ p99 over {args.max_p99_ms} ms: {', '.join(slow)}")
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
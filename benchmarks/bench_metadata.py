@@ -0,0 +1,61 @@
+"""
+Metadata extraction cost vs page size: legacy full BeautifulSoup parse + find() scans
+vs the streaming head parser.
+
+Usage: python -m benchmarks.bench_metadata [repeats]
+"""
+import sys
+import time
+from typing import Dict
+
+from bs4 import BeautifulSoup
+
+from app.services.head_metadata import extract_head_metadata
+
+
+def legacy_extract_metadata(html_content: str) -> Dict[str, str]:
+    """ContentCleaner.extract_metadata as it was before the streaming parser"""
+    soup = BeautifulSoup(html_content, 'lxml')
+    metadata = {}
+    title_tag = soup.find('title')
+    if title_tag:
+        metadata['title'] = title_tag.get_text().strip()
+    for attrs, key in (({'name': 'description'}, 'description'), ({'name': 'keywords'}, 'keywords'),
+                       ({'property': 'og:title'}, 'og_title'), ({'property': 'og:description'}, 'og_description'),
+                       ({'property': 'og:image'}, 'og_image'), ({'name': 'author'}, 'author')):
+        tag = soup.find('meta', attrs=attrs)
+        if tag:
+            metadata[key] = tag.get('content', '')
+    return metadata
+
+
+def synthetic_page(paragraphs: int) -> str:
+    head = (
+        '<head><meta charset="utf-8"><title>Product page</title>'
+        '<meta name="description" content="A product"><meta name="keywords" content="a, b">'
+        '<meta property="og:title" content="Product"><meta property="og:image" content="/og.png">'
+        '<meta name="twitter:card" content="summary"><link rel="canonical" href="/product">'
+        '<script type="application/ld+json">{"@type": "Product", "name": "Product"}</script></head>'
+    )
+    body = ''.join(f'<div class="row"><p>Paragraph {i} with <a href="/p/{i}">a link</a>.</p></div>'
+                   for i in range(paragraphs))
+    return f'<!DOCTYPE html><html>{head}<body>{body}</body></html>'
+
+
+def main():
+    repeats = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+
+    for paragraphs in (10, 1_000, 10_000, 50_000):
+        html = synthetic_page(paragraphs)
+        timings = {}
+        for label, extract in (('legacy', legacy_extract_metadata), ('streaming', extract_head_metadata)):
+            start = time.perf_counter()
+            for _ in range(repeats):
+                extract(html)
+            timings[label] = (time.perf_counter() - start) * 1000 / repeats
+        print(f"{len(html) / 1024:>9.0f} KiB   legacy {timings['legacy']:>9.2f} ms   "
+              f"streaming {timings['streaming']:>7.3f} ms   x{timings['legacy'] / timings['streaming']:.0f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,63 @@
+"""
+Per-page memory and construction time of PageData: plain dict blocks (previous schema)
+vs the compact ContentBlocks representation.
+
+Usage: python -m benchmarks.bench_page_memory [blocks_per_page] [pages]
+"""
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from pydantic import BaseModel, Field
+
+from app.models.schemas import PageData
+
+
+class DictPageData(BaseModel):
+    """PageData as it was before compact content blocks"""
+    url: str
+    title: Optional[str] = None
+    metadata: Dict[str, str] = {}
+    structured_content: List[Dict[str, Any]] = []
+    all_images: List[str] = []
+    scraped_at: datetime = Field(default_factory=datetime.utcnow)
+
+
+def synthetic_blocks(count: int, page: int) -> List[Dict]:
+    blocks = []
+    for i in range(count):
+        if i % 10 == 0:
+            blocks.append({'type': 'image', 'url': f'https://example.com/img/{i % 40}.png',
+                           'alt': 'Product photo', 'title': ''})
+        else:
+            blocks.append({'type': 'text', 'content': f'Paragraph {i} of page {page} with some words in it.'})
+    return blocks
+
+
+def measure(model, raw_pages):
+    tracemalloc.start()
+    start = time.perf_counter()
+    pages = [model(url=f'https://example.com/{i}', structured_content=blocks) for i, blocks in enumerate(raw_pages)]
+    elapsed = time.perf_counter() - start
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return pages, elapsed, current
+
+
+def main():
+    blocks_per_page = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    page_count = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+
+    for label, model in (('dict blocks (legacy)', DictPageData), ('ContentBlocks', PageData)):
+        raw_pages = [synthetic_blocks(blocks_per_page, p) for p in range(page_count)]
+        pages, elapsed, current = measure(model, raw_pages)
+        del raw_pages  # Keep only what the models retain
+        print(f"{label:<22} {elapsed * 1000 / page_count:>8.2f} ms/page construct   "
+              f"{current / page_count / 1024:>9.1f} KiB/page")
+        del pages
+
+
+if __name__ == '__main__':
+    main()
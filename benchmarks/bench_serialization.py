@@ -0,0 +1,68 @@
+"""
+Serialization and reload throughput for a synthetic job's pages.json:
+legacy json.dumps(indent=2)/json.load vs the serialization backend.
+
+Usage: python -m benchmarks.bench_serialization [pages] [blocks_per_page]
+"""
+import json
+import sys
+import time
+
+from app.models.schemas import PageData
+from app.services.scraper import WebScraper
+from app.utils import serialization
+
+
+def synthetic_pages(count: int, blocks_per_page: int):
+    return [
+        PageData(
+            url=f'https://example.com/page/{i}',
+            title=f'Page {i}',
+            metadata={'title': f'Page {i}', 'description': 'Synthetic page for benchmarks'},
+            structured_content=[
+                {'type': 'text', 'content': f'Paragraph {b} of page {i} with some representative text.'}
+                if b % 10 else
+                {'type': 'image', 'url': f'https://example.com/img/{b}.png', 'alt': 'Photo', 'title': ''}
+                for b in range(blocks_per_page)
+            ],
+            all_images=[f'https://example.com/img/{b}.png' for b in range(0, blocks_per_page, 10)]
+        )
+        for i in range(count)
+    ]
+
+
+def timed(label, fn, size_fn=None):
+    start = time.perf_counter()
+    result = fn()
+    elapsed = time.perf_counter() - start
+    size = f"  {size_fn(result) / 1024 / 1024:8.1f} MiB" if size_fn else ''
+    print(f"{label:<40} {elapsed * 1000:>9.0f} ms{size}")
+    return result
+
+
+def main():
+    page_count = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000
+    blocks_per_page = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+
+    pages = synthetic_pages(page_count, blocks_per_page)
+    pages_data = [WebScraper._page_to_dict(page) for page in pages]
+    print(f"{page_count} pages x {blocks_per_page} blocks, backend: {serialization.BACKEND}\n")
+
+    legacy = timed('dump: json indent=2 (legacy)',
+                   lambda: json.dumps(pages_data, indent=2, ensure_ascii=False).encode('utf-8'), len)
+    timed('dump: backend pretty', lambda: serialization.dumps(pages_data, pretty=True), len)
+    compact = timed('dump: backend compact', lambda: serialization.dumps(pages_data), len)
+
+    timed('load: json.loads (legacy)', lambda: json.loads(legacy))
+    loaded = timed('load: backend loads', lambda: serialization.loads(compact))
+    timed('reload: PageData construction', lambda: [PageData(**p) for p in loaded])
+
+    from app.models.schemas import ScrapeResponse, ScrapeStatus
+    response = ScrapeResponse(job_id='bench', status=ScrapeStatus.COMPLETED, message='', pages=pages)
+    timed('api: model_dump_json (raw bytes path)', response.model_dump_json, len)
+    timed('api: model_dump + json.dumps (default)',
+          lambda: json.dumps(response.model_dump(mode='json')).encode('utf-8'), len)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,86 @@
+"""
+Full-crawl throughput of a synthetic local site with SCRAPE_WORKERS = 1, 2, 4, ...
+Pages are served from a local HTTP server, so the numbers reflect browser + extraction
+cost rather than the network. Requires the Playwright browsers to be installed.
+
+Usage: python -m benchmarks.bench_sharding [pages] [blocks_per_page] [max_workers]
+"""
+import asyncio
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from functools import partial
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+from config import settings
+from app.services.scraper import WebScraper
+
+
+def write_site(root: str, pages: int, blocks_per_page: int):
+    """A flat site: the index links to every page, each page links to a few neighbours"""
+    links = ''.join(f'<li><a href="/page-{i}.html">Page {i}</a></li>' for i in range(pages))
+    with open(os.path.join(root, 'index.html'), 'w') as f:
+        f.write(f'<html><head><title>Index</title></head><body><ul>{links}</ul></body></html>')
+
+    for i in range(pages):
+        body = ''.join(
+            f'<p>Paragraph {b} of page {i} with some <b>representative</b> text.</p>'
+            if b % 10 else f'<img src="/img/{b}.png" alt="Photo {b}">'
+            for b in range(blocks_per_page)
+        )
+        neighbours = ''.join(f'<a href="/page-{(i + d) % pages}.html">next</a>' for d in (1, 2, 3))
+        with open(os.path.join(root, f'page-{i}.html'), 'w') as f:
+            f.write(f'<html><head><title>Page {i}</title><meta name="description" content="Page {i}"></head>'
+                    f'<body><nav>{neighbours}</nav><main>{body}</main></body></html>')
+
+
+class QuietHandler(SimpleHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+
+async def crawl(base_url: str, workers: int) -> tuple:
+    settings.SCRAPE_WORKERS = workers
+    scraper = WebScraper(base_url, max_depth=2)
+    start = time.perf_counter()
+    result = await scraper.run_full_scrape()
+    elapsed = time.perf_counter() - start
+    shutil.rmtree(scraper.output_dir, ignore_errors=True)
+    return result['total_pages'], elapsed
+
+
+def main():
+    pages = int(sys.argv[1]) if len(sys.argv) > 1 else 400
+    blocks_per_page = int(sys.argv[2]) if len(sys.argv) > 2 else 500
+    max_workers = int(sys.argv[3]) if len(sys.argv) > 3 else os.cpu_count()
+
+    site_root = tempfile.mkdtemp(prefix='bench-site-')
+    settings.OUTPUT_DIR = tempfile.mkdtemp(prefix='bench-out-')
+    settings.SEARCH_INDEX = False
+    write_site(site_root, pages, blocks_per_page)
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), partial(QuietHandler, directory=site_root))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f'http://127.0.0.1:{server.server_address[1]}/index.html'
+
+    try:
+        baseline = None
+        workers = 1
+        while workers <= max_workers:
+            scraped, elapsed = asyncio.run(crawl(base_url, workers))
+            rate = scraped / elapsed
+            baseline = baseline or rate
+            print(f"{workers:>3} workers  {scraped:>6} pages  {elapsed:>8.2f} s  "
+                  f"{rate:>8.1f} pages/s  x{rate / baseline:.2f}")
+            workers *= 2
+    finally:
+        server.shutdown()
+        shutil.rmtree(site_root, ignore_errors=True)
+        shutil.rmtree(settings.OUTPUT_DIR, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,71 @@
+"""
+Link filtering throughput: per-link validator checks (previous discover_urls path)
+vs the compiled URLScope matcher.
+
+Usage: python -m benchmarks.bench_url_scope [links]
+"""
+import random
+import sys
+import time
+from urllib.parse import urlparse
+
+from app.services.scraper import WebScraper
+from app.utils.url_scope import URLScope
+from app.utils.validators import URLValidator
+
+BASE_URL = 'https://example.com'
+
+
+def synthetic_links(count: int):
+    rng = random.Random(42)
+    hosts = ['example.com', 'example.com', 'example.com', 'cdn.example.com', 'other.org']
+    sections = ['docs', 'blog', 'tag', 'products', 'about']
+    suffixes = ['', '.html', '.pdf', '.png', '?page=2', '#top', '/']
+    return [
+        f"https://{rng.choice(hosts)}/{rng.choice(sections)}/{rng.randint(1, 5000)}{rng.choice(suffixes)}"
+        for _ in range(count)
+    ]
+
+
+def legacy_filter(links):
+    validator = URLValidator()
+    kept = 0
+    for link in links:
+        normalized = validator.normalize_url(link)
+        if not validator.is_same_domain(normalized, BASE_URL) or not validator.is_valid_url(normalized):
+            continue
+        parsed = urlparse(normalized)
+        path = parsed.path.lower()
+        if any(path.endswith(ext) for ext in WebScraper.SKIP_EXTENSIONS):
+            continue
+        if parsed.scheme not in ['http', 'https']:
+            continue
+        kept += 1
+    return kept
+
+
+def scope_filter(links, scope: URLScope):
+    return sum(1 for link in links if scope.normalize(link))
+
+
+def bench(label, fn, links):
+    start = time.perf_counter()
+    kept = fn(links)
+    elapsed = time.perf_counter() - start
+    print(f"{label:<32} {len(links) / elapsed:>12,.0f} links/s  ({kept} kept)")
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    links = synthetic_links(count)
+
+    bench('validator checks (legacy)', legacy_filter, links)
+    bench('URLScope (no rules)', lambda l: scope_filter(l, URLScope(
+        BASE_URL, skip_extensions=WebScraper.SKIP_EXTENSIONS)), links)
+    bench('URLScope (include+exclude)', lambda l: scope_filter(l, URLScope(
+        BASE_URL, include=['/docs/**', '/blog/'], exclude=['/tag/*', 're:\\?page=\\d+'],
+        skip_extensions=WebScraper.SKIP_EXTENSIONS)), links)
+
+
+if __name__ == '__main__':
+    main()
@@ -21,11 +21,80 @@ class Settings(BaseSettings):
     MAX_DEPTH: int = 5
     RESPECT_ROBOTS_TXT: bool = True
 
+    # Page readiness (adaptive, dom_quiet, selector, networkidle)
+    READINESS_STRATEGY: str = "adaptive"
+    READINESS_SELECTOR: Optional[str] = None
+    READINESS_QUIET_MS: int = 500
+    READINESS_MAX_WAIT: int = 10000  # Cap for any single readiness wait (ms)
+    READINESS_SAMPLE_PAGES: int = 5
+
+    # Extraction engine (python = ContentCleaner on page.content(), browser = in-page script,
+    # compare = browser output plus a per-page diff against ContentCleaner in extraction_diff.json)
+    EXTRACTION_ENGINE: str = "python"
+
+    # Boilerplate detection (off, mark, strip)
+    BOILERPLATE_MODE: str = "mark"
+    BOILERPLATE_MIN_PAGES: int = 3
+    BOILERPLATE_MIN_RATIO: float = 0.5
+
+    # Site-wide image catalog (off, index = write images.json, ref = also reference images by ID in pages)
+    IMAGE_CATALOG_MODE: str = "index"
+
+    # Near-duplicate detection (SimHash)
+    NEAR_DUPLICATE_DETECTION: bool = True
+    NEAR_DUPLICATE_MAX_DISTANCE: int = 3  # Max differing bits out of 64
+    NEAR_DUPLICATE_MIN_TOKENS: int = 50  # Pages with fewer main content words are never duplicates
+    NEAR_DUPLICATE_CANONICAL_MAX_DISTANCE: int = 12  # Shared rel=canonical only counts within this many bits
+    NEAR_DUPLICATE_SKIP_LINKS: bool = True  # Don't follow links found on duplicates
+
+    # Crawler-trap detection
+    TRAP_DETECTION: bool = True
+    TRAP_MAX_URLS_PER_PATTERN: int = 200  # Throttle above this, quarantine above twice this
+    TRAP_MAX_REPEATED_SEGMENTS: int = 3
+    TRAP_DUPLICATE_CONTENT_RATIO: float = 0.8
+
+    # Multi-site batches (shared browser pool)
+    BATCH_MAX_CONCURRENT_PAGES: int = 20  # Pages open at once across all sites
+    PER_HOST_CONCURRENCY: int = 2
+    PER_HOST_DELAY_MS: int = 0  # Minimum spacing between requests to the same host
+
+    # URL-list scrapes (POST /scrape/batch)
+    URL_LIST_MAX_URLS: int = 50000
+
+    # Browser health (recycle a long-running browser before it degrades; 0 disables a limit)
+    BROWSER_RECYCLE_NAVIGATIONS: int = 1000
+    BROWSER_RECYCLE_RSS_MB: int = 2048  # Combined RSS of the browser process tree
+
+    # Sharded scraping: worker processes, each with its own browser (0 or 1 = in-process)
+    SCRAPE_WORKERS: int = 0
+    SHARD_BATCH_SIZE: int = 10  # URLs handed to a worker at a time
+
+    # Worker nodes (python worker.py): page batches go through this queue instead of local processes
+    TASK_QUEUE: str = ""  # e.g. sqlite:///scraped_data/queue.db or redis://localhost:6379/0
+    TASK_LEASE_SECONDS: int = 300  # Unfinished batches are handed out again after this
+    TASK_QUEUE_MAX_IN_FLIGHT: int = 64  # Batches queued per job at once
+    SHARD_JOB_TIMEOUT: int = 21600  # Seconds a sharded or queued job waits for its batches overall (0 = no limit)
+
     # Security
     ALLOWED_DOMAINS: Optional[List[str]] = None  # <— made this a list
 
     # Storage
     OUTPUT_DIR: str = "./scraped_data"
+    PAGE_CACHE_MAX_BYTES: int = 512 * 1024 * 1024  # Budget for job page payloads kept in memory (estimated resident size)
+    RESPONSE_CACHE_MAX_BYTES: int = 256 * 1024 * 1024  # Serialized job/list responses reused until they change
+    PAGE_STORE_COMPACT_SEGMENTS: int = 4  # Retry segments kept before folding into pages.json
+    SEARCH_INDEX: bool = True  # Maintain search.db (SQLite FTS5) for GET /scrape/{job_id}/search
+    JSON_PRETTY: bool = False  # Indent output JSON files (compact is smaller and faster)
+
+    # API responses larger than this are gzip/brotli compressed (bytes)
+    COMPRESSION_MIN_SIZE: int = 1024
+    WARC_CAPTURE: bool = False  # Record rendered pages to pages.warc.gz for offline re-extraction
+    REEXTRACT_WORKERS: int = 0  # Worker processes for re-extraction (0 = one per CPU core)
+
+    # Event-loop monitoring (GET /api/v1/health/loop)
+    LOOP_MONITOR: bool = True
+    LOOP_MONITOR_INTERVAL_MS: int = 100  # Lag sampling period
+    LOOP_SLOW_CALLBACK_MS: int = 250  # Log the loop thread's stack when it is blocked this long
 
     # CORS origins
     CORS_ORIGINS: Union[str, List[str]] = "http://localhost:3000,http://localhost:5173"
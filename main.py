@@ -1,5 +1,6 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
 from fastapi.staticfiles import StaticFiles
 from fastapi.responses import FileResponse
 from contextlib import asynccontextmanager
@@ -7,7 +8,7 @@ import subprocess
 import os
 from pathlib import Path
 
-from app.api.routes import router
+from app.api.routes import router, load_existing_jobs, loop_monitor
 from config import settings
 
 
@@ -26,9 +27,15 @@ async def lifespan(app: FastAPI):
     except Exception as e:
         print(f"⚠️  Could not auto-install Playwright: {e}")
 
+    if loop_monitor:
+        await loop_monitor.start()
+    await load_existing_jobs()
+
     yield
 
     print("👋 Shutting down Web Scraper API...")
+    if loop_monitor:
+        await loop_monitor.stop()
 
 
 app = FastAPI(
@@ -47,6 +54,14 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Compress large responses (brotli when brotli-asgi is installed, gzip otherwise)
+try:
+    from brotli_asgi import BrotliMiddleware
+
+    app.add_middleware(BrotliMiddleware, minimum_size=settings.COMPRESSION_MIN_SIZE)
+except ImportError:
+    app.add_middleware(GZipMiddleware, minimum_size=settings.COMPRESSION_MIN_SIZE)
+
 # Include API routes
 app.include_router(router, prefix=settings.API_PREFIX, tags=["scraper"])
 
@@ -0,0 +1,34 @@
+"""
+Scraper worker node: pulls page batches from TASK_QUEUE and writes results back.
+
+Usage: python worker.py [--queue URL] [--concurrency N]
+Run several on one machine (sqlite:// queue) or across nodes (redis:// queue).
+"""
+import argparse
+import asyncio
+
+from config import settings
+from app.services.queue_worker import QueueWorker
+from app.services.task_queue import open_task_queue
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Web scraper queue worker")
+    parser.add_argument('--queue', default=settings.TASK_QUEUE,
+                        help="Task queue URL (sqlite:///path/queue.db or redis://host:6379/0)")
+    parser.add_argument('--concurrency', type=int, default=1, help="Batches processed at once")
+    args = parser.parse_args()
+
+    if not args.queue:
+        parser.error("No task queue configured: set TASK_QUEUE or pass --queue")
+
+    task_queue = open_task_queue(args.queue, lease_seconds=settings.TASK_LEASE_SECONDS)
+    worker = QueueWorker(task_queue, concurrency=args.concurrency)
+    try:
+        asyncio.run(worker.run())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()